@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+SentinelZero — Benchmarks dos hot paths
+Mede RiskEngine, run_unified_analysis, calculate_risk, build_report/format_report
+e o cache SQLite com portfólios sintéticos (sem acesso à rede) e grava JSON
+comparável entre commits.
+
+Uso:
+    python -m benchmarks.bench_hot_paths --sizes 10 1000 100000 --output bench.json
+    python -m benchmarks.bench_hot_paths --compare bench.json --threshold 1.25
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from sentinelzero.core.analysis import run_unified_analysis
+from sentinelzero.core.engine import RiskEngine
+from sentinelzero.core.models import ProtocolSnapshot, RiskCategory, RiskSignal, Severity
+from sentinelzero.reports.formatter import format_report
+from sentinelzero.reports.schema import build_report
+from sentinelzero.scoring.calculator import calculate_risk
+from sentinelzero.utils.cache import SQLiteCache, TieredCache
+
+DEFAULT_SIZES = [10, 1_000, 100_000]
+IDENTIFIERS = ["aave", "makerdao", "link", "not-listed"]
+SEED = 1337
+
+# -----------------------
+# Portfólios sintéticos
+# -----------------------
+def synthetic_snapshots(size: int, seed: int = SEED) -> List[ProtocolSnapshot]:
+    rng = random.Random(seed)
+    categories = ["Lending", "Dexes", "CDP", "Yield", "Bridge"]
+    return [
+        ProtocolSnapshot(
+            name=f"proto-{i}",
+            category=rng.choice(categories),
+            tvl=round(10 ** rng.uniform(5, 10), 2),
+            tvl_change_7d=round(rng.uniform(-30, 30), 2),
+            entity_type="token" if rng.random() < 0.1 else "protocol",
+        )
+        for i in range(size)
+    ]
+
+def synthetic_signal_lists(size: int, seed: int = SEED) -> List[List[RiskSignal]]:
+    rng = random.Random(seed)
+    catalog = [
+        RiskSignal(RiskCategory.GOVERNANCE, f"signal {sev.value}", sev, "synthetic")
+        for sev in Severity
+    ]
+    return [[rng.choice(catalog) for _ in range(rng.randint(0, 6))] for _ in range(size)]
+
+# -----------------------
+# Benchmarks
+# -----------------------
+def bench_engine_run(size: int) -> Callable[[], None]:
+    engine = RiskEngine()
+    snapshots = synthetic_snapshots(size)
+    def run():
+        for s in snapshots:
+            engine.run(s)
+    return run
+
+def bench_engine_run_batch(size: int) -> Callable[[], None]:
+    engine = RiskEngine()
+    snapshots = synthetic_snapshots(size)
+    return lambda: engine.run_batch(snapshots)
+
+def bench_run_unified_analysis(size: int) -> Callable[[], None]:
+    identifiers = [IDENTIFIERS[i % len(IDENTIFIERS)] for i in range(size)]
+    def run():
+        for identifier in identifiers:
+            run_unified_analysis(identifier)
+    return run
+
+def bench_calculate_risk(size: int) -> Callable[[], None]:
+    snapshots = synthetic_snapshots(size)
+    signal_lists = synthetic_signal_lists(size)
+    def run():
+        for s, signals in zip(snapshots, signal_lists):
+            calculate_risk(s.entity_type, s.tvl, signals)
+    return run
+
+def bench_calculate_risk_vectorized(size: int) -> Optional[Callable[[], None]]:
+    try:
+        from sentinelzero.scoring.vectorized import calculate_risk_many
+    except ImportError:
+        return None
+    snapshots = synthetic_snapshots(size)
+    signal_lists = synthetic_signal_lists(size)
+    types = [s.entity_type for s in snapshots]
+    tvls = [s.tvl for s in snapshots]
+    return lambda: calculate_risk_many(types, tvls, signal_lists)
+
+def _scored(size: int):
+    engine = RiskEngine()
+    return [(s, *engine.run(s)) for s in synthetic_snapshots(size)]
+
+def bench_build_report(size: int) -> Callable[[], None]:
+    scored = _scored(size)
+    def run():
+        for snapshot, score, signals in scored:
+            build_report(snapshot, score, signals)
+    return run
+
+def bench_format_report(size: int) -> Callable[[], None]:
+    scored = _scored(size)
+    def run():
+        for snapshot, score, signals in scored:
+            format_report(snapshot, score, signals)
+    return run
+
+def _cache_items(size: int) -> Dict[str, str]:
+    return {s.name: json.dumps({"tvl": s.tvl, "category": s.category}) for s in synthetic_snapshots(size)}
+
+def _open_cache(workdir: str, name: str, opened: List[SQLiteCache]) -> SQLiteCache:
+    cache = SQLiteCache(os.path.join(workdir, name))
+    opened.append(cache)
+    return cache
+
+def _close_caches(opened: List[SQLiteCache]):
+    # Fecha tudo antes do TemporaryDirectory apagar os bancos
+    for cache in opened:
+        cache.stop_eviction()
+        cache.close()
+    opened.clear()
+
+def bench_cache_set_many(size: int, workdir: str, opened: List[SQLiteCache]) -> Callable[[], None]:
+    cache = _open_cache(workdir, f"set_{size}.db", opened)
+    items = _cache_items(size)
+    return lambda: cache.set_many(items)
+
+def bench_cache_get(size: int, workdir: str, opened: List[SQLiteCache]) -> Callable[[], None]:
+    cache = _open_cache(workdir, f"get_{size}.db", opened)
+    items = _cache_items(size)
+    cache.set_many(items)
+    def run():
+        for key in items:
+            cache.get(key)
+    return run
+
+def bench_cache_get_many(size: int, workdir: str, opened: List[SQLiteCache]) -> Callable[[], None]:
+    cache = _open_cache(workdir, f"get_many_{size}.db", opened)
+    items = _cache_items(size)
+    cache.set_many(items)
+    keys = list(items)
+    return lambda: cache.get_many(keys)
+
+def bench_cache_tiered_get(size: int, workdir: str, opened: List[SQLiteCache]) -> Callable[[], None]:
+    backend = _open_cache(workdir, f"tiered_{size}.db", opened)
+    cache = TieredCache(backend)
+    items = _cache_items(size)
+    cache.set_many(items)
+    def run():
+        for key in items:
+            cache.get(key)
+    return run
+
+def bench_cache_get_listing(size: int, workdir: str, opened: List[SQLiteCache]) -> Callable[[], None]:
+    # Uma única entrada grande, como a listagem /protocols do DefiLlama
+    cache = _open_cache(workdir, f"listing_{size}.db", opened)
+    listing = [{"slug": s.name, "tvl": s.tvl, "category": s.category, "change_7d": s.tvl_change_7d}
+               for s in synthetic_snapshots(size)]
+    cache.set("listing", listing)
+    return lambda: cache.get("listing")
+
+BENCHMARKS = {
+    "engine.run": bench_engine_run,
+    "engine.run_batch": bench_engine_run_batch,
+    "run_unified_analysis": bench_run_unified_analysis,
+    "calculate_risk": bench_calculate_risk,
+    "calculate_risk.vectorized": bench_calculate_risk_vectorized,
+    "build_report": bench_build_report,
+    "format_report": bench_format_report,
+}
+
+CACHE_BENCHMARKS = {
+    "cache.set_many": bench_cache_set_many,
+    "cache.get": bench_cache_get,
+    "cache.get_many": bench_cache_get_many,
+    "cache.tiered_get": bench_cache_tiered_get,
+    "cache.get_listing": bench_cache_get_listing,
+}
+
+# -----------------------
+# Execução
+# -----------------------
+def measure(func: Callable[[], None], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(sizes: List[int], repeat: int = 3, only: Optional[List[str]] = None) -> dict:
+    results = []
+    with tempfile.TemporaryDirectory(prefix="sentinelzero-bench-") as workdir:
+        opened: List[SQLiteCache] = []
+        try:
+            suites = [(name, factory, False) for name, factory in BENCHMARKS.items()]
+            suites += [(name, factory, True) for name, factory in CACHE_BENCHMARKS.items()]
+            for name, factory, needs_dir in suites:
+                if only and not any(name.startswith(prefix) for prefix in only):
+                    continue
+                for size in sizes:
+                    func = factory(size, workdir, opened) if needs_dir else factory(size)
+                    if func is None:
+                        continue
+                    timings = measure(func, repeat)
+                    best = min(timings)
+                    results.append({
+                        "name": name,
+                        "size": size,
+                        "repeat": repeat,
+                        "best_s": best,
+                        "mean_s": sum(timings) / len(timings),
+                        "per_item_us": best / size * 1e6,
+                    })
+        finally:
+            _close_caches(opened)
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """Retorna as regressões (best_s atual / baseline acima do threshold)."""
+    previous = {(r["name"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        base = previous.get((r["name"], r["size"]))
+        if not base or base["best_s"] <= 0:
+            continue
+        ratio = r["best_s"] / base["best_s"]
+        line = f"{r['name']:<28} n={r['size']:<7} {base['best_s']:.4f}s -> {r['best_s']:.4f}s ({ratio:.2f}x)"
+        print(line, file=sys.stderr)
+        if ratio > threshold:
+            regressions.append(line)
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SentinelZero hot path benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", help="prefixos de benchmarks a executar")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument("--compare", help="JSON de um run anterior para comparação")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.sizes, args.repeat, args.only)
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regressão(ões) acima de {args.threshold}x", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
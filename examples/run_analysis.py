@@ -1,42 +1,27 @@
-import requests
 import json
+from functools import partial
 
 # ----------------------
 # Data Sources
 # ----------------------
-def fetch_defillama(protocol_or_address):
-    url = f"https://api.llama.fi/protocol/{protocol_or_address}"
-    try:
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        data = r.json()
-        return {"tvl_usd": data.get("tvl", 0), "name": protocol_or_address}
-    except:
-        return None
+# As três fontes são consultadas em paralelo: a latência é a da mais lenta.
+# O TVL vem da listagem /protocols (uma chamada para todos os protocolos).
+# Criado no primeiro uso: com o daemon no ar, o CLI nem importa as fontes.
+_fetcher = None
 
-def fetch_coingecko(token_id):
-    token_id = token_id.lower().replace(" ", "-")
-    url = f"https://api.coingecko.com/api/v3/simple/price?ids={token_id}&vs_currencies=usd&include_market_cap=true"
-    try:
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        data = r.json().get(token_id, {})
-        if not data:
-            return None
-        return {"price_usd": data.get("usd"), "market_cap_usd": data.get("usd_market_cap")}
-    except:
-        return None
+def get_fetcher():
+    global _fetcher
+    if _fetcher is None:
+        from sentinelzero.datasources import remote
+        from sentinelzero.datasources.aggregator import ParallelFetcher
+        from sentinelzero.datasources.universe import get_universe
 
-def fetch_dexscreener(token_address):
-    url = f"https://api.dexscreener.io/latest/dex/tokens/{token_address}"
-    try:
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        data = r.json()
-        pair = data.get("pairs", [{}])[0]
-        return {"volume_24h_usd": pair.get("volumeUsd", 0)}
-    except:
-        return None
+        _fetcher = ParallelFetcher({
+            "defillama": partial(remote.fetch_defillama, universe=get_universe()),
+            "coingecko": remote.fetch_coingecko,
+            "dexscreener": remote.fetch_dexscreener,
+        }, timeout=remote.DEFAULT_TIMEOUT)
+    return _fetcher
 
 # ----------------------
 # Risk Assessment
@@ -63,14 +48,16 @@ def assess_risks():
 # ----------------------
 def run_analysis(protocol_or_address):
     protocol_norm = protocol_or_address.lower().replace(" ", "-")
-    defi_data = fetch_defillama(protocol_norm)
+    fetched = get_fetcher().fetch_sync(protocol_norm)
+    defi_data = fetched.get("defillama")
+    coingecko_data = fetched.get("coingecko")
+    dexscreener_data = fetched.get("dexscreener")
     fallback_used = False
 
     if not defi_data:
         # Fallback to CoinGecko if DefiLlama fails
         fallback_used = True
-        cg_data = fetch_coingecko(protocol_norm)
-        if not cg_data:
+        if not coingecko_data:
             # Return only default risk if no data
             return {
                 "protocol": protocol_or_address,
@@ -84,8 +71,6 @@ def run_analysis(protocol_or_address):
             }
         defi_data = {"tvl_usd": None, "name": protocol_or_address}
 
-    coingecko_data = fetch_coingecko(protocol_norm)
-    dexscreener_data = fetch_dexscreener(protocol_norm)
     risks, risk_summary = assess_risks()
 
     result = {
@@ -105,7 +90,29 @@ def run_analysis(protocol_or_address):
 # CLI Runner
 # ----------------------
 if __name__ == "__main__":
+    import argparse
     import sys
-    protocol_input = sys.argv[1] if len(sys.argv) > 1 else input("Enter protocol name or token symbol (e.g., aave, makerdao, link): ")
-    data = run_analysis(protocol_input)
-    print(json.dumps(data, indent=2))
+
+    from sentinelzero import daemon
+    from sentinelzero.utils import profiling
+
+    parser = argparse.ArgumentParser(description="SentinelZero protocol analysis")
+    parser.add_argument("protocols", nargs="*")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="write per-protocol profiles (folded stacks, pstats, slowest) to DIR")
+    args = parser.parse_args()
+    protocols = args.protocols or [input("Enter protocol name or token symbol (e.g., aave, makerdao, link): ")]
+
+    profiler = profiling.enable() if args.profile else None
+    for protocol_input in protocols:
+        if profiler:
+            with profiler.profile(protocol_input):
+                data = run_analysis(protocol_input)
+        else:
+            # com o daemon no ar (python -m sentinelzero.daemon) a análise roda lá
+            data = daemon.run_or_local("analysis", run_analysis, protocol_input)
+        print(json.dumps(data, indent=2))
+
+    if profiler:
+        profiler.write(args.profile)
+        print(profiler.summary(), file=sys.stderr)
@@ -10,7 +10,7 @@ ENTITIES = {
     'link': {'name': 'Chainlink', 'type': 'token'}
 }
 
-def run_analysis(symbol: str):
+def analyze(symbol: str) -> dict:
     entity = ENTITIES.get(symbol.lower(), {'name': symbol, 'type': 'unknown'})
     signals: list[RiskSignal] = []
 
@@ -27,11 +27,28 @@ def run_analysis(symbol: str):
         'risk_findings': [s.__dict__ for s in signals],
         'risk_score': score
     }
+    return result
 
-    print(json.dumps(result, indent=2))
+def run_analysis(symbol: str):
+    print(json.dumps(analyze(symbol), indent=2))
 
 if __name__ == '__main__':
-    if len(sys.argv) != 2:
-        print('Usage: python -m examples.run_analysis_unified <symbol>')
+    args = sys.argv[1:]
+    profile_dir = None
+    if len(args) == 3 and args[0] == '--profile':
+        profile_dir, args = args[1], args[2:]
+    if len(args) != 1:
+        print('Usage: python -m examples.run_analysis_unified [--profile DIR] <symbol>')
         sys.exit(1)
-    run_analysis(sys.argv[1])
+
+    if profile_dir is None:
+        # com o daemon no ar (python -m sentinelzero.daemon) a análise roda lá
+        from sentinelzero import daemon
+        print(json.dumps(daemon.run_or_local('unified', analyze, args[0]), indent=2))
+    else:
+        from sentinelzero.utils import profiling
+        profiler = profiling.enable()
+        with profiler.profile(args[0]):
+            run_analysis(args[0])
+        profiler.write(profile_dir)
+        print(profiler.summary(), file=sys.stderr)
@@ -192,12 +192,12 @@ def backup_project(logger: SimulationLogger):
         logger.log(f"Falha no backup: {e}", "ERROR")
 
 def check_apis(logger: SimulationLogger):
-    import requests
+    from sentinelzero.datasources.http_client import get_http_client
+    client = get_http_client()
     logger.log("Testando conectividade das APIs...")
     for name,url in API_PING_URLS.items():
         try:
-            r=requests.get(url,timeout=10)
-            r.raise_for_status()
+            r=client.get(url,timeout=10)
             logger.log(f"{name} OK (status {r.status_code})","OK")
         except Exception as e:
             logger.log(f"Falha em {name}: {e}","ERROR")
@@ -9,6 +9,7 @@ Descrição:
 - Cache para APIs externas
 - Relatório TXT, HTML e PDF
 - Timeout e tratamento de erros robusto
+- Análise paralela em pool de processos aquecido
 """
 
 import os
@@ -16,7 +17,10 @@ import sys
 import subprocess
 import json
 import shutil
+import multiprocessing
 import importlib.util
+import time
+from collections import deque
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 
@@ -38,11 +42,15 @@ REPORT_PDF = os.path.join(LOGS_DIR, f"full_prod_sim_report_{TIMESTAMP}.pdf")
 
 TOKENS_PROTOCOLS = ["aave", "uni", "compound", "makerdao", "curve", "sushi", "balancer", "yearn", "dydx"]
 RISK_CATEGORIES = ["Governance", "Liquidity", "Oracle"]
+ENTITY_TIMEOUT = 60  # segundos por entidade
+POLL_SECONDS = 0.05
+WORKERS = int(os.environ.get("SENTINELZERO_SIM_WORKERS", os.cpu_count() or 1))
 
 CACHE_TTL = timedelta(hours=1)
 CACHE_FILES = {
     "coingecko": os.path.join(CACHE_DIR, "coingecko.json"),
-    "defillama": os.path.join(CACHE_DIR, "defillama.json")
+    # listagem /protocols inteira, em binário compactado (utils.codec)
+    "defillama": os.path.join(CACHE_DIR, "defillama.bin")
 }
 
 API_PING_URLS = {
@@ -191,21 +199,38 @@ def backup_project(logger: SimulationLogger):
         logger.log(f"Falha no backup: {e}", "ERROR")
 
 def check_apis(logger: SimulationLogger):
-    import requests
+    from sentinelzero.datasources.http_client import get_http_client
+    client = get_http_client()
     logger.log("Testando conectividade das APIs...")
     for name,url in API_PING_URLS.items():
+        if name=="defillama":
+            check_defillama_universe(logger)
+            continue
         data = load_cache(name)
         if data:
             logger.log(f"{name} cache válido encontrado", "OK")
             continue
         try:
-            r=requests.get(url,timeout=10)
-            r.raise_for_status()
+            r=client.get(url,timeout=10)
             logger.log(f"{name} OK (status {r.status_code})", "OK")
             save_cache(name,r.json() if name=="coingecko" else r.text)
         except Exception as e:
             logger.log(f"Falha em {name}: {e}", "ERROR")
 
+def check_defillama_universe(logger: SimulationLogger):
+    # A listagem /protocols é o próprio universo: em vez de só testar a
+    # conectividade, ela é indexada e gravada em CACHE_FILES["defillama"],
+    # de onde o resolver dos workers (get_universe) a lê sem ir à rede.
+    from sentinelzero.datasources import universe as universe_module
+    os.environ[universe_module.CACHE_PATH_ENV] = CACHE_FILES["defillama"]
+    universe = universe_module.get_universe()
+    universe.ttl = CACHE_TTL.total_seconds()
+    try:
+        universe.refresh()
+        logger.log(f"defillama OK ({len(universe)} protocolos indexados)", "OK")
+    except Exception as e:
+        logger.log(f"Falha em defillama: {e}", "ERROR")
+
 def run_pytest(logger: SimulationLogger):
     logger.log("Rodando testes unitários...")
     try:
@@ -218,41 +243,149 @@ def run_pytest(logger: SimulationLogger):
         logger.log(e.stdout)
         logger.log(e.stderr)
 
-def run_example(entity: str, logger: SimulationLogger):
-    logger.log(f"Analisando {entity}...")
-    script = os.path.join(SRC_DIR,"examples","run_analysis_unified.py")
-    if not os.path.exists(script):
-        logger.log("Script de análise não encontrado!", "ERROR")
+# -----------------------
+# Análise paralela
+# -----------------------
+_run_unified_analysis = None
+_profiler = None
+
+def _init_worker(profile: bool = False):
+    # Cada worker importa o pacote uma única vez e atende várias entidades
+    global _run_unified_analysis, _profiler
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+    from sentinelzero.core.analysis import run_unified_analysis
+    _run_unified_analysis = run_unified_analysis
+    if profile:
+        from sentinelzero.utils.profiling import Profiler
+        _profiler = Profiler()
+        _profiler.attach()
+
+def _analyze(entity: str):
+    """Resultado da análise e, com --profile, o perfil da entidade."""
+    if _profiler is None:
+        return _run_unified_analysis(entity), None
+    with _profiler.profile(entity) as record:
+        data = _run_unified_analysis(entity)
+    _profiler.records.clear()
+    return data, record
+
+def log_analysis(entity: str, data: Dict[str, Any], logger: SimulationLogger):
+    import jsonschema
+    if "error" in data:
+        logger.log(f"Falha na execução de {entity}: {data['error']}","ERROR")
         return
     try:
-        env=os.environ.copy()
-        env["PYTHONPATH"]=f"{SRC_DIR}{os.pathsep}{env.get('PYTHONPATH','')}"
-        result=subprocess.run([sys.executable,script,entity],capture_output=True,text=True,env=env,timeout=60,check=True)
-        output=result.stdout.strip()
-        try:
-            data:Dict[str,Any]=json.loads(output)
-            import jsonschema
-            jsonschema.validate(instance=data,schema=OUTPUT_SCHEMA)
-            logger.log(f"{entity} → JSON válido e conforme schema","OK")
-            findings=data.get("risk_findings",[])
-            for cat in RISK_CATEGORIES:
-                count=len([f for f in findings if f.get("category")==cat])
-                logger.log(f"  {cat}: {count} achados")
-        except json.JSONDecodeError as e:
-            logger.log(f"JSON inválido: {e}","WARN")
-        except jsonschema.ValidationError as e:
-            logger.log(f"JSON não conforme schema: {e.message}","ERROR")
-    except subprocess.TimeoutExpired:
-        logger.log(f"Timeout executando {entity} (60s)","ERROR")
-    except subprocess.CalledProcessError as e:
-        logger.log(f"Falha na execução de {entity}: {e.stderr.strip()}","ERROR")
-    except Exception as e:
-        logger.log(f"Erro crítico em {entity}: {str(e)}","ERROR")
+        jsonschema.validate(instance=data,schema=OUTPUT_SCHEMA)
+        logger.log(f"{entity} → JSON válido e conforme schema","OK")
+        findings=data.get("risk_findings",[])
+        for cat in RISK_CATEGORIES:
+            count=len([f for f in findings if f.get("category")==cat])
+            logger.log(f"  {cat}: {count} achados")
+    except jsonschema.ValidationError as e:
+        logger.log(f"JSON não conforme schema: {e.message}","ERROR")
+
+def analyze_all(entities: List[str], workers: int = WORKERS, profile: bool = False,
+                timeout: float = ENTITY_TIMEOUT, analyze=_analyze) -> Dict[str, Any]:
+    """
+    Roda as entidades num pool de processos já aquecido e devolve
+    {entidade: resultado de `analyze`, ou a exceção}. Cada worker recebe
+    uma entidade por vez, então o prazo de `timeout` conta a partir do
+    início da análise. Uma entidade que estoura o prazo vira
+    multiprocessing.TimeoutError e o pool é recriado, matando o worker
+    travado; as outras entidades em andamento recomeçam no pool novo.
+    Entidades repetidas são analisadas uma vez só.
+    """
+    unique = list(dict.fromkeys(entities))
+    processes = max(1, min(workers, len(unique)))
+    queue = deque(unique)
+    in_flight: Dict[str, Any] = {}
+    outcomes: Dict[str, Any] = {}
+    pool = None
+    try:
+        while queue or in_flight:
+            if pool is None:
+                pool = multiprocessing.Pool(processes=processes, initializer=_init_worker, initargs=(profile,))
+            while queue and len(in_flight) < processes:
+                entity = queue.popleft()
+                in_flight[entity] = (pool.apply_async(analyze, (entity,)), time.monotonic() + timeout)
+
+            now = time.monotonic()
+            expired = False
+            for entity, (result, deadline) in list(in_flight.items()):
+                if result.ready():
+                    del in_flight[entity]
+                    try:
+                        outcomes[entity] = result.get()
+                    except Exception as e:
+                        outcomes[entity] = e
+                elif now >= deadline:
+                    del in_flight[entity]
+                    outcomes[entity] = multiprocessing.TimeoutError(f"{entity}: {timeout}s")
+                    expired = True
+
+            if expired:
+                queue.extendleft(reversed(list(in_flight)))
+                in_flight.clear()
+                pool.terminate()
+                pool.join()
+                pool = None
+            elif in_flight:
+                time.sleep(POLL_SECONDS)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return outcomes
+
+def run_examples(entities: List[str], logger: SimulationLogger, workers: int = WORKERS,
+                 profile_dir: str = None):
+    """
+    Analisa as entidades com analyze_all e registra os resultados na ordem
+    de `entities`. Com `profile_dir`, os perfis de cada entidade voltam dos
+    workers e são gravados lá ao final.
+    """
+    profiler = None
+    if profile_dir:
+        from sentinelzero.utils.profiling import Profiler
+        profiler = Profiler()
+    logger.log(f"Analisando {len(entities)} entidades com {workers} workers...")
+    repeated = sorted({entity for entity in entities if entities.count(entity) > 1})
+    if repeated:
+        logger.log(f"Entidades repetidas, analisadas uma vez: {', '.join(repeated)}","WARN")
+    outcomes = analyze_all(entities, workers, profile=profiler is not None)
+    for entity in entities:
+        logger.log(f"Analisando {entity}...")
+        outcome = outcomes[entity]
+        if isinstance(outcome, multiprocessing.TimeoutError):
+            logger.log(f"Timeout executando {entity} ({ENTITY_TIMEOUT}s)","ERROR")
+        elif isinstance(outcome, Exception):
+            logger.log(f"Erro crítico em {entity}: {str(outcome)}","ERROR")
+        else:
+            data, record = outcome
+            if record is not None:
+                profiler.add(record)
+            try:
+                log_analysis(entity, data, logger)
+            except Exception as e:
+                logger.log(f"Erro crítico em {entity}: {str(e)}","ERROR")
+
+    if profiler is not None and profiler.records:
+        paths = profiler.write(profile_dir)
+        logger.log(f"Perfis gravados em {profile_dir}: {', '.join(os.path.basename(p) for p in paths.values())}","OK")
+        for line in profiler.summary().splitlines():
+            logger.log(line)
 
 # -----------------------
 # Execução Principal
 # -----------------------
-def main():
+def main(argv: List[str] = None):
+    import argparse
+    parser = argparse.ArgumentParser(description="SentinelZero pre-production simulation")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="grava perfis por entidade (folded, pstats, mais lentos) em DIR")
+    args = parser.parse_args(argv)
+
     logger = SimulationLogger()
     logger.log("=== Iniciando Simulação SentinelZero v3.3 ===","DONE")
     check_modules(logger)
@@ -260,8 +393,7 @@ def main():
     backup_project(logger)
     check_apis(logger)
     run_pytest(logger)
-    for entity in TOKENS_PROTOCOLS:
-        run_example(entity,logger)
+    run_examples(TOKENS_PROTOCOLS,logger,profile_dir=args.profile)
     logger.save_txt_report()
     logger.save_html_report()
     logger.save_pdf_report()
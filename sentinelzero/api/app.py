@@ -1,13 +1,22 @@
 #!/usr/bin/env python3
+import asyncio
+import json
+import os
+import threading
+
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import AsyncIterator, Iterable, List, Optional
 
-from sentinelzero.datasources.defillama import DefiLlamaSource
-from sentinelzero.datasources.coingecko import CoinGeckoSource
-from sentinelzero.datasources.incidents import IncidentSource
+from sentinelzero.datasources.aggregator import ParallelFetcher
+from sentinelzero.datasources.scheduler import BATCH, INTERACTIVE, request_priority
 from sentinelzero.core.engine import RiskEngine
-from sentinelzero.reports.schema import build_report
+from sentinelzero.reports.schema import build_batch_reports, build_report
+from sentinelzero.utils import instrumentation
+from sentinelzero.utils.singleflight import SingleFlight
+from sentinelzero.utils.timeseries import HISTORY_DIR, SeriesStore
+from sentinelzero.api.watch import WatchHub, sse_events
 
 app = FastAPI(title="SentinelZero Risk API", version="1.0")
 
@@ -15,11 +24,67 @@ app = FastAPI(title="SentinelZero Risk API", version="1.0")
 class ProtocolRequest(BaseModel):
     protocol: str
 
-# Datasources e engine globais
-defillama = DefiLlamaSource()
-coingecko = CoinGeckoSource()
-incidents = IncidentSource()
-engine = RiskEngine()
+
+class BatchRequest(BaseModel):
+    protocols: List[str]
+
+
+# Máximo de protocolos pontuados ao mesmo tempo em /risk/batch
+BATCH_CONCURRENCY = 16
+
+
+class Services:
+    """Datasources, engine e hub de /watch, criados no primeiro request."""
+
+    def __init__(self):
+        # importados aqui para que importar o app não carregue as fontes
+        from sentinelzero.datasources.defillama import DefiLlamaSource
+        from sentinelzero.datasources.coingecko import CoinGeckoSource
+        from sentinelzero.datasources.incidents import IncidentSource
+
+        self.defillama = DefiLlamaSource()
+        self.coingecko = CoinGeckoSource()
+        self.incidents = IncidentSource()
+        self.engine = RiskEngine()
+
+        # Todas as fontes de um protocolo são buscadas em paralelo
+        self.fetcher = ParallelFetcher(
+            {
+                "defillama": self.defillama.fetch,
+                "coingecko": self.coingecko.get_protocol_context,
+                "incidents": self.incidents.get_incidents,
+            },
+            timeout=10.0,
+        )
+
+        # Loop único de atualização para todos os clientes de /watch; cada
+        # ciclo também grava o histórico (vazio desliga)
+        history_dir = os.environ.get("SENTINELZERO_HISTORY_DIR", HISTORY_DIR)
+        self.hub = WatchHub(self.fetcher, history=SeriesStore(history_dir) if history_dir else None)
+
+
+_services: Optional[Services] = None
+_services_lock = threading.Lock()
+
+
+def get_services() -> Services:
+    global _services
+    if _services is None:
+        with _services_lock:
+            if _services is None:
+                _services = Services()
+    return _services
+
+
+def __getattr__(name: str):
+    # api.fetcher, api.defillama etc. continuam acessíveis como atributos do módulo
+    if name in ("defillama", "coingecko", "incidents", "engine", "fetcher", "hub"):
+        return getattr(get_services(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Requisições simultâneas pelo mesmo protocolo compartilham uma única busca
+inflight = SingleFlight()
 
 
 @app.get("/")
@@ -27,24 +92,141 @@ def root():
     return {"message": "SentinelZero API — Use /risk?protocol=<protocol_name>"}
 
 
+async def fetch_protocol(protocol: str):
+    """Busca snapshot e contexto em paralelo; HTTPException se o DefiLlama falhar."""
+    fetched = await get_services().fetcher.fetch(protocol)
+    if "defillama" in fetched.errors:
+        raise HTTPException(status_code=502, detail=f"DefiLlama unavailable: {fetched.errors['defillama']}")
+    if fetched.get("defillama") is None:
+        raise HTTPException(status_code=404, detail=f"Protocol '{protocol}' not found")
+    return fetched
+
+
+def _with_sources(report: dict, fetched) -> dict:
+    # fontes secundárias indisponíveis são sinalizadas no relatório
+    if fetched.errors:
+        report["unavailable_sources"] = sorted(fetched.errors)
+    return report
+
+
+async def score_protocol(protocol: str) -> dict:
+    fetched = await fetch_protocol(protocol)
+    snapshot = fetched.get("defillama")
+    score, signals = get_services().engine.run(snapshot)
+    return _with_sources(build_report(snapshot, score, signals), fetched)
+
+
 @app.get("/risk")
-def get_risk(protocol: Optional[str] = None):
+async def get_risk(protocol: Optional[str] = None):
     if protocol is None:
         raise HTTPException(status_code=400, detail="Missing protocol parameter")
 
     protocol = protocol.lower()
+    return await inflight.do((protocol, INTERACTIVE), lambda: score_protocol(protocol))
 
-    # Fetch snapshot e contexto
-    snapshot = defillama.fetch(protocol)
-    if snapshot is None:
-        raise HTTPException(status_code=404, detail=f"Protocol '{protocol}' not found")
 
-    market_context = coingecko.get_protocol_context(protocol)
-    incident_flags = incidents.get_incidents(protocol)
+def _error_report(protocol: str, exc: Exception) -> dict:
+    if isinstance(exc, HTTPException):
+        return {"protocol": protocol, "error": exc.detail, "status": exc.status_code}
+    # um protocolo com defeito não pode derrubar o resto do lote
+    return {"protocol": protocol, "error": f"{type(exc).__name__}: {exc}", "status": 500}
 
-    # Calcula risco
-    score, signals = engine.run(snapshot)
 
-    # Retorna JSON pronto
-    report = build_report(snapshot, score, signals)
-    return report
+def _line(report: dict) -> bytes:
+    return (json.dumps(report) + "\n").encode()
+
+
+async def _fetch_for_batch(protocol: str, priority: int = BATCH):
+    # cada task tem seu próprio contexto: as buscas do lote ficam atrás das
+    # chamadas interativas de /risk no scheduler (para fontes que passam por
+    # remote.get_json(..., source=...); os mocks de Services não passam).
+    # A chave inclui a prioridade: um /risk interativo nunca espera por um
+    # job do lote que roda com prioridade BATCH
+    request_priority.set(priority)
+    try:
+        return protocol, await inflight.do((protocol, priority), lambda: fetch_protocol(protocol))
+    except Exception as e:
+        return protocol, e
+
+
+def _score_batch(fetched: List[tuple]) -> List[dict]:
+    """
+    Pontua de uma vez os protocolos buscados (RiskEngine.run_batch) e monta
+    os relatórios pelo FindingStore. Se o lote falhar, pontua um a um para
+    isolar o protocolo com defeito.
+    """
+    ok = [(protocol, result) for protocol, result in fetched if not isinstance(result, Exception)]
+    reports = [_error_report(protocol, result) for protocol, result in fetched if isinstance(result, Exception)]
+    if not ok:
+        return reports
+    engine = get_services().engine
+    snapshots = [result.get("defillama") for _, result in ok]
+    try:
+        batch = build_batch_reports(snapshots, engine.run_batch(snapshots))
+    except Exception:
+        batch = []
+        for (protocol, result), snapshot in zip(ok, snapshots):
+            try:
+                batch.append(build_report(snapshot, *engine.run(snapshot)))
+            except Exception as e:
+                batch.append(e)
+    for (protocol, result), report in zip(ok, batch):
+        reports.append(_error_report(protocol, report) if isinstance(report, Exception)
+                       else _with_sources(report, result))
+    return reports
+
+
+async def _risk_line(protocol: str, priority: int = BATCH) -> bytes:
+    """Linha NDJSON de um protocolo, como em /risk/batch."""
+    return _line(_score_batch([await _fetch_for_batch(protocol, priority)])[0])
+
+
+async def stream_batch(protocols: Iterable[str], concurrency: int = BATCH_CONCURRENCY) -> AsyncIterator[bytes]:
+    """
+    Busca os protocolos concorrentemente e emite uma linha NDJSON por
+    protocolo assim que fica pronta (ordem de conclusão, não de entrada).
+    As buscas que terminam juntas são pontuadas num único run_batch. No
+    máximo `concurrency` jobs ficam pendentes, então a memória não cresce
+    com o tamanho do lote.
+    """
+    pending = set()
+    queue = iter(protocols)
+    try:
+        while True:
+            for protocol in queue:
+                pending.add(asyncio.ensure_future(_fetch_for_batch(protocol.lower())))
+                if len(pending) >= concurrency:
+                    break
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for report in _score_batch([task.result() for task in done]):
+                yield _line(report)
+    finally:
+        # cliente desconectou: não deixa jobs órfãos rodando
+        for task in pending:
+            task.cancel()
+
+
+@app.post("/risk/batch")
+async def get_risk_batch(request: BatchRequest):
+    return StreamingResponse(stream_batch(request.protocols), media_type="application/x-ndjson")
+
+
+@app.get("/metrics")
+def metrics():
+    # Formato de texto do Prometheus; sem amostras com SENTINELZERO_METRICS=0
+    return PlainTextResponse(instrumentation.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/watch")
+async def watch(protocols: Optional[str] = None):
+    if not protocols:
+        raise HTTPException(status_code=400, detail="Missing protocols parameter")
+
+    names = [p.strip().lower() for p in protocols.split(",") if p.strip()]
+    return StreamingResponse(
+        sse_events(get_services().hub, names),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
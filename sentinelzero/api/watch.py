@@ -0,0 +1,187 @@
+import asyncio
+import json
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set
+
+from sentinelzero.core.engine import RiskEngine
+from sentinelzero.signals.tvl_stream import TvlStreamDetector
+from sentinelzero.reports.schema import build_report
+from sentinelzero.utils.timeseries import SeriesStore
+
+WATCH_INTERVAL_SECONDS = 30.0
+HEARTBEAT_SECONDS = 15.0
+# Eventos pendentes por cliente; clientes lentos perdem os mais antigos
+CLIENT_QUEUE_SIZE = 100
+
+
+def _finding_key(finding: dict):
+    return finding["category"], finding["description"]
+
+
+def report_delta(previous: Optional[dict], current: dict) -> dict:
+    """Diferença entre dois relatórios: score e achados que entraram/saíram."""
+    before = {_finding_key(f): f for f in (previous or {}).get("risk_findings", [])}
+    after = {_finding_key(f): f for f in current["risk_findings"]}
+    return {
+        "protocol": current["protocol"],
+        "risk_score": current["risk_score"],
+        "previous_score": previous["risk_score"] if previous else None,
+        "tvl_usd": current["tvl_usd"],
+        "findings_added": [f for k, f in after.items() if k not in before],
+        "findings_removed": [f for k, f in before.items() if k not in after],
+    }
+
+
+class WatchHub:
+    """
+    Um único loop de atualização compartilhado por todos os clientes: a cada
+    intervalo busca os protocolos assinados, re-pontua só os que tiveram
+    entradas alteradas e envia deltas para as filas dos assinantes. O TVL de
+    cada ciclo alimenta o detector de drawdown em streaming do engine.
+    """
+
+    def __init__(self, fetcher, engine: Optional[RiskEngine] = None,
+                 interval: float = WATCH_INTERVAL_SECONDS, history: Optional[SeriesStore] = None):
+        self.fetcher = fetcher
+        # com um SeriesStore, cada ciclo grava TVL, preço e score do protocolo
+        self.history = history
+        self.engine = engine if engine is not None else RiskEngine(tvl_stream=TvlStreamDetector())
+        self.interval = interval
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._inputs: Dict[str, tuple] = {}
+        self._reports: Dict[str, dict] = {}
+        # último erro publicado por protocolo: o mesmo erro não é reenviado a cada ciclo
+        self._errors: Dict[str, dict] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+
+    @property
+    def protocols(self) -> List[str]:
+        return sorted(self._subscribers)
+
+    def subscribe(self, protocols: Iterable[str]) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(CLIENT_QUEUE_SIZE)
+        new = []
+        for protocol in protocols:
+            if protocol not in self._subscribers:
+                new.append(protocol)
+            self._subscribers.setdefault(protocol, set()).add(queue)
+            if protocol in self._reports:
+                self._put(queue, {"event": "snapshot", **self._reports[protocol]})
+            elif protocol in self._errors:
+                self._put(queue, self._errors[protocol])
+        if self.ensure_running():
+            # loop já estava rodando: não espera o próximo ciclo para os novos
+            for protocol in new:
+                asyncio.ensure_future(self.refresh_protocol(protocol))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        for protocol in list(self._subscribers):
+            queues = self._subscribers[protocol]
+            queues.discard(queue)
+            if not queues:
+                # ninguém mais assiste: libera o estado do protocolo
+                del self._subscribers[protocol]
+                self._inputs.pop(protocol, None)
+                self._reports.pop(protocol, None)
+                self._errors.pop(protocol, None)
+                self.engine.forget(protocol)
+        if not self._subscribers and self._task is not None:
+            # hub vazio: o loop para e volta no próximo subscribe
+            self._task.cancel()
+            self._task = None
+
+    @staticmethod
+    def _put(queue: asyncio.Queue, event: dict):
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+    def publish(self, protocol: str, event: dict):
+        for queue in self._subscribers.get(protocol, ()):
+            self._put(queue, event)
+
+    async def refresh_protocol(self, protocol: str):
+        fetched = await self.fetcher.fetch(protocol)
+        if protocol not in self._subscribers:
+            # o último assinante saiu durante a busca: não recria o estado liberado
+            return
+        snapshot = fetched.get("defillama")
+        if snapshot is None:
+            reason = fetched.errors.get("defillama", "protocol not found")
+            event = {"event": "error", "protocol": protocol, "error": reason}
+            if self._errors.get(protocol) != event:
+                self._errors[protocol] = event
+                self.publish(protocol, event)
+            return
+        self._errors.pop(protocol, None)
+
+        inputs = (snapshot, fetched.get("coingecko"), fetched.get("incidents"))
+        # com um alerta de streaming ativo, o mesmo TVL ainda conta: é o que
+        # leva o drawdown/EWMA de volta ao normal e desarma o alerta
+        if self._inputs.get(protocol) == inputs and not self.engine.stream_signals(protocol):
+            self._record(snapshot, fetched.get("coingecko"), self._reports[protocol]["risk_score"])
+            return
+        self._inputs[protocol] = inputs
+
+        score, signals = self.engine.run_incremental(snapshot)
+        self._record(snapshot, fetched.get("coingecko"), score)
+        report = build_report(snapshot, score, signals)
+        previous = self._reports.get(protocol)
+        self._reports[protocol] = report
+        delta = report_delta(previous, report)
+        if previous is None or delta["risk_score"] != delta["previous_score"] \
+                or delta["findings_added"] or delta["findings_removed"] \
+                or delta["tvl_usd"] != previous["tvl_usd"]:
+            self.publish(protocol, {"event": "update", **delta})
+
+    def _record(self, snapshot, market_context: Optional[dict], score: int):
+        if self.history is None:
+            return
+        try:
+            self.history.record(snapshot, score, market_context)
+        except (OSError, ValueError):
+            # disco cheio ou relógio voltando: o histórico não pode parar o /watch
+            pass
+
+    async def refresh_once(self):
+        self.refreshes += 1
+        await asyncio.gather(*(self.refresh_protocol(p) for p in self.protocols),
+                             return_exceptions=True)
+
+    async def run(self):
+        while self._subscribers:
+            await self.refresh_once()
+            await asyncio.sleep(self.interval)
+
+    def ensure_running(self) -> bool:
+        """Inicia o loop se necessário; retorna True se ele já estava rodando."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.run())
+            return False
+        return True
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+async def sse_events(hub: WatchHub, protocols: Iterable[str],
+                     heartbeat: float = HEARTBEAT_SECONDS) -> AsyncIterator[str]:
+    """Stream Server-Sent Events para um cliente; cancela a assinatura ao sair."""
+    queue = hub.subscribe(protocols)
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        hub.unsubscribe(queue)
@@ -2,22 +2,36 @@ from sentinelzero.utils.resolver import resolve_identifier
 from sentinelzero.signals.governance import governance_signals
 from sentinelzero.signals.oracle import oracle_signals
 from sentinelzero.scoring.calculator import calculate_risk
+from sentinelzero.utils.instrumentation import clock
+from sentinelzero.utils.profiling import get_profiler
 
 def run_unified_analysis(identifier: str) -> dict:
+    profiler = get_profiler()
+    if profiler is not None:
+        with profiler.profile(identifier):
+            return _analyze(identifier)
+    return _analyze(identifier)
+
+def _analyze(identifier: str) -> dict:
+    timer = clock()
     entity = resolve_identifier(identifier)
+    timer.lap("resolve")
 
     if entity["type"] == "unknown":
         return {"error": "Identifier not found"}
 
     signals = []
     signals.extend(governance_signals(entity))
+    timer.lap("detect", "governance")
     signals.extend(oracle_signals(entity))
+    timer.lap("detect", "oracle")
 
     score = calculate_risk(
         entity_type=entity["type"],
         tvl=entity.get("tvl"),
         signals=signals
     )
+    timer.lap("score")
 
     summary = {}
     for s in signals:
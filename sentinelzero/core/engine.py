@@ -1,14 +1,186 @@
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sentinelzero.core.models import ProtocolSnapshot, RiskSignal
+from sentinelzero.core.signal_store import FindingStore, get_catalog
 from sentinelzero.signals import liquidity, governance, oracle
 from sentinelzero.scoring.calculator import calculate_risk as calculate
+from sentinelzero.scoring.calculator import MAX_SCORE, BASE_SCORE, signal_weight, tvl_adjustment
+from sentinelzero.utils.instrumentation import clock, stage
+from sentinelzero.utils.profiling import get_profiler
+
+# numpy costs more to import than the rest of the package; it is only
+# loaded on the first run_batch
+_vectorized = None
+
+
+def _load_vectorized():
+    global _vectorized
+    if _vectorized is None:
+        try:
+            from sentinelzero.scoring import vectorized
+        except ImportError:  # numpy is optional
+            vectorized = False
+        _vectorized = vectorized
+    return _vectorized
+
+DETECTORS = (liquidity, governance, oracle)
+DETECTOR_NAMES = tuple(d.__name__.rsplit('.', 1)[-1] for d in DETECTORS)
+# Campos que alteram o score fora dos detectores
+SCORING_FIELDS = ('entity_type', 'tvl')
+
+
+@dataclass
+class BatchResult:
+    """Columnar output of RiskEngine.run_batch: row i describes protocols[i]."""
+    protocols: List[str] = field(default_factory=list)
+    scores: List[int] = field(default_factory=list)
+    signals: List[Tuple[RiskSignal, ...]] = field(default_factory=list)
+    # Same rows as signal ids in the shared catalog; reports are built from it
+    findings: Optional[FindingStore] = None
+
+    def __len__(self) -> int:
+        return len(self.protocols)
+
+    def __iter__(self) -> Iterator[Tuple[str, int, Tuple[RiskSignal, ...]]]:
+        return zip(self.protocols, self.scores, self.signals)
+
+
+@dataclass
+class _ProtocolState:
+    inputs: Dict[str, object]
+    signals: List[Tuple[RiskSignal, ...]]
+    weights: List[int]
+    adjustment: int
+
 
 class RiskEngine:
 
-    def run(self, snapshot):
+    def __init__(self, tvl_stream=None):
+        # Estado do modo incremental, por protocolo
+        self._previous: Dict[str, _ProtocolState] = {}
+        self.incremental_stats = {"detector_runs": 0, "detector_skips": 0}
+        # TvlStreamDetector opcional: no modo incremental cada snapshot vira
+        # um ponto da série de TVL e os alertas ativos entram no score
+        self.tvl_stream = tvl_stream
+
+    def run(self, snapshot: ProtocolSnapshot):
+        profiler = get_profiler()
+        if profiler is not None:
+            with profiler.profile(snapshot.name):
+                return self._run(snapshot)
+        return self._run(snapshot)
+
+    def _run(self, snapshot: ProtocolSnapshot):
         signals = []
+        timer = clock()
 
         signals.extend(liquidity.detect(snapshot))
+        timer.lap("detect", "liquidity")
         signals.extend(governance.detect(snapshot))
+        timer.lap("detect", "governance")
         signals.extend(oracle.detect(snapshot))
+        timer.lap("detect", "oracle")
 
-        score = calculate(signals)
+        score = calculate(snapshot.entity_type, snapshot.tvl, signals)
+        timer.lap("score")
         return score, signals
+
+    def run_batch(self, snapshots: Sequence[ProtocolSnapshot]) -> BatchResult:
+        snapshots = list(snapshots)
+        per_detector = []
+        for name, detector in zip(DETECTOR_NAMES, DETECTORS):
+            with stage("detect", name):
+                per_detector.append(detector.detect_batch(snapshots))
+
+        # Detectors hand back shared tuples, so most protocols end up with the
+        # same combination; concatenate and intern each distinct combination
+        # only once.
+        store = FindingStore(get_catalog())
+        intern = store.catalog.intern
+        combined: Dict[Tuple[int, ...], Tuple[Tuple[RiskSignal, ...], List[int]]] = {}
+        result = BatchResult(findings=store)
+        for i, snapshot in enumerate(snapshots):
+            parts = [column[i] for column in per_detector]
+            key = tuple(id(part) for part in parts)
+            entry = combined.get(key)
+            if entry is None:
+                signals = tuple(s for part in parts for s in part)
+                entry = combined[key] = (signals, [intern(s) for s in signals])
+
+            result.protocols.append(snapshot.name)
+            result.signals.append(entry[0])
+            store.append_ids(snapshot.name, entry[1])
+
+        with stage("score", "batch"):
+            vectorized = _load_vectorized()
+            if vectorized:
+                result.scores = vectorized.calculate_risk_many(
+                    [s.entity_type for s in snapshots],
+                    [s.tvl for s in snapshots],
+                    result.signals,
+                ).tolist()
+            else:
+                result.scores = [
+                    calculate(s.entity_type, s.tvl, signals)
+                    for s, signals in zip(snapshots, result.signals)
+                ]
+        return result
+
+    def run_incremental(self, snapshot: ProtocolSnapshot, timestamp: Optional[float] = None):
+        """
+        Como run(), mas lembra o último snapshot de cada protocolo e só
+        re-executa os detectores cujos INPUT_FIELDS mudaram; o score é
+        atualizado pela diferença de peso dos sinais. Com tvl_stream, o TVL
+        do snapshot (em `timestamp`, padrão agora) alimenta o detector de
+        streaming e os alertas ativos dele somam ao score.
+        """
+        fields = {f for d in DETECTORS for f in d.INPUT_FIELDS}
+        fields.update(SCORING_FIELDS)
+        inputs = {f: getattr(snapshot, f) for f in fields}
+
+        state = self._previous.get(snapshot.name)
+        if state is None:
+            state = _ProtocolState(inputs, [()] * len(DETECTORS), [0] * len(DETECTORS), 0)
+            changed = fields
+            self._previous[snapshot.name] = state
+        else:
+            changed = {f for f in fields if state.inputs[f] != inputs[f]}
+            state.inputs = inputs
+
+        for i, detector in enumerate(DETECTORS):
+            if changed.intersection(detector.INPUT_FIELDS):
+                with stage("detect", DETECTOR_NAMES[i]):
+                    signals = tuple(detector.detect(snapshot))
+                state.signals[i] = signals
+                state.weights[i] = signal_weight(signals)
+                self.incremental_stats["detector_runs"] += 1
+            else:
+                self.incremental_stats["detector_skips"] += 1
+
+        if changed.intersection(SCORING_FIELDS):
+            state.adjustment = tvl_adjustment(snapshot.entity_type, snapshot.tvl)
+
+        stream: List[RiskSignal] = []
+        if self.tvl_stream is not None and snapshot.tvl is not None:
+            with stage("detect", "tvl_stream"):
+                self.tvl_stream.update(snapshot.name, time.time() if timestamp is None else timestamp,
+                                       snapshot.tvl)
+                stream = self.tvl_stream.active_signals(snapshot.name)
+
+        score = min(MAX_SCORE, BASE_SCORE + sum(state.weights) + state.adjustment + signal_weight(stream))
+        return score, [s for part in state.signals for s in part] + stream
+
+    def stream_signals(self, protocol: str) -> List[RiskSignal]:
+        """Alertas de streaming em vigor (vazio sem tvl_stream)."""
+        return self.tvl_stream.active_signals(protocol) if self.tvl_stream is not None else []
+
+    def forget(self, protocol: Optional[str] = None):
+        """Descarta o estado incremental de um protocolo (ou de todos)."""
+        if protocol is None:
+            self._previous.clear()
+        else:
+            self._previous.pop(protocol, None)
+        if self.tvl_stream is not None:
+            self.tvl_stream.forget(protocol)
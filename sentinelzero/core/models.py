@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from enum import Enum
+from typing import Optional
 
 class RiskCategory(str, Enum):
     SECURITY = 'Security'
@@ -20,3 +21,29 @@ class RiskSignal:
     severity: Severity
     rationale: str
     source: str = 'heuristic'
+
+    def to_dict(self) -> dict:
+        return {
+            'category': self.category.value,
+            'description': self.description,
+            'severity': self.severity.value,
+            'rationale': self.rationale,
+            'source': self.source,
+        }
+
+@dataclass
+class ProtocolSnapshot:
+    name: str
+    category: Optional[str] = None
+    tvl: Optional[float] = None
+    tvl_change_7d: Optional[float] = None
+    entity_type: str = 'protocol'
+
+    def as_entity(self) -> dict:
+        # Signal detectors work on resolver-style entity dicts
+        return {
+            'name': self.name,
+            'type': self.entity_type,
+            'category': self.category,
+            'tvl': self.tvl,
+        }
@@ -0,0 +1,121 @@
+import threading
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sentinelzero.core.models import RiskSignal
+
+
+class SignalCatalog:
+    """
+    Interna RiskSignal e atribui a cada sinal distinto um id inteiro pequeno.
+    Descrição e rationale ficam guardadas uma única vez, aqui.
+    """
+
+    def __init__(self):
+        self._signals: List[RiskSignal] = []
+        self._ids: Dict[RiskSignal, int] = {}
+        # dict de saída de cada sinal, montado uma vez por id
+        self._findings: List[dict] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._signals)
+
+    def intern(self, signal: RiskSignal) -> int:
+        signal_id = self._ids.get(signal)
+        if signal_id is None:
+            with self._lock:
+                signal_id = self._ids.get(signal)
+                if signal_id is None:
+                    signal_id = len(self._signals)
+                    self._findings.append({
+                        "category": signal.category.value,
+                        "severity": signal.severity.value,
+                        "description": signal.description,
+                    })
+                    self._signals.append(signal)
+                    self._ids[signal] = signal_id
+        return signal_id
+
+    def get(self, signal_id: int) -> RiskSignal:
+        return self._signals[signal_id]
+
+    def finding(self, signal_id: int) -> dict:
+        # Formato de risk_findings em reports.schema.build_report; cópia,
+        # para quem recebe poder alterar o dict
+        return dict(self._findings[signal_id])
+
+    def findings(self, signals: Iterable[RiskSignal]) -> List[dict]:
+        intern, cached = self.intern, self._findings
+        return [dict(cached[intern(s)]) for s in signals]
+
+
+class FindingStore:
+    """
+    Achados por protocolo em layout colunar (CSR): `ids` concatena os ids de
+    sinal de todos os protocolos e `offsets[i]:offsets[i + 1]` delimita os do
+    protocolo i. Os ids usam 2 bytes enquanto o catálogo cabe em 65536
+    sinais e passam para 4 bytes depois disso.
+    """
+
+    def __init__(self, catalog: Optional[SignalCatalog] = None):
+        self.catalog = catalog if catalog is not None else SignalCatalog()
+        self.protocols: List[str] = []
+        self.offsets = array('Q', [0])
+        self.ids = array('H')
+
+    @classmethod
+    def from_batch(cls, result, catalog: Optional[SignalCatalog] = None) -> "FindingStore":
+        store = cls(catalog)
+        for name, _score, signals in result:
+            store.append(name, signals)
+        return store
+
+    def __len__(self) -> int:
+        return len(self.protocols)
+
+    def append(self, protocol: str, signals: Iterable[RiskSignal]):
+        self.append_ids(protocol, [self.catalog.intern(s) for s in signals])
+
+    def append_ids(self, protocol: str, ids: Sequence[int]):
+        """Como append, com ids já internados neste catálogo."""
+        if ids and self.ids.typecode == 'H' and max(ids) > 0xFFFF:
+            self.ids = array('I', self.ids)
+        self.ids.extend(ids)
+        self.offsets.append(len(self.ids))
+        self.protocols.append(protocol)
+
+    def signal_ids(self, index: int) -> Sequence[int]:
+        # cópia (array), não memoryview: uma view viva impediria append()
+        # de redimensionar self.ids
+        return self.ids[self.offsets[index]:self.offsets[index + 1]]
+
+    def signals(self, index: int) -> Tuple[RiskSignal, ...]:
+        get = self.catalog.get
+        return tuple(get(i) for i in self.signal_ids(index))
+
+    def findings(self, index: int) -> List[dict]:
+        finding = self.catalog.finding
+        return [finding(i) for i in self.signal_ids(index)]
+
+    def __iter__(self) -> Iterator[Tuple[str, Sequence[int]]]:
+        for index, protocol in enumerate(self.protocols):
+            yield protocol, self.signal_ids(index)
+
+    @property
+    def nbytes(self) -> int:
+        return self.ids.itemsize * len(self.ids) + self.offsets.itemsize * len(self.offsets)
+
+
+_default: Optional[SignalCatalog] = None
+_default_lock = threading.Lock()
+
+
+def get_catalog() -> SignalCatalog:
+    """Catálogo compartilhado pelos relatórios do processo."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = SignalCatalog()
+    return _default
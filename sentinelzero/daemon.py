@@ -0,0 +1,265 @@
+# sentinelzero/daemon.py
+
+import importlib
+import json
+import os
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+def _default_socket_path() -> str:
+    if not hasattr(os, "getuid"):  # sem sockets Unix (Windows): sempre local
+        return ""
+    # diretório só do usuário (0700), também dentro do XDG_RUNTIME_DIR: no
+    # /tmp compartilhado outro usuário não consegue criar o socket antes
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"sentinelzero-{os.getuid()}", "daemon.sock")
+
+
+# Com o daemon no ar, os CLIs de exemplo só enviam o pedido pelo socket e
+# imprimem a resposta: sem custo de import e com caches, índice de
+# entidades e pools HTTP já aquecidos no processo do daemon.
+SOCKET_PATH = os.environ.get("SENTINELZERO_DAEMON_SOCKET") or _default_socket_path()
+CONNECT_TIMEOUT = 0.5
+REQUEST_TIMEOUT = 120.0
+
+# nome do comando -> "módulo:função"; resolvidos só dentro do daemon
+COMMANDS: Dict[str, str] = {
+    "analysis": "examples.run_analysis:run_analysis",
+    "unified": "examples.run_analysis_unified:analyze",
+    "package_unified": "sentinelzero.examples.run_analysis_unified:analyze",
+}
+
+
+class DaemonUnavailable(OSError):
+    """Nenhum daemon escutando no socket: quem chama roda localmente."""
+
+
+class DaemonError(RuntimeError):
+    """O comando falhou dentro do daemon."""
+
+
+def _is_own_socket(path: str) -> bool:
+    """`path` é um socket (não segue symlink) criado por este usuário."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+
+
+def client_enabled(path: Optional[str] = None) -> bool:
+    path = SOCKET_PATH if path is None else path
+    # socket de outro usuário pode servir relatórios falsos: roda localmente
+    return (bool(path) and hasattr(socket, "AF_UNIX")
+            and os.environ.get("SENTINELZERO_DAEMON", "1") != "0" and _is_own_socket(path))
+
+
+def call(command: str, *args: Any, path: Optional[str] = None,
+         timeout: float = REQUEST_TIMEOUT) -> Any:
+    """Executa `command` no daemon e devolve o resultado (JSON)."""
+    path = SOCKET_PATH if path is None else path
+    if not client_enabled(path):
+        raise DaemonUnavailable(f"no daemon socket owned by this user at {path}")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(path)
+        except OSError as exc:
+            # socket órfão de um daemon que morreu
+            raise DaemonUnavailable(str(exc)) from exc
+        sock.settimeout(timeout)
+        try:
+            sock.sendall(json.dumps({"command": command, "args": list(args)}).encode() + b"\n")
+            with sock.makefile("rb") as stream:
+                line = stream.readline()
+            response = json.loads(line)
+        except (OSError, ValueError) as exc:
+            # timeout, conexão resetada ou resposta cortada: quem chama roda localmente
+            raise DaemonUnavailable(f"daemon did not answer: {exc}") from exc
+    finally:
+        sock.close()
+    if not response.get("ok"):
+        raise DaemonError(response.get("error", "unknown error"))
+    return response["result"]
+
+
+def run_or_local(command: str, local: Callable[..., Any], *args: Any) -> Any:
+    """Pelo daemon se houver um no ar; senão `local(*args)` neste processo."""
+    try:
+        return call(command, *args)
+    except DaemonUnavailable:
+        return local(*args)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    # uma conexão pode enviar vários pedidos, um JSON por linha
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.owner.dispatch(line)
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class Daemon:
+    """
+    Processo de longa duração que atende os comandos de COMMANDS num socket
+    Unix (permissão só do usuário). Cada pedido é uma linha
+    {"command": ..., "args": [...]} e a resposta {"ok": true, "result": ...}
+    ou {"ok": false, "error": ...}.
+    """
+
+    def __init__(self, path: str = SOCKET_PATH, commands: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.commands = dict(COMMANDS if commands is None else commands)
+        self.started_at = time.time()
+        self.requests = 0
+        self._handlers: Dict[str, Callable[..., Any]] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[_Server] = None
+
+    def handler(self, command: str) -> Callable[..., Any]:
+        func = self._handlers.get(command)
+        if func is None:
+            target = self.commands.get(command)
+            if target is None:
+                raise KeyError(f"unknown command {command!r}")
+            module, _, attr = target.partition(":")
+            func = getattr(importlib.import_module(module), attr)
+            self._handlers[command] = func
+        return func
+
+    def warm_up(self):
+        """
+        Importa os comandos e carrega o índice de entidades e a listagem do
+        DefiLlama antes do primeiro pedido.
+        """
+        for command in self.commands:
+            self.handler(command)
+
+        from sentinelzero.datasources.universe import get_universe
+        from sentinelzero.utils.entity_index import get_entity_index
+
+        get_entity_index()
+        try:
+            get_universe().refresh()
+        except Exception:
+            # upstream fora do ar: o primeiro pedido tenta de novo
+            pass
+
+    def dispatch(self, line: bytes) -> dict:
+        try:
+            request = json.loads(line)
+            command = request["command"]
+            args = request.get("args", [])
+            with self._lock:
+                self.requests += 1
+            if command == "ping":
+                result = {"pid": os.getpid(), "uptime": time.time() - self.started_at,
+                          "requests": self.requests}
+            elif command == "shutdown":
+                # shutdown() bloqueia até o loop parar: chamado de outra thread
+                threading.Thread(target=self.shutdown, daemon=True).start()
+                result = None
+            else:
+                result = self.handler(command)(*args)
+            return {"ok": True, "result": result}
+        except Exception as exc:
+            return {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+
+    def _ensure_directory(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if directory != os.path.dirname(_default_socket_path()):
+            # caminho escolhido com --socket: o diretório é de quem escolheu
+            return
+        try:
+            os.mkdir(directory, 0o700)
+        except FileExistsError:
+            pass
+        st = os.lstat(directory)
+        # diretório pré-criado por outro usuário ou aberto a outros: recusa
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+            raise OSError(f"{directory} is not a private directory owned by this user")
+
+    def bind(self):
+        self._ensure_directory()
+        if os.path.lexists(self.path):
+            if not _is_own_socket(self.path):
+                # nunca apaga um arquivo que não é um socket nosso
+                raise OSError(f"{self.path} exists and is not a socket owned by this user")
+            try:
+                call("ping", path=self.path, timeout=CONNECT_TIMEOUT)
+            except DaemonUnavailable:
+                os.unlink(self.path)
+            else:
+                raise OSError(f"a daemon is already listening on {self.path}")
+        # umask em vez de chmod depois do bind: o socket nunca fica aberto a outros usuários
+        old_umask = os.umask(0o177)
+        try:
+            self._server = _Server(self.path, _Handler)
+        finally:
+            os.umask(old_umask)
+        self._server.owner = self
+
+    def serve_forever(self):
+        if self._server is None:
+            self.bind()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if _is_own_socket(self.path):
+                os.unlink(self.path)
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+    import signal
+    import sys
+
+    parser = argparse.ArgumentParser(description="Daemon local do SentinelZero para os CLIs de análise")
+    parser.add_argument("action", nargs="?", default="serve", choices=("serve", "status", "stop"))
+    parser.add_argument("--socket", default=SOCKET_PATH)
+    args = parser.parse_args(argv)
+
+    if args.action == "serve":
+        daemon = Daemon(args.socket)
+        daemon.bind()
+        daemon.warm_up()
+        # SIGTERM encerra como Ctrl+C, removendo o socket
+        signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=daemon.shutdown).start())
+        print(f"SentinelZero daemon escutando em {args.socket}", file=sys.stderr)
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    try:
+        result = call("ping" if args.action == "status" else "shutdown", path=args.socket,
+                      timeout=CONNECT_TIMEOUT)
+    except DaemonUnavailable:
+        print(f"Nenhum daemon em {args.socket}", file=sys.stderr)
+        sys.exit(1)
+    if args.action == "status":
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
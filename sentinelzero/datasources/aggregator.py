@@ -0,0 +1,85 @@
+# sentinelzero/datasources/aggregator.py
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from sentinelzero.utils.instrumentation import record_stage
+
+DEFAULT_SOURCE_TIMEOUT = 10.0
+
+# Executor próprio: o executor padrão do asyncio.run() espera threads presas
+# em fontes lentas, o que anularia o timeout no fetch_sync.
+_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="sentinelzero-fetch")
+
+
+@dataclass
+class FetchResult:
+    """
+    Resultado de uma busca multi-fonte. Fontes que falharam ou estouraram o
+    timeout aparecem em `errors` e ficam fora de `data`.
+    """
+    protocol: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    elapsed: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def complete(self) -> bool:
+        return not self.errors
+
+    def get(self, source: str, default: Any = None) -> Any:
+        return self.data.get(source, default)
+
+
+class ParallelFetcher:
+    """
+    Busca todas as fontes de um protocolo ao mesmo tempo.
+
+    Cada fonte é um callable `fonte(protocol)`; funções síncronas (requests,
+    mocks) rodam em threads, corrotinas são aguardadas diretamente. A latência
+    total fica limitada pela fonte mais lenta (ou pelo seu timeout).
+    """
+
+    def __init__(self, sources: Mapping[str, Callable[[str], Any]],
+                 timeout: float = DEFAULT_SOURCE_TIMEOUT,
+                 timeouts: Optional[Mapping[str, float]] = None):
+        self.sources = dict(sources)
+        self.timeout = timeout
+        self.timeouts = dict(timeouts or {})
+
+    async def _call(self, name: str, func: Callable[[str], Any], protocol: str) -> Any:
+        timeout = self.timeouts.get(name, self.timeout)
+        if asyncio.iscoroutinefunction(func):
+            return await asyncio.wait_for(func(protocol), timeout)
+        loop = asyncio.get_running_loop()
+        # propaga contextvars (ex.: prioridade do scheduler) para a thread
+        ctx = contextvars.copy_context()
+        return await asyncio.wait_for(loop.run_in_executor(_EXECUTOR, ctx.run, func, protocol), timeout)
+
+    async def _timed(self, name: str, func: Callable[[str], Any], protocol: str, result: FetchResult):
+        start = time.perf_counter()
+        try:
+            result.data[name] = await self._call(name, func, protocol)
+        except asyncio.TimeoutError:
+            result.errors[name] = f"timeout after {self.timeouts.get(name, self.timeout)}s"
+        except Exception as e:
+            result.errors[name] = f"{type(e).__name__}: {e}"
+        finally:
+            result.elapsed[name] = time.perf_counter() - start
+            record_stage("fetch", name, result.elapsed[name])
+
+    async def fetch(self, protocol: str) -> FetchResult:
+        result = FetchResult(protocol=protocol)
+        await asyncio.gather(*(
+            self._timed(name, func, protocol, result)
+            for name, func in self.sources.items()
+        ))
+        return result
+
+    def fetch_sync(self, protocol: str) -> FetchResult:
+        """Atalho para código síncrono (CLI, scripts)."""
+        return asyncio.run(self.fetch(protocol))
@@ -21,3 +21,9 @@ class CoinGeckoSource:
         Retorna preço fixo para um símbolo. Se não existir, retorna None.
         """
         return self.price_data.get(symbol.lower())
+
+    def get_protocol_context(self, protocol_name: str) -> dict:
+        """
+        Contexto de mercado usado junto do snapshot do DefiLlama.
+        """
+        return {"price_usd": self.get_price(protocol_name)}
@@ -2,13 +2,17 @@
 
 from typing import Optional
 
+from sentinelzero.core.models import ProtocolSnapshot
+
 class DefiLlamaSource:
     """
     Mock/fake source para testes.
     Retorna valores de TVL fixos para que a suíte de testes funcione sem conexão externa.
     """
 
-    def __init__(self):
+    def __init__(self, universe=None):
+        # Com um DefiLlamaUniverse, os dados vêm da listagem real em massa
+        self.universe = universe
         # Opcional: dicionário de TVL fixo para símbolos de teste
         self.tvl_data = {
             "aave": 3_000_000_000,
@@ -20,4 +24,18 @@ class DefiLlamaSource:
         """
         Retorna TVL fixo para um símbolo. Se não existir, retorna None.
         """
+        if self.universe is not None:
+            entry = self.universe.lookup(symbol)
+            return entry.get("tvl") if entry else None
         return self.tvl_data.get(symbol.lower())
+
+    def fetch(self, protocol_name: str) -> Optional[ProtocolSnapshot]:
+        """
+        Retorna o snapshot do protocolo ou None se ele não for conhecido.
+        """
+        if self.universe is not None:
+            return self.universe.snapshot(protocol_name)
+        tvl = self.get_tvl(protocol_name)
+        if tvl is None:
+            return None
+        return ProtocolSnapshot(name=protocol_name.lower(), tvl=tvl)
@@ -0,0 +1,200 @@
+# sentinelzero/datasources/http_cache.py
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+from urllib.parse import urlencode
+
+from sentinelzero.datasources.scheduler import BATCH, request_priority
+from sentinelzero.utils.cache import get_default_cache
+from sentinelzero.utils.instrumentation import cache_lookup
+
+# (max_age, stale_while_revalidate) em segundos, por fonte
+HTTP_CACHE_POLICIES: Dict[str, Tuple[float, float]] = {
+    "defillama": (5 * 60, 60 * 60),
+    "coingecko": (60, 5 * 60),
+    "dexscreener": (30, 2 * 60),
+}
+DEFAULT_POLICY = (60, 10 * 60)
+KEY_PREFIX = "http:"
+# O corpo fica numa chave própria: um 304 regrava só os metadados
+DATA_SUFFIX = "#data"
+
+# Revalidações em background; o rate limit continua sendo o do scheduler
+_REVALIDATOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="sentinelzero-revalidate")
+
+# fetch(headers) -> resposta do http_client (status 200 ou 304)
+Fetch = Callable[[Dict[str, str]], Any]
+
+
+@dataclass
+class CachedResponse:
+    data: Any
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.time() if now is None else now) - self.fetched_at
+
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    Cache HTTP com validadores sobre o cache chave/valor (utils.cache).
+
+    - dentro de max_age: serve do cache sem rede
+    - até max_age + stale_while_revalidate: serve o valor antigo e revalida
+      em background
+    - depois disso (ou sem entrada): requisição condicional síncrona
+    - 304 renova a entrada sem baixar nem regravar o corpo
+    - erro na revalidação com entrada em cache: serve o valor antigo
+    """
+
+    def __init__(self, store=None):
+        self._store = store
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self.stats = {"hits": 0, "stale_hits": 0, "not_modified": 0, "downloads": 0, "errors": 0}
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = get_default_cache()
+        return self._store
+
+    @staticmethod
+    def key(url: str, params: Optional[Mapping[str, Any]] = None) -> str:
+        if params:
+            url = f"{url}?{urlencode(sorted(params.items()))}"
+        return KEY_PREFIX + url
+
+    def load(self, key: str) -> Optional[CachedResponse]:
+        found = self.store.get_many([key, key + DATA_SUFFIX])
+        raw = found.get(key)
+        if raw is None:
+            return None
+        try:
+            # entradas antigas foram gravadas como texto JSON, com o corpo junto
+            meta = json.loads(raw) if isinstance(raw, str) else dict(raw)
+            if "data" not in meta:
+                if key + DATA_SUFFIX not in found:
+                    return None
+                meta["data"] = found[key + DATA_SUFFIX]
+            return CachedResponse(**meta)
+        except (ValueError, TypeError):
+            return None
+
+    @staticmethod
+    def _meta(entry: CachedResponse) -> dict:
+        return {"fetched_at": entry.fetched_at, "etag": entry.etag, "last_modified": entry.last_modified}
+
+    def save(self, key: str, entry: CachedResponse):
+        # o cache grava em binário compactado: sem JSON para (de)serializar
+        self.store.set_many({key: self._meta(entry), key + DATA_SUFFIX: entry.data})
+
+    def touch(self, key: str, entry: CachedResponse):
+        """Renova só os metadados; o corpo (vários MB no /protocols) não é regravado."""
+        self.store.set(key, self._meta(entry))
+        self.store.touch([key + DATA_SUFFIX])
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def get_json(self, url: str, fetch: Fetch, params: Optional[Mapping[str, Any]] = None,
+                 max_age: float = DEFAULT_POLICY[0],
+                 stale_while_revalidate: float = DEFAULT_POLICY[1]) -> Any:
+        return self.get_entry(url, fetch, params, max_age, stale_while_revalidate).data
+
+    def get_entry(self, url: str, fetch: Fetch, params: Optional[Mapping[str, Any]] = None,
+                  max_age: float = DEFAULT_POLICY[0],
+                  stale_while_revalidate: float = DEFAULT_POLICY[1]) -> CachedResponse:
+        """Como get_json, mas com `fetched_at`: um valor stale mantém a idade real."""
+        key = self.key(url, params)
+        entry = self.load(key)
+        if entry is not None:
+            age = entry.age()
+            if age < max_age:
+                self._count("hits")
+                cache_lookup("http", hits=1)
+                return entry
+            if age < max_age + stale_while_revalidate:
+                self._count("stale_hits")
+                cache_lookup("http", hits=1)
+                self._revalidate_in_background(key, fetch, entry)
+                return entry
+        cache_lookup("http", misses=1)
+        try:
+            return self.revalidate(key, fetch, entry)
+        except Exception:
+            if entry is None:
+                raise
+            self._count("errors")
+            return entry
+
+    def revalidate(self, key: str, fetch: Fetch, entry: Optional[CachedResponse]) -> CachedResponse:
+        response = fetch(entry.validators() if entry is not None else {})
+        now = time.time()
+        if response.status_code == 304 and entry is not None:
+            self._count("not_modified")
+            # nova entrada em vez de alterar a que outras threads já receberam;
+            # o servidor pode rotacionar o ETag mesmo num 304
+            entry = CachedResponse(
+                data=entry.data,
+                fetched_at=now,
+                etag=response.headers.get("ETag", entry.etag),
+                last_modified=response.headers.get("Last-Modified", entry.last_modified),
+            )
+            self.touch(key, entry)
+            return entry
+        self._count("downloads")
+        entry = CachedResponse(
+            data=response.json(),
+            fetched_at=now,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        self.save(key, entry)
+        return entry
+
+    def _revalidate_in_background(self, key: str, fetch: Fetch, entry: CachedResponse):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            request_priority.set(BATCH)
+            try:
+                self.revalidate(key, fetch, entry)
+            except Exception:
+                self._count("errors")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        _REVALIDATOR.submit(run)
+
+
+_default: Optional[HttpCache] = None
+_default_lock = threading.Lock()
+
+
+def get_http_cache() -> HttpCache:
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = HttpCache()
+    return _default
@@ -0,0 +1,123 @@
+# sentinelzero/datasources/http_client.py
+
+import importlib.util
+import os
+import threading
+from typing import Any, Dict, Optional
+
+# Timeout de conexão separado do de leitura: um host fora do ar falha
+# rápido sem encurtar respostas grandes (ex.: /protocols)
+CONNECT_TIMEOUT = float(os.environ.get("SENTINELZERO_HTTP_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.environ.get("SENTINELZERO_HTTP_READ_TIMEOUT", "10"))
+# Pools mantidos (um por host) e conexões keep-alive por host; com o pool
+# cheio, a requisição espera uma conexão livre em vez de abrir outra
+POOL_HOSTS = 10
+MAX_PER_HOST = int(os.environ.get("SENTINELZERO_HTTP_MAX_PER_HOST", "8"))
+# HTTP/2 via httpx quando httpx e h2 estão instalados; "0" força o requests
+HTTP2 = os.environ.get("SENTINELZERO_HTTP2", "1") != "0"
+
+USER_AGENT = "sentinelzero/0.1"
+
+
+def http2_available() -> bool:
+    return all(importlib.util.find_spec(name) is not None for name in ("httpx", "h2"))
+
+
+class HttpClient:
+    """
+    Cliente HTTP compartilhado por todas as fontes: conexões keep-alive
+    reaproveitadas entre chamadas (sem handshake TCP+TLS a cada busca),
+    limite de conexões por host e timeouts de conexão/leitura separados.
+
+    Erros seguem o contrato do requests em qualquer backend: status >= 400
+    levanta requests.HTTPError (com .response) e falhas de rede levantam
+    requests.ConnectionError/Timeout, todos OSError, como o scheduler espera.
+    """
+
+    def __init__(self, connect_timeout: float = CONNECT_TIMEOUT, read_timeout: float = READ_TIMEOUT,
+                 pool_hosts: int = POOL_HOSTS, max_per_host: int = MAX_PER_HOST,
+                 http2: Optional[bool] = None):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.pool_hosts = pool_hosts
+        self.max_per_host = max_per_host
+        self.http2 = (HTTP2 and http2_available()) if http2 is None else http2
+        self._client = self._httpx_client() if self.http2 else self._requests_session()
+
+    def _requests_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_hosts, pool_maxsize=self.max_per_host,
+                              pool_block=True, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["User-Agent"] = USER_AGENT
+        return session
+
+    def _httpx_client(self):
+        import httpx
+
+        # httpx limita o total de conexões, não por host; com HTTP/2 cada
+        # host usa uma conexão multiplexada
+        limits = httpx.Limits(max_connections=self.pool_hosts * self.max_per_host,
+                              max_keepalive_connections=self.pool_hosts * self.max_per_host)
+        return httpx.Client(http2=True, limits=limits, headers={"User-Agent": USER_AGENT},
+                            timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout))
+
+    def get(self, url: str, params: Optional[dict] = None, headers: Optional[Dict[str, str]] = None,
+            timeout: Optional[float] = None) -> Any:
+        """GET; `timeout` substitui só o de leitura. 304 não é erro."""
+        read_timeout = self.read_timeout if timeout is None else timeout
+        if self.http2:
+            return self._get_httpx(url, params, headers, read_timeout)
+        response = self._client.get(url, params=params, headers=headers,
+                                    timeout=(min(self.connect_timeout, read_timeout), read_timeout))
+        response.raise_for_status()
+        return response
+
+    def _get_httpx(self, url, params, headers, read_timeout):
+        import httpx
+        import requests
+
+        try:
+            response = self._client.get(url, params=params, headers=headers,
+                                        timeout=httpx.Timeout(read_timeout,
+                                                              connect=min(self.connect_timeout, read_timeout)))
+        except httpx.TimeoutException as exc:
+            raise requests.Timeout(str(exc)) from exc
+        except httpx.TransportError as exc:
+            raise requests.ConnectionError(str(exc)) from exc
+        if response.status_code >= 400:
+            raise requests.HTTPError(f"{response.status_code} Error for url: {url}", response=response)
+        return response
+
+    def close(self):
+        self._client.close()
+
+
+_default: Optional[HttpClient] = None
+_default_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Cliente compartilhado do processo, criado na primeira requisição."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = HttpClient()
+    return _default
+
+
+def _reset_after_fork():
+    # o filho não pode reaproveitar sockets abertos pelo pai (ex.: workers
+    # do simulador): descarta o cliente sem fechar as conexões do pai
+    global _default, _default_lock
+    _default = None
+    _default_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
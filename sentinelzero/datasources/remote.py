@@ -0,0 +1,96 @@
+# sentinelzero/datasources/remote.py
+
+from typing import Any, Optional
+
+from sentinelzero.datasources.http_cache import (DEFAULT_POLICY, HTTP_CACHE_POLICIES, CachedResponse,
+                                                 get_http_cache)
+from sentinelzero.datasources.http_client import get_http_client
+from sentinelzero.datasources.scheduler import get_scheduler
+
+DEFILLAMA_API = "https://api.llama.fi"
+COINGECKO_API = "https://api.coingecko.com/api/v3"
+DEXSCREENER_API = "https://api.dexscreener.io"
+DEFAULT_TIMEOUT = 10
+
+
+def _request(url: str, timeout: float, params: Optional[dict],
+             headers: Optional[dict] = None) -> Any:
+    # conexão keep-alive do cliente compartilhado; status >= 400 levanta
+    # requests.HTTPError, 304 volta como resposta
+    return get_http_client().get(url, params=params, headers=headers, timeout=timeout)
+
+
+def _get_json(url: str, timeout: float, params: Optional[dict]) -> Any:
+    return _request(url, timeout, params).json()
+
+
+def get_json(url: str, timeout: float = DEFAULT_TIMEOUT, params: Optional[dict] = None,
+             source: Optional[str] = None, priority: Optional[int] = None,
+             cached: bool = False) -> Any:
+    """
+    GET com resposta JSON. Com `source`, a chamada passa pelo scheduler
+    (rate limit da fonte, prioridade e retry). Com `cached`, a resposta
+    passa pelo cache HTTP (ETag/Last-Modified, stale-while-revalidate)
+    com a política da fonte.
+    """
+    if cached:
+        return get_cached(url, timeout, params, source, priority).data
+    if source is None:
+        return _get_json(url, timeout, params)
+    return get_scheduler().call(source, _get_json, url, timeout, params, priority=priority)
+
+
+def get_cached(url: str, timeout: float = DEFAULT_TIMEOUT, params: Optional[dict] = None,
+               source: Optional[str] = None, priority: Optional[int] = None) -> CachedResponse:
+    """get_json(cached=True) devolvendo a entrada do cache (`data` e `fetched_at`)."""
+    def fetch(headers):
+        if source is None:
+            return _request(url, timeout, params, headers)
+        return get_scheduler().call(source, _request, url, timeout, params, headers, priority=priority)
+
+    max_age, stale = HTTP_CACHE_POLICIES.get(source, DEFAULT_POLICY)
+    return get_http_cache().get_entry(url, fetch, params, max_age, stale)
+
+
+def fetch_defillama(protocol_or_address: str, base_url: str = DEFILLAMA_API,
+                    timeout: float = DEFAULT_TIMEOUT, priority: Optional[int] = None,
+                    universe=None) -> dict:
+    """
+    Com `universe` (DefiLlamaUniverse), o TVL vem da listagem em massa já
+    carregada e só protocolos fora dela custam uma chamada /protocol/{slug}.
+    """
+    if universe is not None:
+        entry = universe.lookup(protocol_or_address)
+        if entry is not None:
+            return {"tvl_usd": entry.get("tvl", 0), "name": protocol_or_address}
+    data = fetch_protocol_detail(protocol_or_address, base_url, timeout, priority)
+    return {"tvl_usd": data.get("tvl", 0), "name": protocol_or_address}
+
+
+def fetch_protocol_detail(slug: str, base_url: str = DEFILLAMA_API,
+                          timeout: float = DEFAULT_TIMEOUT, priority: Optional[int] = None) -> dict:
+    """Detalhe completo (histórico de TVL, TVL por chain...) que /protocols não traz."""
+    return get_json(f"{base_url}/protocol/{slug}", timeout, source="defillama", priority=priority,
+                    cached=True)
+
+
+def fetch_coingecko(token_id: str, base_url: str = COINGECKO_API,
+                    timeout: float = DEFAULT_TIMEOUT, priority: Optional[int] = None) -> Optional[dict]:
+    """
+    Retorna preço e market cap. None se o token não existir na CoinGecko.
+    """
+    token_id = token_id.lower().replace(" ", "-")
+    params = {"ids": token_id, "vs_currencies": "usd", "include_market_cap": "true"}
+    data = get_json(f"{base_url}/simple/price", timeout, params=params,
+                    source="coingecko", priority=priority).get(token_id, {})
+    if not data:
+        return None
+    return {"price_usd": data.get("usd"), "market_cap_usd": data.get("usd_market_cap")}
+
+
+def fetch_dexscreener(token_address: str, base_url: str = DEXSCREENER_API,
+                      timeout: float = DEFAULT_TIMEOUT, priority: Optional[int] = None) -> dict:
+    data = get_json(f"{base_url}/latest/dex/tokens/{token_address}", timeout,
+                    source="dexscreener", priority=priority)
+    pair = (data.get("pairs") or [{}])[0]
+    return {"volume_24h_usd": pair.get("volumeUsd", 0)}
@@ -0,0 +1,253 @@
+# sentinelzero/datasources/scheduler.py
+
+import contextvars
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Tuple
+
+from sentinelzero.utils.instrumentation import upstream_request, upstream_retry
+
+# Prioridades: números menores saem primeiro
+INTERACTIVE = 0
+BATCH = 1
+
+# Prioridade padrão das chamadas feitas no contexto atual (ex.: /risk/batch
+# marca BATCH antes de disparar as buscas)
+request_priority: contextvars.ContextVar = contextvars.ContextVar("request_priority", default=INTERACTIVE)
+
+# (requisições por segundo, burst) por fonte upstream
+DEFAULT_LIMITS: Dict[str, Tuple[float, int]] = {
+    "defillama": (5.0, 10),
+    "coingecko": (0.5, 5),
+    "dexscreener": (5.0, 10),
+}
+DEFAULT_LIMIT = (2.0, 5)
+MAX_WORKERS = 8
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 30.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, now: Optional[float] = None) -> float:
+        """Consome um token; retorna 0 se conseguiu ou os segundos até o próximo."""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def delay(self, seconds: float):
+        """Esvazia o bucket por `seconds` (ex.: Retry-After de um 429)."""
+        self._refill(time.monotonic())
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+def retry_after(exc: Exception) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    value = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def should_retry(exc: Exception) -> bool:
+    """Erros de rede e status transitórios (429/5xx) são repetidos."""
+    response = getattr(exc, "response", None)
+    if response is not None:
+        return getattr(response, "status_code", None) in RETRY_STATUS
+    # exceções do requests (ConnectionError, Timeout...) herdam de OSError
+    return isinstance(exc, OSError)
+
+
+@dataclass
+class _Job:
+    source: str
+    func: Callable[..., Any]
+    args: tuple
+    kwargs: dict
+    priority: int
+    seq: int
+    future: Future = field(default_factory=Future)
+    attempt: int = 0
+
+
+class RequestScheduler:
+    """
+    Agenda chamadas às APIs externas:
+    - token bucket por fonte (respeita a cota de cada upstream)
+    - filas por prioridade: INTERACTIVE passa na frente de BATCH
+    - concorrência limitada a `max_workers` chamadas simultâneas
+    - retry com backoff exponencial e jitter (full jitter)
+    """
+
+    def __init__(self, limits: Optional[Mapping[str, Tuple[float, int]]] = None,
+                 max_workers: int = MAX_WORKERS, max_retries: int = MAX_RETRIES,
+                 backoff_base: float = BACKOFF_BASE_SECONDS, backoff_max: float = BACKOFF_MAX_SECONDS,
+                 retry_if: Callable[[Exception], bool] = should_retry):
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_if = retry_if
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._queues: Dict[int, Dict[str, Deque[_Job]]] = {}
+        self._delayed: List[Tuple[float, int, _Job]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._workers: List[threading.Thread] = []
+        self._closed = False
+
+    def _bucket(self, source: str) -> TokenBucket:
+        bucket = self._buckets.get(source)
+        if bucket is None:
+            bucket = self._buckets[source] = TokenBucket(*self.limits.get(source, DEFAULT_LIMIT))
+        return bucket
+
+    def _start_workers(self):
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(target=self._work, name=f"sentinelzero-scheduler-{len(self._workers)}",
+                                      daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def submit(self, source: str, func: Callable[..., Any], *args,
+               priority: Optional[int] = None, **kwargs) -> Future:
+        priority = request_priority.get() if priority is None else priority
+        with self._cond:
+            job = _Job(source, func, args, kwargs, priority, next(self._seq))
+            if self._closed:
+                raise RuntimeError("scheduler is shut down")
+            self._enqueue(job)
+            self._start_workers()
+            self._cond.notify()
+        return job.future
+
+    def call(self, source: str, func: Callable[..., Any], *args,
+             priority: Optional[int] = None, **kwargs) -> Any:
+        return self.submit(source, func, *args, priority=priority, **kwargs).result()
+
+    def pending(self) -> int:
+        with self._cond:
+            return sum(len(q) for lanes in self._queues.values() for q in lanes.values()) + len(self._delayed)
+
+    def shutdown(self, wait: bool = True):
+        """Para os workers; jobs ainda na fila falham com RuntimeError."""
+        with self._cond:
+            self._closed = True
+            dropped = [job for lanes in self._queues.values() for q in lanes.values() for job in q]
+            dropped += [job for _, _, job in self._delayed]
+            self._queues.clear()
+            self._delayed = []
+            self._cond.notify_all()
+        # fora do lock: callbacks das futures podem chamar o scheduler
+        for job in dropped:
+            if not job.future.done():
+                job.future.set_exception(RuntimeError("scheduler shut down"))
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def _enqueue(self, job: _Job):
+        queue = self._queues.setdefault(job.priority, {}).setdefault(job.source, deque())
+        if job.attempt:
+            # retries voltam na frente da sua fila
+            queue.appendleft(job)
+        else:
+            queue.append(job)
+
+    def _next_job(self) -> Tuple[Optional[_Job], float]:
+        """Escolhe o próximo job executável; senão, quanto tempo esperar."""
+        now = time.monotonic()
+        while self._delayed and self._delayed[0][0] <= now:
+            self._enqueue(heapq.heappop(self._delayed)[2])
+
+        wait = self._delayed[0][0] - now if self._delayed else None
+        for priority in sorted(self._queues):
+            lanes = self._queues[priority]
+            # entre fontes da mesma prioridade, o job mais antigo primeiro
+            for source, queue in sorted(lanes.items(), key=lambda item: item[1][0].seq):
+                delay = self._bucket(source).try_acquire(now)
+                if delay == 0:
+                    job = queue.popleft()
+                    if not queue:
+                        del lanes[source]
+                    if not lanes:
+                        del self._queues[priority]
+                    return job, 0.0
+                wait = delay if wait is None else min(wait, delay)
+        return None, wait
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        return
+                    job, wait = self._next_job()
+                    if job is not None:
+                        break
+                    self._cond.wait(wait)
+            self._run(job)
+
+    def _run(self, job: _Job):
+        if job.attempt == 0 and not job.future.set_running_or_notify_cancel():
+            return
+        start = time.perf_counter()
+        try:
+            result = job.func(*job.args, **job.kwargs)
+        except Exception as exc:
+            upstream_request(job.source, time.perf_counter() - start, ok=False)
+            if job.attempt < self.max_retries and self.retry_if(exc):
+                self._retry(job, exc)
+            else:
+                job.future.set_exception(exc)
+            return
+        upstream_request(job.source, time.perf_counter() - start, ok=True)
+        job.future.set_result(result)
+
+    def _retry(self, job: _Job, exc: Exception):
+        upstream_retry(job.source)
+        job.attempt += 1
+        backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** job.attempt))
+        hint = retry_after(exc)
+        with self._cond:
+            if hint is not None:
+                self._bucket(job.source).delay(hint)
+                backoff = max(backoff, hint)
+            # a Future já está RUNNING; o job volta para a fila como pendente
+            heapq.heappush(self._delayed, (time.monotonic() + backoff, job.seq, job))
+            self._cond.notify()
+
+
+_default: Optional[RequestScheduler] = None
+_default_lock = threading.Lock()
+
+
+def get_scheduler() -> RequestScheduler:
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = RequestScheduler()
+    return _default
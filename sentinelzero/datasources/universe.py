@@ -0,0 +1,191 @@
+# sentinelzero/datasources/universe.py
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sentinelzero.core.models import ProtocolSnapshot
+from sentinelzero.datasources import remote
+from sentinelzero.utils import codec
+
+UNIVERSE_TTL_SECONDS = 60 * 60
+# Arquivo da listagem usado pelo universo padrão (get_universe); lido a cada
+# criação, então quem define a variável antes (ex.: o simulador) vale
+# também para os workers
+CACHE_PATH_ENV = "SENTINELZERO_UNIVERSE_CACHE"
+# Com a listagem stale servida pelo cache HTTP (revalidando em background),
+# espera isso antes de perguntar de novo
+STALE_RECHECK_SECONDS = 30
+
+
+def _norm(value) -> Optional[str]:
+    if not value or not isinstance(value, str) or value == "-":
+        return None
+    return value.strip().lower()
+
+
+class DefiLlamaUniverse:
+    """
+    Índice em memória da listagem completa do DefiLlama (/protocols).
+
+    Uma única chamada traz todos os protocolos; as consultas por slug,
+    símbolo, nome, id CoinGecko ou endereço de contrato são buscas em dict.
+    Opcionalmente persiste a listagem em `cache_path` ({"timestamp", "data"},
+    codificado com utils.codec; o JSON usado pelo simulador também é lido).
+    """
+
+    def __init__(self, base_url: str = remote.DEFILLAMA_API, ttl: float = UNIVERSE_TTL_SECONDS,
+                 cache_path: Optional[str] = None):
+        self.base_url = base_url
+        self.ttl = ttl
+        self.cache_path = cache_path
+        self.loaded_at: Optional[float] = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._by_slug: Dict[str, dict] = {}
+        self._index: Dict[str, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_slug)
+
+    def load(self, entries: Iterable[dict], loaded_at: Optional[float] = None):
+        by_slug: Dict[str, dict] = {}
+        index: Dict[str, dict] = {}
+
+        def add(key, entry):
+            key = _norm(key)
+            if key is None:
+                return
+            # chaves ambíguas (ex.: o mesmo símbolo em vários protocolos)
+            # ficam com o de maior TVL
+            current = index.get(key)
+            if current is None or (entry.get("tvl") or 0) > (current.get("tvl") or 0):
+                index[key] = entry
+
+        entries = [e for e in entries if _norm(e.get("slug"))]
+        for entry in entries:
+            by_slug[_norm(entry["slug"])] = entry
+        for entry in entries:
+            add(entry.get("name"), entry)
+            add(entry.get("symbol"), entry)
+            add(entry.get("gecko_id"), entry)
+            address = _norm(entry.get("address"))
+            if address:
+                add(address, entry)
+                # "ethereum:0xabc" também responde por "0xabc"
+                add(address.split(":", 1)[-1], entry)
+        # slug sempre tem precedência sobre as demais chaves
+        index.update(by_slug)
+
+        with self._lock:
+            self._by_slug = by_slug
+            self._index = index
+            self.loaded_at = time.time() if loaded_at is None else loaded_at
+
+    def is_fresh(self) -> bool:
+        return self.loaded_at is not None and time.time() - self.loaded_at < self.ttl
+
+    def _recently_checked(self) -> bool:
+        return self._checked_at is not None and time.time() - self._checked_at < STALE_RECHECK_SECONDS
+
+    def refresh(self, force: bool = False):
+        if not force and (self.is_fresh() or self._recently_checked()):
+            return
+        with self._refresh_lock:
+            # outra thread pode ter atualizado enquanto esperávamos o lock
+            if not force and (self.is_fresh() or self._recently_checked()):
+                return
+            if not force and self._load_cache_file():
+                return
+            # payload de vários MB: sem mudanças, a revalidação custa um 304
+            cached = remote.get_cached(f"{self.base_url}/protocols", source="defillama")
+            self._checked_at = time.time()
+            if cached.fetched_at == self.loaded_at:
+                # mesma listagem stale de antes: nada a reindexar
+                return
+            # loaded_at é a hora da busca, não a de agora: uma listagem stale
+            # servida pelo cache continua com a idade real
+            self.load(cached.data, cached.fetched_at)
+            self._save_cache_file(cached.data, cached.fetched_at)
+
+    def lookup_cached(self, key: str) -> Optional[dict]:
+        """
+        Como lookup, mas sem rede: usa a listagem já carregada ou, na falta
+        dela, o arquivo de cache. Para o caminho de análise, que não pode
+        baixar a listagem inteira por entidade.
+        """
+        if self.loaded_at is None and not self._recently_checked():
+            with self._refresh_lock:
+                if self.loaded_at is None and not self._recently_checked():
+                    if not self._load_cache_file():
+                        self._checked_at = time.time()
+        key = _norm(key)
+        return self._index.get(key) if key else None
+
+    def _load_cache_file(self) -> bool:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return False
+        try:
+            with open(self.cache_path, "rb") as f:
+                blob = f.read()
+            # binário (utils.codec) ou o JSON gravado por versões anteriores
+            cached = codec.decode(blob) if codec.is_encoded(blob) else json.loads(blob)
+            loaded_at = datetime.fromisoformat(cached["timestamp"]).timestamp()
+            entries = cached["data"]
+            if isinstance(entries, str):
+                entries = json.loads(entries)
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        if time.time() - loaded_at >= self.ttl:
+            return False
+        self.load(entries, loaded_at)
+        return True
+
+    def _save_cache_file(self, entries: List[dict], fetched_at: float):
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        blob = codec.encode({"timestamp": datetime.fromtimestamp(fetched_at).isoformat(), "data": entries})
+        tmp = f"{self.cache_path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, self.cache_path)
+
+    def lookup(self, key: str) -> Optional[dict]:
+        """Slug, símbolo, nome, id CoinGecko ou endereço (com ou sem chain:)."""
+        try:
+            self.refresh()
+        except Exception:
+            # upstream fora do ar: segue com a listagem antiga, se houver
+            if self.loaded_at is None:
+                raise
+        key = _norm(key)
+        return self._index.get(key) if key else None
+
+    def snapshot(self, key: str) -> Optional[ProtocolSnapshot]:
+        entry = self.lookup(key)
+        if entry is None:
+            return None
+        return ProtocolSnapshot(
+            name=entry["slug"],
+            category=entry.get("category"),
+            tvl=entry.get("tvl"),
+            tvl_change_7d=entry.get("change_7d"),
+        )
+
+
+_default: Optional[DefiLlamaUniverse] = None
+_default_lock = threading.Lock()
+
+
+def get_universe() -> DefiLlamaUniverse:
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = DefiLlamaUniverse(cache_path=os.environ.get(CACHE_PATH_ENV) or None)
+    return _default
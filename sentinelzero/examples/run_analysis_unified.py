@@ -1,8 +1,8 @@
 import sys
 import json
 from sentinelzero.core.models import RiskSignal
-from signals.governance import governance_signals
-from scoring.calculator import calculate_risk
+from sentinelzero.signals.governance import governance_signals
+from sentinelzero.scoring.calculator import calculate_risk
 
 ENTITIES = {
     'aave': {'name': 'Aave', 'type': 'protocol', 'tvl': 3_000_000_000},
@@ -10,7 +10,7 @@ ENTITIES = {
     'link': {'name': 'Chainlink', 'type': 'token'}
 }
 
-def run_analysis(symbol: str):
+def analyze(symbol: str) -> dict:
     entity = ENTITIES.get(symbol.lower(), {'name': symbol, 'type': 'unknown'})
     signals: list[RiskSignal] = []
 
@@ -25,11 +25,15 @@ def run_analysis(symbol: str):
         'risk_findings': [s.__dict__ for s in signals],
         'risk_score': score
     }
+    return result
 
-    print(json.dumps(result, indent=2))
+def run_analysis(symbol: str):
+    print(json.dumps(analyze(symbol), indent=2))
 
 if __name__ == '__main__':
     if len(sys.argv) != 2:
         print('Usage: python run_analysis_unified.py <symbol>')
         sys.exit(1)
-    run_analysis(sys.argv[1])
+    # com o daemon no ar (python -m sentinelzero.daemon) a análise roda lá
+    from sentinelzero import daemon
+    print(json.dumps(daemon.run_or_local('package_unified', analyze, sys.argv[1]), indent=2))
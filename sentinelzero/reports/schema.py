@@ -1,16 +1,31 @@
-def build_report(snapshot, score, signals):
+from sentinelzero.core.signal_store import FindingStore, get_catalog
+from sentinelzero.utils.instrumentation import timed
+
+
+def _report(snapshot, score, findings):
     return {
         "protocol": snapshot.name,
         "category": snapshot.category,
         "tvl_usd": snapshot.tvl,
         "tvl_change_7d_pct": snapshot.tvl_change_7d,
         "risk_score": score,
-        "risk_findings": [
-            {
-                "category": s.category.value,
-                "severity": s.severity.value,
-                "description": s.description,
-            }
-            for s in signals
-        ],
+        "risk_findings": findings,
     }
+
+
+@timed("report")
+def build_report(snapshot, score, signals):
+    # os dicts de cada achado vêm do catálogo de sinais (montados uma vez por sinal)
+    return _report(snapshot, score, get_catalog().findings(signals))
+
+
+@timed("report", "batch")
+def build_batch_reports(snapshots, result):
+    """Relatórios de um RiskEngine.run_batch, materializados a partir do FindingStore."""
+    store = result.findings
+    if store is None:
+        store = FindingStore.from_batch(result, get_catalog())
+    return [
+        _report(snapshot, score, store.findings(i))
+        for i, (snapshot, score) in enumerate(zip(snapshots, result.scores))
+    ]
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from sentinelzero.core.models import RiskSignal, Severity
 
 SEVERITY_WEIGHT = {
@@ -9,13 +9,18 @@ SEVERITY_WEIGHT = {
 }
 
 BASE_SCORE = 50
+MAX_SCORE = 100
+LOW_TVL_THRESHOLD = 100_000_000
+LOW_TVL_PENALTY = 10
 
-def calculate_risk(entity_type: str, tvl: Optional[float], signals: List[RiskSignal]) -> int:
-    score = BASE_SCORE
-    for s in signals:
-        score += SEVERITY_WEIGHT.get(s.severity, 0)
+def signal_weight(signals: Iterable[RiskSignal]) -> int:
+    return sum(SEVERITY_WEIGHT.get(s.severity, 0) for s in signals)
 
-    if entity_type == 'protocol' and tvl is not None and tvl < 100_000_000:
-        score += 10
+def tvl_adjustment(entity_type: str, tvl: Optional[float]) -> int:
+    if entity_type == 'protocol' and tvl is not None and tvl < LOW_TVL_THRESHOLD:
+        return LOW_TVL_PENALTY
+    return 0
 
-    return min(100, score)
+def calculate_risk(entity_type: str, tvl: Optional[float], signals: List[RiskSignal]) -> int:
+    score = BASE_SCORE + signal_weight(signals) + tvl_adjustment(entity_type, tvl)
+    return min(MAX_SCORE, score)
@@ -0,0 +1,105 @@
+"""
+NumPy scoring backend: scores a whole portfolio in one pass.
+
+Produces exactly the same values as calculator.calculate_risk, which stays
+the reference implementation for single protocols.
+
+The speedup comes from protocols sharing signal containers, as they do in
+RiskEngine.run_batch: each distinct container is walked once. With one
+fresh list per protocol every signal still costs a Python-level lookup,
+and a plain calculate_risk loop is about as fast or faster.
+"""
+from itertools import chain
+from operator import attrgetter
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+from sentinelzero.core.models import RiskSignal
+from sentinelzero.scoring.calculator import (
+    BASE_SCORE,
+    LOW_TVL_PENALTY,
+    LOW_TVL_THRESHOLD,
+    MAX_SCORE,
+    SEVERITY_WEIGHT,
+)
+
+# Column order of the severity-count matrix
+SEVERITY_COLUMNS = tuple(SEVERITY_WEIGHT)
+SEVERITY_WEIGHTS = np.array([SEVERITY_WEIGHT[s] for s in SEVERITY_COLUMNS], dtype=np.int64)
+
+
+class _ColumnIndex(dict):
+    # Unweighted severities land in an extra column that is dropped later
+    def __missing__(self, severity):
+        return len(SEVERITY_COLUMNS)
+
+
+_COLUMN_INDEX = _ColumnIndex((s, i) for i, s in enumerate(SEVERITY_COLUMNS))
+_severity = attrgetter('severity')
+
+
+def severity_counts(signal_lists: Sequence[Iterable[RiskSignal]]) -> np.ndarray:
+    """
+    Builds the (protocols x severities) count matrix.
+
+    Severities without a weight are left out, matching the `.get(s, 0)`
+    lookup of the scalar path. Rows that share the same signal container
+    are only walked once.
+    """
+    width = len(SEVERITY_COLUMNS) + 1
+    # Rows are deduplicated by container identity; zip keeps the first
+    # insertion order and the same object for repeated ids.
+    ids = list(map(id, signal_lists))
+    by_id = dict(zip(ids, signal_lists))
+    unique = [s if isinstance(s, (list, tuple)) else list(s) for s in by_id.values()]
+
+    # Severities are mapped to columns by map() over the flattened signals,
+    # so the only per-signal work left in Python is the dict lookup the
+    # scalar path does too.
+    lengths = np.fromiter(map(len, unique), dtype=np.int64, count=len(unique))
+    cols = np.fromiter(
+        map(_COLUMN_INDEX.__getitem__, map(_severity, chain.from_iterable(unique))),
+        dtype=np.int64, count=int(lengths.sum())
+    )
+    cells = np.repeat(np.arange(len(unique), dtype=np.int64) * width, lengths) + cols
+    unique_counts = np.bincount(cells, minlength=len(unique) * width).reshape(len(unique), width)[:, :-1]
+    if len(unique) == len(ids):
+        return unique_counts
+    row_of = {key: row for row, key in enumerate(by_id)}
+    rows = np.fromiter(map(row_of.__getitem__, ids), dtype=np.int64, count=len(ids))
+    return unique_counts[rows]
+
+
+def tvl_array(tvls: Iterable[Optional[float]]) -> np.ndarray:
+    """Converts TVLs to float64, with NaN standing in for missing values."""
+    # NumPy already turns None into NaN for float arrays
+    return np.array(list(tvls), dtype=np.float64)
+
+
+def calculate_risk_matrix(
+    entity_types: Sequence[str],
+    tvls: np.ndarray,
+    counts: np.ndarray,
+) -> np.ndarray:
+    scores = BASE_SCORE + counts @ SEVERITY_WEIGHTS
+
+    # NaN compares False, so missing TVLs never trigger the penalty
+    with np.errstate(invalid='ignore'):
+        low_tvl = (np.asarray(entity_types) == 'protocol') & (tvls < LOW_TVL_THRESHOLD)
+    scores += np.where(low_tvl, LOW_TVL_PENALTY, 0)
+
+    return np.minimum(MAX_SCORE, scores)
+
+
+def calculate_risk_many(
+    entity_types: Sequence[str],
+    tvls: Sequence[Optional[float]],
+    signal_lists: Sequence[Iterable[RiskSignal]],
+) -> np.ndarray:
+    """
+    Scores many protocols at once. Meant for RiskEngine.run_batch, whose
+    protocols share signal tuples; other callers with a separate list per
+    protocol should loop over calculator.calculate_risk instead.
+    """
+    return calculate_risk_matrix(entity_types, tvl_array(tvls), severity_counts(signal_lists))
@@ -1,23 +1,38 @@
-from typing import List
+from typing import List, Tuple
 from sentinelzero.core.models import RiskSignal, RiskCategory, Severity
+from sentinelzero.signals.rules import REGISTRY
+
+# Campos do ProtocolSnapshot lidos por este detector (modo incremental)
+INPUT_FIELDS = ('entity_type',)
+
+REGISTRY.register(
+    RiskSignal(
+        category=RiskCategory.GOVERNANCE,
+        description='Upgradeable contracts controlled by small multisig',
+        severity=Severity.HIGH,
+        rationale='Centralized upgrade authority allows protocol changes without broad consensus.',
+        source='heuristic'
+    ),
+    entity_types={'protocol'}
+)
+REGISTRY.register(
+    RiskSignal(
+        category=RiskCategory.GOVERNANCE,
+        description='Emergency admin powers detected',
+        severity=Severity.MEDIUM,
+        rationale='Emergency controls introduce governance and legal risk.',
+        source='heuristic'
+    ),
+    entity_types={'protocol'}
+)
 
 def governance_signals(entity: dict) -> List[RiskSignal]:
-    if entity.get('type') != 'protocol':
-        return []
+    return list(REGISTRY.evaluate(entity, RiskCategory.GOVERNANCE))
+
+
+def detect(snapshot) -> List[RiskSignal]:
+    return list(REGISTRY.lookup(snapshot.entity_type, RiskCategory.GOVERNANCE))
+
 
-    return [
-        RiskSignal(
-            category=RiskCategory.GOVERNANCE,
-            description='Upgradeable contracts controlled by small multisig',
-            severity=Severity.HIGH,
-            rationale='Centralized upgrade authority allows protocol changes without broad consensus.',
-            source='heuristic'
-        ),
-        RiskSignal(
-            category=RiskCategory.GOVERNANCE,
-            description='Emergency admin powers detected',
-            severity=Severity.MEDIUM,
-            rationale='Emergency controls introduce governance and legal risk.',
-            source='heuristic'
-        )
-    ]
+def detect_batch(snapshots) -> List[Tuple[RiskSignal, ...]]:
+    return REGISTRY.evaluate_many((s.entity_type for s in snapshots), RiskCategory.GOVERNANCE)
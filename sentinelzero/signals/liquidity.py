@@ -1,16 +1,30 @@
 from sentinelzero.core.models import RiskSignal, RiskCategory, Severity
 from sentinelzero.core.enums import RiskCategory, Severity
+from sentinelzero.signals.rules import REGISTRY
 
+# Campos do ProtocolSnapshot lidos por este detector (modo incremental)
+INPUT_FIELDS = ('entity_type',)
 
-def liquidity_signals(entity: dict) -> list[RiskSignal]:
-    return [
-        RiskSignal(
-            category=RiskCategory.LIQUIDITY,
-            description="Liquidity concentration risk",
-            severity=Severity.MEDIUM,
-            rationale=(
-                "Liquidity may be concentrated in a small number of pools, "
-                "increasing slippage and exit risk."
-            )
+REGISTRY.register(
+    RiskSignal(
+        category=RiskCategory.LIQUIDITY,
+        description="Liquidity concentration risk",
+        severity=Severity.MEDIUM,
+        rationale=(
+            "Liquidity may be concentrated in a small number of pools, "
+            "increasing slippage and exit risk."
         )
-    ]
+    )
+)
+
+
+def liquidity_signals(entity: dict) -> list[RiskSignal]:
+    return list(REGISTRY.evaluate(entity, RiskCategory.LIQUIDITY))
+
+
+def detect(snapshot) -> list[RiskSignal]:
+    return list(REGISTRY.lookup(snapshot.entity_type, RiskCategory.LIQUIDITY))
+
+
+def detect_batch(snapshots) -> list[tuple[RiskSignal, ...]]:
+    return REGISTRY.evaluate_many((s.entity_type for s in snapshots), RiskCategory.LIQUIDITY)
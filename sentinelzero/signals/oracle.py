@@ -1,18 +1,34 @@
 from sentinelzero.core.models import RiskSignal, RiskCategory, Severity
 from sentinelzero.core.enums import RiskCategory, Severity
+from sentinelzero.signals.rules import REGISTRY
+
+# Campos do ProtocolSnapshot lidos por este detector (modo incremental)
+INPUT_FIELDS = ('entity_type',)
+
+REGISTRY.register(
+    RiskSignal(
+        category=RiskCategory.ORACLE,
+        description="Dependency on external price feeds",
+        severity=Severity.MEDIUM,
+        rationale="Reliance on third-party oracles introduces trust assumptions."
+    )
+)
+REGISTRY.register(
+    RiskSignal(
+        category=RiskCategory.ORACLE,
+        description="Oracle price feeds may rely on low-liquidity markets",
+        severity=Severity.HIGH,
+        rationale="Low-liquidity reference markets increase manipulation risk."
+    )
+)
 
 def oracle_signals(entity: dict) -> list[RiskSignal]:
-    return [
-        RiskSignal(
-            category=RiskCategory.ORACLE,
-            description="Dependency on external price feeds",
-            severity=Severity.MEDIUM,
-            rationale="Reliance on third-party oracles introduces trust assumptions."
-        ),
-        RiskSignal(
-            category=RiskCategory.ORACLE,
-            description="Oracle price feeds may rely on low-liquidity markets",
-            severity=Severity.HIGH,
-            rationale="Low-liquidity reference markets increase manipulation risk."
-        )
-    ]
+    return list(REGISTRY.evaluate(entity, RiskCategory.ORACLE))
+
+
+def detect(snapshot) -> list[RiskSignal]:
+    return list(REGISTRY.lookup(snapshot.entity_type, RiskCategory.ORACLE))
+
+
+def detect_batch(snapshots) -> list[tuple[RiskSignal, ...]]:
+    return REGISTRY.evaluate_many((s.entity_type for s in snapshots), RiskCategory.ORACLE)
@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from sentinelzero.core.models import RiskSignal
+
+
+def category_key(category) -> str:
+    # core.models e core.enums têm RiskCategory diferentes; o valor é comum
+    return getattr(category, 'value', category)
+
+
+@dataclass(frozen=True)
+class SignalRule:
+    """
+    Regra declarativa: emite `signal` para entidades cujo tipo está em
+    `entity_types` (None = qualquer tipo).
+    """
+    signal: RiskSignal
+    entity_types: Optional[FrozenSet[str]] = None
+
+    @property
+    def category(self) -> str:
+        return category_key(self.signal.category)
+
+
+class RuleRegistry:
+    """
+    Registro de regras compilado em uma tabela de decisão indexada por
+    (tipo de entidade, categoria). A avaliação é uma busca em dict que
+    devolve sempre a mesma tupla de RiskSignal (instâncias internadas).
+    """
+
+    def __init__(self, rules: Iterable[SignalRule] = ()):
+        self._rules: List[SignalRule] = []
+        self._interned: Dict[RiskSignal, RiskSignal] = {}
+        self._table: Optional[Dict[Tuple[str, str], Tuple[RiskSignal, ...]]] = None
+        self._wildcard: Dict[str, Tuple[RiskSignal, ...]] = {}
+        self.extend(rules)
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def register(self, signal: RiskSignal, entity_types: Optional[Iterable[str]] = None) -> SignalRule:
+        signal = self._interned.setdefault(signal, signal)
+        types = frozenset(entity_types) if entity_types is not None else None
+        rule = SignalRule(signal, types)
+        if rule in self._rules:
+            # o mesmo detector importado por dois nomes (ex.: `signals.governance`
+            # e `sentinelzero.signals.governance` num mesmo processo)
+            return rule
+        self._rules.append(rule)
+        self._table = None
+        return rule
+
+    def extend(self, rules: Iterable[SignalRule]):
+        for rule in rules:
+            self.register(rule.signal, rule.entity_types)
+
+    def compile(self):
+        categories = list(dict.fromkeys(rule.category for rule in self._rules))
+        types = set()
+        for rule in self._rules:
+            types.update(rule.entity_types or ())
+
+        wildcard = {
+            cat: tuple(r.signal for r in self._rules if r.category == cat and r.entity_types is None)
+            for cat in categories
+        }
+        table = {}
+        for cat in categories:
+            for entity_type in types:
+                table[(entity_type, cat)] = tuple(
+                    r.signal for r in self._rules
+                    if r.category == cat and (r.entity_types is None or entity_type in r.entity_types)
+                )
+        self._wildcard = wildcard
+        self._table = table
+
+    def lookup(self, entity_type: str, category) -> Tuple[RiskSignal, ...]:
+        if self._table is None:
+            self.compile()
+        cat = category_key(category)
+        signals = self._table.get((entity_type, cat))
+        if signals is None:
+            signals = self._wildcard.get(cat, ())
+        return signals
+
+    def evaluate(self, entity: dict, category) -> Tuple[RiskSignal, ...]:
+        return self.lookup(entity.get('type'), category)
+
+    def evaluate_many(self, entity_types: Iterable[str], category) -> List[Tuple[RiskSignal, ...]]:
+        if self._table is None:
+            self.compile()
+        cat = category_key(category)
+        table = self._table
+        fallback = self._wildcard.get(cat, ())
+        return [table.get((t, cat), fallback) for t in entity_types]
+
+
+# Registro global, populado pelos módulos de sinais na importação
+REGISTRY = RuleRegistry()
@@ -0,0 +1,143 @@
+import math
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sentinelzero.core.models import RiskSignal, RiskCategory, Severity
+
+HOUR_SECONDS = 60 * 60
+
+
+@dataclass(frozen=True)
+class TvlStreamConfig:
+    # Janela do pico usado no drawdown
+    window_seconds: float = 7 * 24 * HOUR_SECONDS
+    # Meia-vida da média móvel exponencial
+    ewma_halflife_seconds: float = 24 * HOUR_SECONDS
+    drawdown_high_pct: float = 20.0
+    drawdown_critical_pct: float = 40.0
+    # Queda do TVL atual em relação à EWMA (velocidade da saída de capital)
+    velocity_pct: float = 15.0
+    # Margem para rearmar um alerta depois que a condição se normaliza
+    hysteresis_pct: float = 2.0
+
+
+class _ProtocolWindow:
+    __slots__ = ("last_ts", "ewma", "peaks", "alerts")
+
+    def __init__(self):
+        self.last_ts: Optional[float] = None
+        self.ewma: Optional[float] = None
+        # deque monotônico (ts, tvl) decrescente em tvl: o primeiro é o pico
+        self.peaks: deque = deque()
+        self.alerts: Dict[str, bool] = {}
+
+
+class TvlStreamDetector:
+    """
+    Detector de liquidez em streaming: mantém, por protocolo, EWMA, pico
+    móvel e drawdown com custo O(1) amortizado por ponto e emite RiskSignal
+    quando um limite é cruzado (só na transição, não a cada ponto).
+    """
+
+    def __init__(self, config: TvlStreamConfig = TvlStreamConfig()):
+        self.config = config
+        self._windows: Dict[str, _ProtocolWindow] = {}
+        c = config
+        self.drawdown_high = RiskSignal(
+            category=RiskCategory.LIQUIDITY,
+            description="Sudden TVL drawdown",
+            severity=Severity.HIGH,
+            rationale=f"TVL fell at least {c.drawdown_high_pct:g}% from its recent peak.",
+            source="stream",
+        )
+        self.drawdown_critical = RiskSignal(
+            category=RiskCategory.LIQUIDITY,
+            description="Severe TVL drawdown",
+            severity=Severity.CRITICAL,
+            rationale=f"TVL fell at least {c.drawdown_critical_pct:g}% from its recent peak.",
+            source="stream",
+        )
+        self.velocity = RiskSignal(
+            category=RiskCategory.LIQUIDITY,
+            description="Rapid TVL outflow",
+            severity=Severity.MEDIUM,
+            rationale=f"TVL is at least {c.velocity_pct:g}% below its moving average.",
+            source="stream",
+        )
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def update(self, protocol: str, timestamp: float, tvl: float) -> List[RiskSignal]:
+        w = self._windows.get(protocol)
+        if w is None:
+            w = self._windows[protocol] = _ProtocolWindow()
+        if w.last_ts is not None and timestamp < w.last_ts:
+            raise ValueError(f"out-of-order TVL point for '{protocol}'")
+
+        c = self.config
+        # EWMA com decaimento pelo tempo decorrido (pontos irregulares)
+        if w.ewma is None:
+            w.ewma = tvl
+        else:
+            alpha = 1 - math.exp(-math.log(2) * (timestamp - w.last_ts) / c.ewma_halflife_seconds)
+            w.ewma += alpha * (tvl - w.ewma)
+        w.last_ts = timestamp
+
+        # Pico móvel: remove da cauda os valores dominados e da frente os
+        # que saíram da janela; cada ponto entra e sai uma vez
+        peaks = w.peaks
+        while peaks and peaks[-1][1] <= tvl:
+            peaks.pop()
+        peaks.append((timestamp, tvl))
+        while peaks[0][0] < timestamp - c.window_seconds:
+            peaks.popleft()
+        peak = peaks[0][1]
+
+        drawdown = (peak - tvl) / peak * 100 if peak > 0 else 0.0
+        below_ewma = (w.ewma - tvl) / w.ewma * 100 if w.ewma > 0 else 0.0
+
+        emitted = []
+        for signal, value, limit in (
+            (self.drawdown_high, drawdown, c.drawdown_high_pct),
+            (self.drawdown_critical, drawdown, c.drawdown_critical_pct),
+            (self.velocity, below_ewma, c.velocity_pct),
+        ):
+            key = signal.description
+            if not w.alerts.get(key) and value >= limit:
+                w.alerts[key] = True
+                emitted.append(signal)
+            elif w.alerts.get(key) and value < limit - c.hysteresis_pct:
+                w.alerts[key] = False
+        return emitted
+
+    def update_many(self, points: Iterable[Tuple[str, float, float]]) -> Dict[str, List[RiskSignal]]:
+        """points: (protocol, timestamp, tvl). Retorna só quem emitiu sinais."""
+        emitted: Dict[str, List[RiskSignal]] = {}
+        for protocol, timestamp, tvl in points:
+            signals = self.update(protocol, timestamp, tvl)
+            if signals:
+                emitted.setdefault(protocol, []).extend(signals)
+        return emitted
+
+    def active_signals(self, protocol: str) -> List[RiskSignal]:
+        """Alertas atualmente em vigor para o protocolo."""
+        w = self._windows.get(protocol)
+        if w is None:
+            return []
+        by_key = {s.description: s for s in (self.drawdown_high, self.drawdown_critical, self.velocity)}
+        return [by_key[k] for k, active in w.alerts.items() if active]
+
+    def state(self, protocol: str) -> Optional[dict]:
+        w = self._windows.get(protocol)
+        if w is None or not w.peaks:
+            return None
+        return {"ewma": w.ewma, "peak": w.peaks[0][1], "last_ts": w.last_ts}
+
+    def forget(self, protocol: Optional[str] = None):
+        """Descarta o estado de um protocolo (ou de todos)."""
+        if protocol is None:
+            self._windows.clear()
+        else:
+            self._windows.pop(protocol, None)
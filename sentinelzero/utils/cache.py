@@ -1,17 +1,55 @@
+import marshal
+import os
 import sqlite3
+import threading
 import time
-from typing import Optional
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+from sentinelzero.utils.codec import CodecError, decode, encode
+from sentinelzero.utils.instrumentation import cache_lookup
+from sentinelzero.utils.lru import LRUCache
 
 DB_PATH = "sentinelzero_cache.db"
 TTL_SECONDS = 24 * 60 * 60  # 24h
+# Camada em memória na frente do SQLite. O TTL curto limita por quanto tempo
+# um processo pode servir um valor já sobrescrito por outro worker.
+MEMORY_CACHE_SIZE = int(os.environ.get("SENTINELZERO_CACHE_MEMORY_SIZE", "1024"))
+MEMORY_CACHE_TTL_SECONDS = float(os.environ.get("SENTINELZERO_CACHE_MEMORY_TTL", "60"))
+EVICTION_INTERVAL_SECONDS = 10 * 60
+BUSY_TIMEOUT_SECONDS = 5.0
 
+# SQLite limita o número de parâmetros por query (999 em builds antigos)
+_MAX_PARAMS = 500
 
-def get_connection():
-    return sqlite3.connect(DB_PATH)
 
+class SQLiteCache:
+    """
+    Cache chave/valor em SQLite compartilhável entre threads e processos.
 
-def init_db():
-    with get_connection() as conn:
+    - uma conexão por thread (e por processo, para sobreviver a fork)
+    - WAL: leitores não bloqueiam o escritor e vice-versa
+    - get_many/set_many em uma única query/transação
+    - eviction em background das linhas mais antigas que o TTL
+    - valores gravados em binário (utils.codec: marshal + zlib/zstd para
+      entradas grandes); qualquer valor serializável por marshal é aceito
+      e linhas antigas em texto continuam legíveis
+    """
+
+    def __init__(self, path: str = DB_PATH, ttl: int = TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._evictor: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
         conn.execute("""
         CREATE TABLE IF NOT EXISTS cache (
             key TEXT PRIMARY KEY,
@@ -19,28 +57,222 @@ def init_db():
             updated_at INTEGER
         )
         """)
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_updated_at ON cache (updated_at)")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def close(self):
+        """Fecha a conexão da thread atual."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _fresh_after(self) -> int:
+        return int(time.time()) - self.ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self.connection().execute(
+            "SELECT value FROM cache WHERE key = ? AND updated_at >= ?",
+            (key, self._fresh_after())
+        ).fetchone()
+        value = _decode(row[0]) if row else None
+        cache_lookup("sqlite", hits=value is not None, misses=value is None)
+        return value
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(dict.fromkeys(keys))
+        conn = self.connection()
+        fresh_after = self._fresh_after()
+        found: Dict[str, Any] = {}
+        for i in range(0, len(keys), _MAX_PARAMS):
+            chunk = keys[i:i + _MAX_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT key, value FROM cache WHERE key IN ({placeholders}) AND updated_at >= ?",
+                (*chunk, fresh_after)
+            )
+            for key, value in rows:
+                value = _decode(value)
+                if value is not None:
+                    found[key] = value
+        cache_lookup("sqlite", hits=len(found), misses=len(keys) - len(found))
+        return found
+
+    def set(self, key: str, value: Any):
+        self.set_many({key: value})
 
+    def set_many(self, items: Mapping[str, Any]):
+        if not items:
+            return
+        now = int(time.time())
+        # serializa/comprime antes de pegar o lock de escrita
+        rows = [(k, encode(v), now) for k, v in items.items()]
+        conn = self.connection()
+        # BEGIN IMMEDIATE pega o lock de escrita logo no início, evitando
+        # deadlocks de upgrade quando vários workers escrevem ao mesmo tempo
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "REPLACE INTO cache (key, value, updated_at) VALUES (?, ?, ?)", rows
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
 
-def get_cache(key: str) -> Optional[str]:
-    with get_connection() as conn:
-        cur = conn.execute(
-            "SELECT value, updated_at FROM cache WHERE key = ?",
-            (key,)
+    def touch(self, keys: Iterable[str]):
+        """Renova o updated_at sem regravar (nem serializar) os valores."""
+        keys = list(dict.fromkeys(keys))
+        conn = self.connection()
+        now = int(time.time())
+        for i in range(0, len(keys), _MAX_PARAMS):
+            chunk = keys[i:i + _MAX_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            conn.execute(f"UPDATE cache SET updated_at = ? WHERE key IN ({placeholders})", (now, *chunk))
+
+    def evict_expired(self) -> int:
+        cur = self.connection().execute(
+            "DELETE FROM cache WHERE updated_at < ?", (self._fresh_after(),)
         )
-        row = cur.fetchone()
-        if not row:
-            return None
+        return cur.rowcount
 
-        value, ts = row
-        if time.time() - ts > TTL_SECONDS:
-            return None
+    def start_eviction(self, interval: float = EVICTION_INTERVAL_SECONDS):
+        if self._evictor is not None and self._evictor.is_alive():
+            return
+        self._stop.clear()
+        self._evictor = threading.Thread(
+            target=self._eviction_loop, args=(interval,),
+            name="sentinelzero-cache-evictor", daemon=True
+        )
+        self._evictor.start()
 
-        return value
+    def stop_eviction(self):
+        self._stop.set()
+        if self._evictor is not None:
+            self._evictor.join()
+            self._evictor = None
+
+    def _eviction_loop(self, interval: float):
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.evict_expired()
+                except sqlite3.OperationalError:
+                    # banco ocupado por outro worker; tenta no próximo ciclo
+                    pass
+                self._stop.wait(interval)
+        finally:
+            self.close()
+
+
+def _decode(value) -> Optional[Any]:
+    try:
+        return decode(value)
+    except CodecError:
+        # outra versão do Python, sem zstd ou corrompido: trata como miss
+        return None
 
 
-def set_cache(key: str, value: str):
-    with get_connection() as conn:
-        conn.execute(
-            "REPLACE INTO cache (key, value, updated_at) VALUES (?, ?, ?)",
-            (key, value, int(time.time()))
+class TieredCache:
+    """
+    LRU em memória (L1) na frente do SQLiteCache (L2), com write-through:
+    escritas vão para os dois níveis, leituras só descem ao disco em miss.
+    O L1 guarda os valores serializados com marshal (sem compressão nem
+    cabeçalho) e cada leitura devolve uma cópia nova: quem lê pode alterar
+    o valor sem afetar os outros, e marshal.loads custa bem menos que um
+    deepcopy.
+    """
+
+    def __init__(self, backend: SQLiteCache, memory: Optional[LRUCache] = None):
+        self.backend = backend
+        self.memory = memory if memory is not None else LRUCache(
+            MEMORY_CACHE_SIZE, min(MEMORY_CACHE_TTL_SECONDS, backend.ttl)
         )
+
+    def get(self, key: str) -> Optional[Any]:
+        frozen = self.memory.get(key)
+        cache_lookup("memory", hits=frozen is not None, misses=frozen is None)
+        if frozen is not None:
+            return marshal.loads(frozen)
+        value = self.backend.get(key)
+        if value is not None:
+            self.memory.set(key, marshal.dumps(value))
+        return value
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        found: Dict[str, Any] = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            frozen = self.memory.get(key)
+            if frozen is None:
+                missing.append(key)
+            else:
+                found[key] = marshal.loads(frozen)
+        cache_lookup("memory", hits=len(found), misses=len(missing))
+        if missing:
+            from_disk = self.backend.get_many(missing)
+            for key, value in from_disk.items():
+                self.memory.set(key, marshal.dumps(value))
+            found.update(from_disk)
+        return found
+
+    def set(self, key: str, value: Any):
+        self.set_many({key: value})
+
+    def set_many(self, items: Mapping[str, Any]):
+        self.backend.set_many(items)
+        # serializado na escrita: alterar o objeto depois não muda o cache
+        for key, value in items.items():
+            self.memory.set(key, marshal.dumps(value))
+
+    def touch(self, keys: Iterable[str]):
+        # o L1 tem TTL próprio e curto: só o disco precisa ser renovado
+        self.backend.touch(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"memory": self.memory.stats()}
+
+
+_default: Optional[TieredCache] = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache() -> TieredCache:
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                backend = SQLiteCache(DB_PATH, TTL_SECONDS)
+                backend.start_eviction()
+                _default = TieredCache(backend)
+    return _default
+
+
+def get_connection():
+    return get_default_cache().backend.connection()
+
+
+def init_db():
+    get_default_cache().backend.connection()
+
+
+def cache_stats() -> Dict[str, Any]:
+    return get_default_cache().stats()
+
+
+def get_cache(key: str) -> Optional[Any]:
+    return get_default_cache().get(key)
+
+
+def get_many(keys: Iterable[str]) -> Dict[str, Any]:
+    return get_default_cache().get_many(keys)
+
+
+def set_cache(key: str, value: Any):
+    get_default_cache().set(key, value)
+
+
+def set_many(items: Mapping[str, Any]):
+    get_default_cache().set_many(items)
@@ -0,0 +1,85 @@
+import marshal
+import struct
+import sys
+import zlib
+from typing import Any, Union
+
+try:
+    import zstandard
+except ImportError:  # zstd é opcional; sem ele, zlib
+    zstandard = None
+
+# Primeiro byte de cada valor codificado
+MARSHAL = 0x01
+MARSHAL_ZLIB = 0x02
+MARSHAL_ZSTD = 0x03
+
+# Depois do codec: versão do marshal e do Python que gravaram o valor e o
+# CRC32 do payload. O formato do marshal muda entre versões do Python, então
+# um valor de outra versão (ou corrompido) é rejeitado antes do marshal.loads
+_VERSION = bytes((marshal.version, sys.version_info[0], sys.version_info[1]))
+_CRC = struct.Struct(">I")
+_HEADER_SIZE = 1 + len(_VERSION) + _CRC.size
+
+# Abaixo disso a compressão custa mais do que economiza
+COMPRESS_THRESHOLD = 1024
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+class CodecError(ValueError):
+    pass
+
+
+def encode(value: Any) -> bytes:
+    """
+    Serializa com marshal (dict, list, str, números, None...) e, para valores
+    grandes, comprime com zstd (se instalado) ou zlib. A compressão só é
+    mantida quando de fato reduz o tamanho da entrada.
+    """
+    raw = marshal.dumps(value)
+    codec, payload = MARSHAL, raw
+    if len(raw) >= COMPRESS_THRESHOLD:
+        if zstandard is not None:
+            packed, packed_codec = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw), MARSHAL_ZSTD
+        else:
+            packed, packed_codec = zlib.compress(raw, ZLIB_LEVEL), MARSHAL_ZLIB
+        if len(packed) < len(raw):
+            codec, payload = packed_codec, packed
+    return bytes((codec,)) + _VERSION + _CRC.pack(zlib.crc32(payload)) + payload
+
+
+def decode(blob: Union[bytes, str]) -> Any:
+    """
+    Inverso de encode. Texto (linhas gravadas antes do formato binário) é
+    devolvido como está. Qualquer falha (outra versão do Python, payload
+    corrompido, codec desconhecido) vira CodecError, que o cache trata como
+    miss. O CRC pega corrupção acidental, não adulteração: só decodifique
+    dados do cache local, marshal não é seguro para entrada não confiável.
+    """
+    if isinstance(blob, str):
+        return blob
+    if len(blob) < _HEADER_SIZE:
+        raise CodecError("truncated payload")
+    codec = blob[0]
+    if codec not in (MARSHAL, MARSHAL_ZLIB, MARSHAL_ZSTD):
+        raise CodecError(f"unknown codec {codec:#x}")
+    if blob[1:1 + len(_VERSION)] != _VERSION:
+        raise CodecError("payload written by another marshal/Python version")
+    payload = memoryview(blob)[_HEADER_SIZE:]
+    if zlib.crc32(payload) != _CRC.unpack_from(blob, 1 + len(_VERSION))[0]:
+        raise CodecError("checksum mismatch")
+    if codec == MARSHAL_ZSTD and zstandard is None:
+        raise CodecError("zstd payload but zstandard is not installed")
+    try:
+        if codec == MARSHAL_ZLIB:
+            payload = zlib.decompress(payload)
+        elif codec == MARSHAL_ZSTD:
+            payload = zstandard.ZstdDecompressor().decompress(payload)
+        return marshal.loads(payload)
+    except Exception as exc:
+        raise CodecError(f"{type(exc).__name__}: {exc}") from exc
+
+
+def is_encoded(blob: bytes) -> bool:
+    return bool(blob) and blob[0] in (MARSHAL, MARSHAL_ZLIB, MARSHAL_ZSTD)
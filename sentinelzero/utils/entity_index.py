@@ -0,0 +1,270 @@
+import gzip
+import json
+import os
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+INDEX_PATH = os.environ.get("SENTINELZERO_ENTITY_INDEX", "entity_index.json.gz")
+INDEX_VERSION = 1
+# Campos de cada entidade que viram chaves de busca
+KEY_FIELDS = ("name", "symbol", "defillama_slug", "coingecko_id")
+
+
+def normalize(value) -> Optional[str]:
+    if not value or not isinstance(value, str):
+        return None
+    value = " ".join(value.lower().split())
+    return value if value and value != "-" else None
+
+
+def _trigrams(key: str) -> List[str]:
+    padded = f"^{key}$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)] or [padded]
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Distância de edição com transposição de vizinhos contando como uma edição
+    (erro de digitação mais comum). Devolve limit + 1 assim que passa de limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        # uma transposição pode pular uma linha, então olha as duas últimas
+        if min(current) > limit and min(previous) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+class EntityIndex:
+    """
+    Índice de entidades (protocolos e tokens) para resolução de identificadores.
+
+    - busca exata por nome, símbolo, slug DefiLlama, id CoinGecko, endereço
+      de contrato ou alias: um acesso a dict
+    - busca por prefixo: bisect sobre as chaves ordenadas
+    - busca tolerante a erros de digitação: candidatos por trigramas,
+      confirmados por distância de edição
+
+    O índice é salvo como JSON gzip já com as chaves resolvidas, então a
+    carga não precisa recalcular nada; os trigramas são montados só na
+    primeira busca fuzzy.
+    """
+
+    def __init__(self, entities: Optional[List[dict]] = None,
+                 keys: Optional[List[Tuple[str, int]]] = None):
+        self.entities: List[dict] = entities or []
+        pairs = sorted(keys or [])
+        self._keys: List[str] = [k for k, _ in pairs]
+        self._targets: List[int] = [i for _, i in pairs]
+        self._exact: Dict[str, int] = dict(pairs)
+        self._grams: Optional[Dict[str, List[int]]] = None
+        self._grams_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    @classmethod
+    def build(cls, entities: Iterable[dict]) -> "EntityIndex":
+        """
+        Monta o índice a partir de dicts de entidade. Além de KEY_FIELDS,
+        são indexados `addresses` (com e sem o prefixo "chain:") e `aliases`.
+        Chaves ambíguas ficam com a entidade de maior TVL.
+        """
+        entities = list(entities)
+        owner: Dict[str, int] = {}
+
+        def tvl(i):
+            return entities[i].get("tvl") or 0
+
+        for i, entity in enumerate(entities):
+            keys = [entity.get(f) for f in KEY_FIELDS]
+            keys.extend(entity.get("aliases") or ())
+            for address in entity.get("addresses") or ():
+                keys.append(address)
+                keys.append(address.split(":", 1)[-1])
+            for key in map(normalize, keys):
+                if key is None:
+                    continue
+                current = owner.get(key)
+                if current is None or tvl(i) > tvl(current):
+                    owner[key] = i
+
+        # slug e id CoinGecko identificam uma entidade só; têm precedência
+        for i, entity in enumerate(entities):
+            for field in ("defillama_slug", "coingecko_id"):
+                key = normalize(entity.get(field))
+                if key is not None:
+                    owner[key] = i
+
+        return cls(entities, list(owner.items()))
+
+    @classmethod
+    def from_defillama(cls, protocols: Iterable[dict], extra: Iterable[dict] = ()) -> "EntityIndex":
+        """Índice a partir da listagem /protocols do DefiLlama (mais entidades extras)."""
+        entities = [protocol_entity(p) for p in protocols if normalize(p.get("slug"))]
+        entities.extend(extra)
+        return cls.build(entities)
+
+    # ----------------------
+    # Persistência
+    # ----------------------
+    def save(self, path: str = INDEX_PATH):
+        payload = {
+            "version": INDEX_VERSION,
+            "entities": self.entities,
+            "keys": list(zip(self._keys, self._targets)),
+        }
+        tmp = f"{path}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = INDEX_PATH) -> "EntityIndex":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("version") != INDEX_VERSION:
+            raise ValueError(f"Versão de índice não suportada: {payload.get('version')}")
+        return cls(payload["entities"], [tuple(pair) for pair in payload["keys"]])
+
+    # ----------------------
+    # Consultas
+    # ----------------------
+    def get(self, query: str) -> Optional[dict]:
+        key = normalize(query)
+        if key is None:
+            return None
+        i = self._exact.get(key)
+        if i is None and ":" in key:
+            i = self._exact.get(key.split(":", 1)[-1])
+        return self.entities[i] if i is not None else None
+
+    def prefix(self, query: str, limit: int = 10) -> List[dict]:
+        key = normalize(query)
+        if key is None:
+            return []
+        found: Dict[int, None] = {}
+        pos = bisect_left(self._keys, key)
+        while pos < len(self._keys) and self._keys[pos].startswith(key):
+            found.setdefault(self._targets[pos])
+            pos += 1
+        ranked = sorted(found, key=lambda i: -(self.entities[i].get("tvl") or 0))
+        return [self.entities[i] for i in ranked[:limit]]
+
+    def _gram_index(self) -> Dict[str, List[int]]:
+        if self._grams is None:
+            with self._grams_lock:
+                if self._grams is None:
+                    grams: Dict[str, List[int]] = defaultdict(list)
+                    for pos, key in enumerate(self._keys):
+                        for gram in set(_trigrams(key)):
+                            grams[gram].append(pos)
+                    self._grams = dict(grams)
+        return self._grams
+
+    def fuzzy(self, query: str, max_distance: int = 2, limit: int = 5) -> List[Tuple[dict, int]]:
+        """Entidades cujas chaves estão a até max_distance edições da consulta."""
+        key = normalize(query)
+        if key is None:
+            return []
+        grams = self._gram_index()
+        query_grams = set(_trigrams(key))
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for pos in grams.get(gram, ()):
+                shared[pos] += 1
+
+        # uma edição destrói no máximo 3 trigramas; uma transposição (que
+        # edit_distance conta como 1) destrói até 4
+        needed = max(1, len(query_grams) - 4 * max_distance)
+        best: Dict[int, int] = {}
+        for pos, count in shared.items():
+            if count < needed:
+                continue
+            distance = edit_distance(key, self._keys[pos], max_distance)
+            if distance <= max_distance:
+                target = self._targets[pos]
+                if distance < best.get(target, max_distance + 1):
+                    best[target] = distance
+
+        ranked = sorted(best.items(), key=lambda item: (item[1], -(self.entities[item[0]].get("tvl") or 0)))
+        return [(self.entities[i], distance) for i, distance in ranked[:limit]]
+
+    def resolve(self, query: str) -> Optional[dict]:
+        """Busca exata; senão, a correção de digitação com menor distância, se única."""
+        entity = self.get(query)
+        if entity is not None:
+            return entity
+        key = normalize(query)
+        if key is None or len(key) < 4:
+            # chaves curtas (símbolos) têm vizinhos demais para arriscar
+            return None
+        matches = self.fuzzy(key, max_distance=1 if len(key) < 8 else 2, limit=2)
+        if not matches:
+            return None
+        if len(matches) > 1 and matches[0][1] == matches[1][1]:
+            return None
+        return matches[0][0]
+
+
+def protocol_entity(p: dict) -> dict:
+    """Entidade do resolver a partir de uma entrada de /protocols."""
+    entity = {
+        "type": "protocol",
+        "name": p.get("name") or p["slug"],
+        "defillama_slug": p["slug"],
+        "symbol": p.get("symbol"),
+        "coingecko_id": p.get("gecko_id"),
+        "addresses": [p["address"]] if p.get("address") else [],
+        "tvl": p.get("tvl"),
+    }
+    return {k: v for k, v in entity.items() if v not in (None, [])}
+
+
+_default: Optional[EntityIndex] = None
+_default_lock = threading.Lock()
+
+
+def get_entity_index() -> Optional[EntityIndex]:
+    """Índice carregado de INDEX_PATH na primeira chamada; None se o arquivo não existir."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None and os.path.exists(INDEX_PATH):
+                _default = EntityIndex.load(INDEX_PATH)
+    return _default
+
+
+def main(argv: Optional[List[str]] = None):
+    """Gera o arquivo de índice a partir da listagem /protocols do DefiLlama."""
+    import argparse
+
+    from sentinelzero.datasources import remote
+    from sentinelzero.utils.resolver import ENTITY_REGISTRY
+
+    parser = argparse.ArgumentParser(description="Gera o índice de entidades do SentinelZero")
+    parser.add_argument("--output", default=INDEX_PATH)
+    parser.add_argument("--base-url", default=remote.DEFILLAMA_API)
+    args = parser.parse_args(argv)
+
+    protocols = remote.get_json(f"{args.base_url}/protocols", source="defillama")
+    extra = [dict(entity, aliases=[alias]) for alias, entity in ENTITY_REGISTRY.items()]
+    index = EntityIndex.from_defillama(protocols, extra)
+    index.save(args.output)
+    print(f"{len(index)} entidades, {len(index._keys)} chaves -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,14 @@
-﻿def resolve_entity(symbol: str) -> dict:
-    ENTITIES = {
-        'aave': {'name': 'Aave', 'type': 'protocol', 'tvl': 3_000_000_000},
-        'makerdao': {'name': 'MakerDAO', 'type': 'protocol', 'tvl': 2_500_000_000},
-        'link': {'name': 'Chainlink', 'type': 'token'}
-    }
-    return ENTITIES.get(symbol.lower(), {'name': symbol, 'type': 'unknown'})
+﻿from sentinelzero.utils.entity_index import get_entity_index
+
+ENTITIES = {
+    'aave': {'name': 'Aave', 'type': 'protocol', 'tvl': 3_000_000_000},
+    'makerdao': {'name': 'MakerDAO', 'type': 'protocol', 'tvl': 2_500_000_000},
+    'link': {'name': 'Chainlink', 'type': 'token'}
+}
+
+def resolve_entity(symbol: str) -> dict:
+    entity = ENTITIES.get(symbol.lower())
+    if entity is None:
+        index = get_entity_index()
+        entity = index.resolve(symbol) if index is not None else None
+    return entity if entity is not None else {'name': symbol, 'type': 'unknown'}
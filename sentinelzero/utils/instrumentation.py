@@ -0,0 +1,314 @@
+import os
+import threading
+from bisect import bisect_left
+from contextlib import nullcontext
+from functools import wraps
+from time import perf_counter
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Desligado com SENTINELZERO_METRICS=0: stage() devolve um context manager
+# vazio compartilhado e os contadores retornam antes de pegar qualquer lock.
+_enabled = os.environ.get("SENTINELZERO_METRICS", "1") != "0"
+
+# Observadores de etapas (ex.: utils.profiling), chamados com
+# (stage, component, seconds) mesmo com as métricas desligadas. Tupla
+# trocada a cada alteração, para iterar sem lock.
+_stage_hooks: Tuple[Callable[[str, str, float], None], ...] = ()
+_timing = _enabled
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NOOP = nullcontext()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(value: bool):
+    global _enabled, _timing
+    _enabled = bool(value)
+    _timing = _enabled or bool(_stage_hooks)
+
+
+def add_stage_hook(hook: Callable[[str, str, float], None]):
+    global _stage_hooks, _timing
+    _stage_hooks = _stage_hooks + (hook,)
+    _timing = True
+
+
+def remove_stage_hook(hook: Callable[[str, str, float], None]):
+    global _stage_hooks, _timing
+    _stage_hooks = tuple(h for h in _stage_hooks if h is not hook)
+    _timing = _enabled or bool(_stage_hooks)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def items(self) -> List[Tuple[Tuple[str, ...], float]]:
+        with self._lock:
+            return list(self._values.items())
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in items]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # por label, uma lista plana: contagem por bucket (+Inf incluso),
+        # soma e total nas duas últimas posições
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def _new_series(self, labelvalues: Tuple[str, ...]) -> list:
+        with self._lock:
+            return self._series.setdefault(labelvalues, [0] * (len(self.buckets) + 1) + [0.0, 0])
+
+    def observe(self, value: float, *labelvalues: str):
+        series = self._series.get(labelvalues) or self._new_series(labelvalues)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, *labelvalues: str) -> int:
+        series = self._series.get(labelvalues)
+        return series[-1] if series else 0
+
+    def total(self, *labelvalues: str) -> float:
+        series = self._series.get(labelvalues)
+        return series[-2] if series else 0.0
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = []
+        for labelvalues, series in items:
+            counts, total, count = series[:-2], series[-2], series[-1]
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labelvalues, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labelvalues)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets)
+
+    def reset(self):
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+    def render(self) -> str:
+        """Formato de exposição em texto do Prometheus (0.0.4)."""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "sentinelzero_stage_seconds", "Tempo gasto por etapa do pipeline de risco", ("stage", "component"))
+CACHE_REQUESTS = REGISTRY.counter(
+    "sentinelzero_cache_requests_total", "Consultas aos caches por resultado", ("cache", "result"))
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    "sentinelzero_upstream_request_seconds", "Latência das chamadas às APIs externas", ("source", "outcome"))
+UPSTREAM_RETRIES = REGISTRY.counter(
+    "sentinelzero_upstream_retries_total", "Chamadas externas repetidas pelo scheduler", ("source",))
+
+
+class _Stage:
+    __slots__ = ("stage", "component", "start")
+
+    def __init__(self, stage: str, component: str):
+        self.stage = stage
+        self.component = component
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _emit(self.stage, self.component, perf_counter() - self.start)
+        return False
+
+
+def _emit(name: str, component: str, seconds: float):
+    if _enabled:
+        STAGE_SECONDS.observe(seconds, name, component)
+    for hook in _stage_hooks:
+        hook(name, component, seconds)
+
+
+def stage(name: str, component: str = ""):
+    """`with stage("detect", "oracle"):` mede o bloco em sentinelzero_stage_seconds."""
+    if not _timing:
+        return _NOOP
+    return _Stage(name, component)
+
+
+class StageClock:
+    """
+    Cronômetro de voltas para caminhos quentes com várias etapas em
+    sequência: cada lap() registra o tempo desde a volta anterior. Mais
+    barato que um `with stage()` por etapa.
+    """
+    __slots__ = ("last",)
+
+    def __init__(self):
+        self.last = perf_counter()
+
+    def lap(self, name: str, component: str = ""):
+        now = perf_counter()
+        _emit(name, component, now - self.last)
+        self.last = now
+
+
+class _NoopClock:
+    __slots__ = ()
+
+    def lap(self, name: str, component: str = ""):
+        pass
+
+
+_NOOP_CLOCK = _NoopClock()
+
+
+def clock():
+    """`c = clock(); ...; c.lap("resolve"); ...; c.lap("score")`"""
+    if not _timing:
+        return _NOOP_CLOCK
+    return StageClock()
+
+
+def timed(name: str, component: str = "") -> Callable:
+    """Decorator equivalente a envolver a função inteira em stage()."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _timing:
+                return func(*args, **kwargs)
+            with _Stage(name, component):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_stage(name: str, component: str, seconds: float):
+    """Para etapas já cronometradas por quem chama (ex.: fetch assíncrono)."""
+    if _timing:
+        _emit(name, component, seconds)
+
+
+def cache_lookup(cache: str, hits: int = 0, misses: int = 0):
+    if not _enabled:
+        return
+    if hits:
+        CACHE_REQUESTS.inc(cache, "hit", amount=hits)
+    if misses:
+        CACHE_REQUESTS.inc(cache, "miss", amount=misses)
+
+
+def upstream_request(source: str, seconds: float, ok: bool):
+    if _enabled:
+        UPSTREAM_SECONDS.observe(seconds, source, "ok" if ok else "error")
+
+
+def upstream_retry(source: str):
+    if _enabled:
+        UPSTREAM_RETRIES.inc(source)
+
+
+def cache_hit_ratios() -> Dict[str, float]:
+    totals: Dict[str, List[float]] = {}
+    for (cache, result), value in CACHE_REQUESTS.items():
+        hits_misses = totals.setdefault(cache, [0, 0])
+        hits_misses[0 if result == "hit" else 1] += value
+    return {cache: hits / (hits + misses) for cache, (hits, misses) in totals.items() if hits + misses}
+
+
+def render() -> str:
+    text = REGISTRY.render()
+    ratios = cache_hit_ratios()
+    if ratios:
+        lines = ["# HELP sentinelzero_cache_hit_ratio Fração das consultas servidas pelo cache",
+                 "# TYPE sentinelzero_cache_hit_ratio gauge"]
+        lines.extend(f'sentinelzero_cache_hit_ratio{{cache="{_escape(cache)}"}} {_number(ratio)}'
+                     for cache, ratio in sorted(ratios.items()))
+        text += "\n".join(lines) + "\n"
+    return text
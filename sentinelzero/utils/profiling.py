@@ -0,0 +1,271 @@
+import contextvars
+import os
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+from sentinelzero.utils import instrumentation
+
+TOP_N = 10
+# Caminhos com menos que isso (em segundos) não entram no flamegraph
+MIN_FOLDED_SECONDS = 1e-6
+MAX_FOLDED_DEPTH = 64
+
+# Protocolo sendo perfilado no contexto atual
+_current: contextvars.ContextVar = contextvars.ContextVar("sentinelzero_profile", default=None)
+
+Func = Tuple[str, int, str]
+
+
+@dataclass
+class ProtocolProfile:
+    """Perfil de uma análise. Serializável (pickle) para voltar de workers."""
+    protocol: str
+    wall_seconds: float = 0.0
+    stages: Dict[str, float] = field(default_factory=dict)
+    # formato bruto do cProfile: {func: (cc, nc, tt, ct, callers)}
+    stats: Dict[Func, tuple] = field(default_factory=dict)
+
+    def slowest_stage(self) -> Optional[Tuple[str, float]]:
+        if not self.stages:
+            return None
+        return max(self.stages.items(), key=lambda item: item[1])
+
+
+class _RawStats:
+    """Adaptador para pstats.Stats aceitar um dict de stats já coletado."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def _label(func: Func) -> str:
+    filename, _, name = func
+    module = os.path.basename(filename) if filename != "~" else ""
+    label = f"{module}:{name}" if module else name
+    # ';' separa frames e ' ' separa o valor no formato folded
+    return label.replace(";", ",").replace(" ", "_")
+
+
+def folded_stacks(stats: Dict[Func, tuple], root: str = "") -> Dict[str, float]:
+    """
+    Reconstrói pilhas no formato "folded" (flamegraph.pl, speedscope) a partir
+    do grafo de chamadas do cProfile. O tempo de uma função chamada de vários
+    lugares é dividido entre os chamadores na proporção do tempo de cada
+    aresta, então as pilhas profundas são uma aproximação.
+    """
+    children: Dict[Func, List[Tuple[Func, float]]] = defaultdict(list)
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            if caller in stats:
+                children[caller].append((func, edge[3]))
+
+    folded: Dict[str, float] = defaultdict(float)
+
+    def walk(func: Func, path: List[str], on_path: set, share: float):
+        _, _, tt, ct, _ = stats[func]
+        path = path + [_label(func)]
+        if tt * share >= MIN_FOLDED_SECONDS:
+            folded[";".join(path)] += tt * share
+        if len(path) >= MAX_FOLDED_DEPTH:
+            return
+        on_path = on_path | {func}
+        for child, edge_ct in children.get(func, ()):
+            child_ct = stats[child][3]
+            if child in on_path or not child_ct:
+                continue
+            child_share = share * min(1.0, edge_ct / child_ct)
+            if child_ct * child_share >= MIN_FOLDED_SECONDS:
+                walk(child, path, on_path, child_share)
+
+    prefix = [root] if root else []
+    for func, (_, _, _, _, callers) in stats.items():
+        if not any(caller in stats for caller in callers):
+            walk(func, prefix, set(), 1.0)
+    return dict(folded)
+
+
+class Profiler:
+    """
+    Perfil por protocolo: tempo total, tempo por etapa (via os hooks de
+    utils.instrumentation) e cProfile da análise inteira.
+
+        profiler = Profiler()
+        with profiler.profile("aave"):
+            run_unified_analysis("aave")
+        profiler.write("profiles")
+
+    Chamadas aninhadas (run_unified_analysis dentro de um profile() já
+    aberto, por exemplo) entram no perfil externo.
+    """
+
+    def __init__(self, top_n: int = TOP_N, use_cprofile: bool = True):
+        self.top_n = top_n
+        self.use_cprofile = use_cprofile
+        self.records: List[ProtocolProfile] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _on_stage(stage: str, component: str, seconds: float):
+        record = _current.get()
+        if record is not None:
+            key = f"{stage}:{component}" if component else stage
+            record.stages[key] = record.stages.get(key, 0.0) + seconds
+
+    def attach(self):
+        instrumentation.add_stage_hook(self._on_stage)
+
+    def detach(self):
+        instrumentation.remove_stage_hook(self._on_stage)
+
+    def profile(self, protocol: str) -> "_ProfileScope":
+        return _ProfileScope(self, protocol)
+
+    def add(self, record: ProtocolProfile):
+        with self._lock:
+            self.records.append(record)
+
+    def slowest(self, n: Optional[int] = None) -> List[ProtocolProfile]:
+        n = self.top_n if n is None else n
+        with self._lock:
+            records = list(self.records)
+        return sorted(records, key=lambda r: r.wall_seconds, reverse=True)[:n]
+
+    def folded(self) -> Dict[str, float]:
+        merged: Dict[str, float] = defaultdict(float)
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            for stack, seconds in folded_stacks(record.stats, record.protocol).items():
+                merged[stack] += seconds
+        return dict(merged)
+
+    def summary(self, n: Optional[int] = None) -> str:
+        lines = [f"Top {n or self.top_n} protocolos mais lentos:"]
+        for rank, record in enumerate(self.slowest(n), 1):
+            line = f"{rank:>3}. {record.protocol:<24} {record.wall_seconds * 1000:10.3f} ms"
+            slowest = record.slowest_stage()
+            if slowest is not None:
+                line += f"  (etapa mais lenta: {slowest[0]} {slowest[1] * 1000:.3f} ms)"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def write(self, output_dir: str) -> Dict[str, str]:
+        """
+        Grava em output_dir:
+        - profile.folded: pilhas por protocolo, em microssegundos (flamegraph)
+        - profile.prof: cProfile de todas as análises somadas (pstats/snakeviz)
+        - slowest.txt: os top-N protocolos mais lentos e suas etapas
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        paths = {
+            "folded": os.path.join(output_dir, "profile.folded"),
+            "pstats": os.path.join(output_dir, "profile.prof"),
+            "slowest": os.path.join(output_dir, "slowest.txt"),
+        }
+
+        with open(paths["folded"], "w", encoding="utf-8") as f:
+            for stack, seconds in sorted(self.folded().items()):
+                micros = int(round(seconds * 1e6))
+                if micros:
+                    f.write(f"{stack} {micros}\n")
+
+        with self._lock:
+            records = [r for r in self.records if r.stats]
+        if records:
+            import pstats
+            merged = pstats.Stats(_RawStats(records[0].stats))
+            for record in records[1:]:
+                merged.add(_RawStats(record.stats))
+            merged.dump_stats(paths["pstats"])
+        else:
+            paths.pop("pstats")
+
+        with open(paths["slowest"], "w", encoding="utf-8") as f:
+            f.write(self.summary() + "\n")
+            for record in self.slowest():
+                f.write(f"\n{record.protocol}:\n")
+                for stage, seconds in sorted(record.stages.items(), key=lambda item: -item[1]):
+                    f.write(f"  {stage:<24} {seconds * 1000:10.3f} ms\n")
+        return paths
+
+
+class _ProfileScope:
+    __slots__ = ("profiler", "record", "token", "cprofile", "start")
+
+    def __init__(self, profiler: Profiler, protocol: str):
+        self.profiler = profiler
+        self.record = ProtocolProfile(protocol)
+        self.token = None
+        self.cprofile = None
+
+    def __enter__(self) -> ProtocolProfile:
+        current = _current.get()
+        if current is not None:
+            self.record = current
+            return current
+        self.token = _current.set(self.record)
+        self.start = perf_counter()
+        if self.profiler.use_cprofile:
+            # importado só aqui: engine e analysis importam este módulo
+            import cProfile
+            self.cprofile = cProfile.Profile()
+            try:
+                self.cprofile.enable()
+            except ValueError:
+                # outro profiler já ativo (ex.: python -m cProfile): só tempos
+                self.cprofile = None
+        return self.record
+
+    def __exit__(self, *exc):
+        if self.token is None:
+            return False
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        self.record.wall_seconds = perf_counter() - self.start
+        if self.cprofile is not None:
+            self.cprofile.create_stats()
+            self.record.stats = _without_profiler_frames(self.cprofile.stats)
+        _current.reset(self.token)
+        self.profiler.add(self.record)
+        return False
+
+
+def _without_profiler_frames(stats: Dict[Func, tuple]) -> Dict[Func, tuple]:
+    return {
+        func: value for func, value in stats.items()
+        if func[0] != __file__ and func[2] != "<method 'disable' of '_lsprof.Profiler' objects>"
+    }
+
+
+_default: Optional[Profiler] = None
+_default_lock = threading.Lock()
+
+
+def enable(top_n: int = TOP_N, use_cprofile: bool = True) -> Profiler:
+    """Liga o modo de perfil: run_unified_analysis e RiskEngine.run passam a ser perfilados."""
+    global _default
+    with _default_lock:
+        if _default is not None:
+            _default.detach()
+        _default = Profiler(top_n, use_cprofile)
+        _default.attach()
+        return _default
+
+
+def disable() -> Optional[Profiler]:
+    global _default
+    with _default_lock:
+        profiler, _default = _default, None
+    if profiler is not None:
+        profiler.detach()
+    return profiler
+
+
+def get_profiler() -> Optional[Profiler]:
+    return _default
@@ -1,3 +1,5 @@
+from sentinelzero.utils.entity_index import get_entity_index, protocol_entity
+
 ENTITY_REGISTRY = {
     "aave": {
         "type": "protocol",
@@ -19,7 +21,18 @@ ENTITY_REGISTRY = {
 def resolve_identifier(query: str) -> dict:
     key = query.lower().strip()
 
-    if key not in ENTITY_REGISTRY:
-        return {"type": "unknown"}
+    if key in ENTITY_REGISTRY:
+        return ENTITY_REGISTRY[key]
 
-    return ENTITY_REGISTRY[key]
+    # Fora das entradas curadas, consulta o índice completo (nomes, símbolos,
+    # slugs, ids CoinGecko, endereços e correção de digitação)
+    index = get_entity_index()
+    entity = index.resolve(query) if index is not None else None
+    if entity is None:
+        # listagem do DefiLlama já carregada (ou em arquivo): sem rede aqui
+        from sentinelzero.datasources.universe import get_universe
+        entry = get_universe().lookup_cached(query)
+        entity = protocol_entity(entry) if entry is not None else None
+    if entity is None:
+        return {"type": "unknown"}
+    return entity
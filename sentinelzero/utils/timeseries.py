@@ -0,0 +1,270 @@
+import bisect
+import math
+import mmap
+import os
+import struct
+import time
+from typing import Dict, Iterable, Optional, Sequence
+from urllib.parse import quote, unquote
+
+HISTORY_DIR = "history"
+DAY_SECONDS = 24 * 60 * 60
+
+# Uma coluna por arquivo: timestamp em int64, o resto em float64 (NaN = ausente)
+TIMESTAMP = "timestamp"
+VALUE_COLUMNS = ("tvl", "price", "market_cap", "volume", "score")
+_FORMATS = {TIMESTAMP: "q", **{c: "d" for c in VALUE_COLUMNS}}
+
+
+def _dirname(protocol: str) -> str:
+    return quote(protocol.lower(), safe="")
+
+
+class ProtocolSeries:
+    """
+    Visão somente-leitura do histórico de um protocolo. As colunas são
+    arquivos mapeados em memória e lidos via memoryview, então consultas por
+    janela só tocam as páginas da janela, sem criar objetos Python para o
+    histórico inteiro.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._maps = []
+        self._columns: Dict[str, memoryview] = {}
+        lengths = []
+        missing = []
+        for column, fmt in _FORMATS.items():
+            filename = os.path.join(path, f"{column}.bin")
+            if column != TIMESTAMP and not os.path.exists(filename):
+                missing.append(column)
+                continue
+            view = self._map(filename, fmt)
+            self._columns[column] = view
+            lengths.append(len(view))
+        # Um append interrompido pode deixar colunas com tamanhos diferentes;
+        # só as linhas completas contam
+        self._length = min(lengths)
+        # coluna de valores sem arquivo: lida como ausente (NaN) em todas as linhas
+        for column in missing:
+            self._columns[column] = memoryview(struct.pack(f"={self._length}d",
+                                                           *[math.nan] * self._length)).cast("d")
+
+    def _map(self, filename: str, fmt: str) -> memoryview:
+        size = os.path.getsize(filename) if os.path.exists(filename) else 0
+        size -= size % struct.calcsize(fmt)
+        if size == 0:
+            return memoryview(b"").cast(fmt)
+        with open(filename, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return memoryview(mapped).cast(fmt)
+
+    def close(self):
+        """
+        Fecha os mapeamentos. Views devolvidas por column() (e fatias delas)
+        apontam para o mmap: precisam ser liberadas (view.release() ou
+        descartadas) antes, senão close() levanta BufferError. A série fica
+        inutilizável de qualquer forma; os mapeamentos presos são fechados
+        numa nova chamada a close() ou pelo coletor quando as views morrerem.
+        """
+        for view in self._columns.values():
+            view.release()
+        self._columns = {}
+        busy = []
+        for mapped in self._maps:
+            try:
+                mapped.close()
+            except BufferError:
+                busy.append(mapped)
+        self._maps = busy
+        if busy:
+            raise BufferError("column() views still in use; release them before close()")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.close()
+        except BufferError:
+            # as views presas no frame da exceção não podem esconder o erro original
+            if exc_type is None:
+                raise
+
+    def __len__(self) -> int:
+        return self._length
+
+    def column(self, name: str) -> memoryview:
+        return self._columns[name][:self._length]
+
+    def window(self, start: float, end: Optional[float] = None):
+        """Intervalo [lo, hi) de linhas com start <= timestamp <= end."""
+        timestamps = self.column(TIMESTAMP)
+        lo = bisect.bisect_left(timestamps, start)
+        hi = self._length if end is None else bisect.bisect_right(timestamps, end)
+        return lo, hi
+
+    def last(self, column: str) -> Optional[float]:
+        values = self.column(column)
+        for i in range(self._length - 1, -1, -1):
+            if not math.isnan(values[i]):
+                return values[i]
+        return None
+
+    def change(self, column: str, window_seconds: float, now: Optional[float] = None) -> Optional[float]:
+        """
+        Variação percentual entre o último valor e o último valor registrado
+        até `now - window_seconds` (ex.: tvl_change_7d).
+        """
+        if self._length == 0:
+            return None
+        timestamps = self.column(TIMESTAMP)
+        now = timestamps[self._length - 1] if now is None else now
+        base_index = bisect.bisect_right(timestamps, now - window_seconds) - 1
+        end_index = bisect.bisect_right(timestamps, now) - 1
+        if base_index < 0 or end_index <= base_index:
+            return None
+        values = self.column(column)
+        base, current = values[base_index], values[end_index]
+        if math.isnan(base) or math.isnan(current) or base == 0:
+            return None
+        return (current - base) / base * 100
+
+    def drawdown(self, column: str, window_seconds: float, now: Optional[float] = None) -> Optional[float]:
+        """Maior queda percentual pico-vale dentro da janela (valor >= 0)."""
+        if self._length == 0:
+            return None
+        timestamps = self.column(TIMESTAMP)
+        now = timestamps[self._length - 1] if now is None else now
+        lo, hi = self.window(now - window_seconds, now)
+        values = self.column(column)[lo:hi]
+        peak = None
+        worst = 0.0
+        for value in values:
+            if math.isnan(value):
+                continue
+            if peak is None or value > peak:
+                peak = value
+            elif peak > 0:
+                worst = max(worst, (peak - value) / peak * 100)
+        return None if peak is None else worst
+
+
+class SeriesStore:
+    """
+    Armazena o histórico de snapshots por protocolo em arquivos colunares
+    (um por campo) que só crescem por append.
+    """
+
+    def __init__(self, root: str = HISTORY_DIR):
+        self.root = root
+
+    def path(self, protocol: str) -> str:
+        return os.path.join(self.root, _dirname(protocol))
+
+    def protocols(self) -> Sequence[str]:
+        """Nomes (em minúsculas) com histórico; servem de volta em open()/record()."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(unquote(name) for name in os.listdir(self.root))
+
+    def append_many(self, protocol: str, rows: Iterable[dict]):
+        """
+        rows: dicts com `timestamp` e qualquer subconjunto de VALUE_COLUMNS.
+        Os timestamps precisam ser crescentes (mesmo entre chamadas).
+        """
+        rows = list(rows)
+        if not rows:
+            return
+        path = self.path(protocol)
+        os.makedirs(path, exist_ok=True)
+        self._repair(path)
+
+        last = self._last_timestamp(path)
+        for row in rows:
+            ts = int(row[TIMESTAMP])
+            if last is not None and ts < last:
+                raise ValueError(f"timestamps must be non-decreasing for '{protocol}'")
+            last = ts
+
+        for column, fmt in _FORMATS.items():
+            if column == TIMESTAMP:
+                values = [int(r[TIMESTAMP]) for r in rows]
+            else:
+                values = [math.nan if r.get(column) is None else float(r[column]) for r in rows]
+            with open(os.path.join(path, f"{column}.bin"), "ab") as f:
+                f.write(struct.pack(f"={len(values)}{fmt}", *values))
+
+    def append(self, protocol: str, timestamp: Optional[float] = None, **values):
+        unknown = set(values) - set(VALUE_COLUMNS)
+        if unknown:
+            raise ValueError(f"unknown columns: {sorted(unknown)}")
+        row = dict(values)
+        row[TIMESTAMP] = time.time() if timestamp is None else timestamp
+        self.append_many(protocol, [row])
+
+    def record(self, snapshot, score: Optional[int] = None, market_context: Optional[dict] = None,
+               timestamp: Optional[float] = None):
+        """Registra um ProtocolSnapshot (e contexto de mercado, se houver)."""
+        context = market_context or {}
+        self.append(
+            snapshot.name,
+            timestamp=timestamp,
+            tvl=snapshot.tvl,
+            price=context.get("price_usd"),
+            market_cap=context.get("market_cap_usd"),
+            volume=context.get("volume_24h_usd"),
+            score=score,
+        )
+
+    def open(self, protocol: str) -> ProtocolSeries:
+        return ProtocolSeries(self.path(protocol))
+
+    def change(self, protocol: str, column: str = "tvl", days: float = 7) -> Optional[float]:
+        with self.open(protocol) as series:
+            return series.change(column, days * DAY_SECONDS)
+
+    def drawdown(self, protocol: str, column: str = "tvl", days: float = 30) -> Optional[float]:
+        with self.open(protocol) as series:
+            return series.drawdown(column, days * DAY_SECONDS)
+
+    @staticmethod
+    def _repair(path: str):
+        # Descarta linhas incompletas de um append interrompido antes de
+        # escrever, senão as colunas ficariam desalinhadas para sempre
+        sizes = {}
+        missing = []
+        for column, fmt in _FORMATS.items():
+            filename = os.path.join(path, f"{column}.bin")
+            if not os.path.exists(filename):
+                missing.append((filename, fmt))
+                continue
+            sizes[column] = (filename, os.path.getsize(filename), struct.calcsize(fmt))
+        if not sizes:
+            return
+        if TIMESTAMP not in sizes:
+            raise ValueError(f"history at '{path}' has no {TIMESTAMP} column")
+        # Um arquivo ausente não é um append interrompido: sem isso, rows
+        # seria 0 e o histórico das outras colunas seria apagado
+        rows = min(size // width for _, size, width in sizes.values())
+        for filename, size, width in sizes.values():
+            if size != rows * width:
+                with open(filename, "ab") as f:
+                    f.truncate(rows * width)
+        for filename, fmt in missing:
+            # recria a coluna com valores ausentes (NaN) para as linhas existentes
+            with open(filename, "wb") as f:
+                f.write(struct.pack(f"={rows}{fmt}", *[math.nan] * rows))
+
+    @staticmethod
+    def _last_timestamp(path: str) -> Optional[int]:
+        filename = os.path.join(path, f"{TIMESTAMP}.bin")
+        if not os.path.exists(filename):
+            return None
+        size = os.path.getsize(filename) - os.path.getsize(filename) % 8
+        if size == 0:
+            return None
+        with open(filename, "rb") as f:
+            f.seek(size - 8)
+            return struct.unpack("=q", f.read(8))[0]
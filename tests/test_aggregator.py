@@ -0,0 +1,101 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import threading
+import time
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from sentinelzero.datasources import http_cache, remote
+from sentinelzero.datasources.aggregator import ParallelFetcher
+from sentinelzero.utils.cache import SQLiteCache
+
+DELAY = 0.3
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/protocol/aave"):
+            time.sleep(DELAY)
+            body = {"tvl": 1_000}
+        elif self.path.startswith("/simple/price"):
+            time.sleep(DELAY)
+            body = {"aave": {"usd": 90.0, "usd_market_cap": 1_000_000}}
+        elif self.path.startswith("/latest/dex/tokens/aave"):
+            time.sleep(DELAY)
+            body = {"pairs": [{"volumeUsd": 42}]}
+        elif self.path.startswith("/slow"):
+            time.sleep(2)
+            body = {}
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture(autouse=True)
+def isolated_http_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_cache, "_default", http_cache.HttpCache(SQLiteCache(str(tmp_path / "http.db"))))
+
+@pytest.fixture
+def stub_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def test_sources_are_fetched_concurrently(stub_url):
+    fetcher = ParallelFetcher({
+        "defillama": partial(remote.fetch_defillama, base_url=stub_url),
+        "coingecko": partial(remote.fetch_coingecko, base_url=stub_url),
+        "dexscreener": partial(remote.fetch_dexscreener, base_url=stub_url),
+    })
+    start = time.perf_counter()
+    result = fetcher.fetch_sync("aave")
+    elapsed = time.perf_counter() - start
+
+    assert result.complete
+    assert result.get("defillama") == {"tvl_usd": 1_000, "name": "aave"}
+    assert result.get("coingecko") == {"price_usd": 90.0, "market_cap_usd": 1_000_000}
+    assert result.get("dexscreener") == {"volume_24h_usd": 42}
+    # Em série seriam 3 * DELAY
+    assert elapsed < 2 * DELAY
+
+def test_partial_results_on_timeout_and_error(stub_url):
+    fetcher = ParallelFetcher({
+        "defillama": partial(remote.fetch_defillama, base_url=stub_url),
+        "slow": lambda p: remote.get_json(f"{stub_url}/slow"),
+        "missing": partial(remote.fetch_defillama, base_url=stub_url + "/nope"),
+    }, timeouts={"slow": 0.5})
+    start = time.perf_counter()
+    result = fetcher.fetch_sync("aave")
+    elapsed = time.perf_counter() - start
+
+    assert not result.complete
+    assert result.get("defillama") == {"tvl_usd": 1_000, "name": "aave"}
+    assert result.errors["slow"].startswith("timeout")
+    assert "HTTPError" in result.errors["missing"]
+    assert elapsed < 1.5
+
+def test_coroutine_sources():
+    async def source(protocol):
+        return protocol.upper()
+
+    result = ParallelFetcher({"async": source}).fetch_sync("aave")
+    assert result.data == {"async": "AAVE"}
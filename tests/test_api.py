@@ -0,0 +1,156 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+from sentinelzero.api import app as api
+
+@pytest.fixture
+def client():
+    return TestClient(api.app)
+
+def test_risk_report(client):
+    r = client.get("/risk", params={"protocol": "Aave"})
+    assert r.status_code == 200
+    data = r.json()
+    assert data["protocol"] == "aave"
+    assert data["tvl_usd"] == 3_000_000_000
+    assert 0 <= data["risk_score"] <= 100
+    assert "unavailable_sources" not in data
+
+def test_risk_unknown_protocol(client):
+    assert client.get("/risk", params={"protocol": "nope"}).status_code == 404
+    assert client.get("/risk").status_code == 400
+
+def test_risk_partial_sources(client, monkeypatch):
+    def broken(protocol):
+        raise RuntimeError("down")
+    monkeypatch.setitem(api.fetcher.sources, "coingecko", broken)
+    data = client.get("/risk", params={"protocol": "aave"}).json()
+    assert data["unavailable_sources"] == ["coingecko"]
+
+def test_concurrent_risk_calls_are_coalesced(monkeypatch):
+    import asyncio
+    import time
+
+    calls = []
+    def slow_fetch(protocol):
+        calls.append(protocol)
+        time.sleep(0.1)
+        return api.defillama.fetch(protocol)
+    monkeypatch.setitem(api.fetcher.sources, "defillama", slow_fetch)
+
+    async def main():
+        return await asyncio.gather(*(api.get_risk("aave") for _ in range(10)))
+
+    reports = asyncio.run(main())
+    assert calls == ["aave"]
+    assert all(r == reports[0] for r in reports)
+
+def test_interactive_risk_does_not_join_batch_flight(monkeypatch):
+    import asyncio
+    import json
+
+    from sentinelzero.datasources.scheduler import BATCH, INTERACTIVE, request_priority
+
+    seen = []
+    def fetch(protocol):
+        seen.append(request_priority.get())
+        return api.defillama.fetch(protocol)
+    monkeypatch.setitem(api.fetcher.sources, "defillama", fetch)
+
+    async def main():
+        return await asyncio.gather(api._risk_line("aave"), api.get_risk("aave"))
+
+    line, report = asyncio.run(main())
+    assert sorted(seen) == [INTERACTIVE, BATCH]
+    assert json.loads(line)["risk_score"] == report["risk_score"]
+
+def test_risk_batch_streams_ndjson(client):
+    import json
+
+    r = client.post("/risk/batch", json={"protocols": ["aave", "MakerDAO", "nope"]})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    by_protocol = {line["protocol"]: line for line in lines}
+    assert set(by_protocol) == {"aave", "makerdao", "nope"}
+    assert by_protocol["aave"]["risk_score"] == client.get("/risk", params={"protocol": "aave"}).json()["risk_score"]
+    assert by_protocol["nope"]["status"] == 404
+
+def test_risk_batch_survives_unexpected_errors(client, monkeypatch):
+    import json
+
+    def broken_run(snapshot):
+        if snapshot.name == "aave":
+            raise KeyError("tvl")
+        return original_run(snapshot)
+    original_run = api.engine.run
+    monkeypatch.setattr(api.engine, "run", broken_run)
+    # o lote inteiro falha e cai para a pontuação um a um
+    monkeypatch.setattr(api.engine, "run_batch", lambda snapshots: [s.tvl["x"] for s in snapshots])
+
+    r = client.post("/risk/batch", json={"protocols": ["aave", "makerdao"]})
+    by_protocol = {line["protocol"]: line for line in map(json.loads, r.text.splitlines())}
+    assert by_protocol["aave"]["status"] == 500
+    assert "KeyError" in by_protocol["aave"]["error"]
+    assert "risk_score" in by_protocol["makerdao"]
+
+def test_risk_batch_scores_through_run_batch(client, monkeypatch):
+    import json
+
+    batches = []
+    original = api.engine.run_batch
+    def run_batch(snapshots):
+        result = original(snapshots)
+        batches.append(result)
+        return result
+    monkeypatch.setattr(api.engine, "run_batch", run_batch)
+    monkeypatch.setattr(api.engine, "run", lambda snapshot: pytest.fail("scored one by one"))
+
+    r = client.post("/risk/batch", json={"protocols": ["aave", "makerdao"]})
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert sorted(line["protocol"] for line in lines) == ["aave", "makerdao"]
+    assert sum(len(b) for b in batches) == 2
+    assert all(b.findings is not None and len(b.findings) == len(b) for b in batches)
+
+def test_stream_batch_bounds_concurrency(monkeypatch):
+    import asyncio
+    import threading
+    import time
+
+    running = []
+    peak = []
+    lock = threading.Lock()
+    def slow_fetch(protocol):
+        with lock:
+            running.append(protocol)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.remove(protocol)
+        return api.defillama.fetch("aave")
+    monkeypatch.setitem(api.fetcher.sources, "defillama", slow_fetch)
+
+    async def main():
+        return [line async for line in api.stream_batch([f"p{i}" for i in range(20)], concurrency=4)]
+
+    lines = asyncio.run(main())
+    assert len(lines) == 20
+    assert max(peak) <= 4
+
+def test_metrics_endpoint(client):
+    client.get("/risk", params={"protocol": "makerdao"})
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    assert 'sentinelzero_stage_seconds_count{stage="fetch",component="defillama"}' in r.text
+    assert 'sentinelzero_stage_seconds_count{stage="detect",component="oracle"}' in r.text
+    assert 'sentinelzero_stage_seconds_count{stage="report",component=""}' in r.text
@@ -0,0 +1,45 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sentinelzero.core.engine import RiskEngine
+from sentinelzero.core.models import ProtocolSnapshot
+
+def make_snapshots():
+    return [
+        ProtocolSnapshot(name="aave", category="Lending", tvl=3_000_000_000, tvl_change_7d=1.5),
+        ProtocolSnapshot(name="tiny-dex", category="Dexes", tvl=5_000_000, tvl_change_7d=-20.0),
+        ProtocolSnapshot(name="link", tvl=None, entity_type="token"),
+    ]
+
+def test_run_batch_matches_run():
+    engine = RiskEngine()
+    snapshots = make_snapshots()
+    result = engine.run_batch(snapshots)
+
+    assert len(result) == len(snapshots)
+    assert result.protocols == ["aave", "tiny-dex", "link"]
+    for snapshot, (name, score, signals) in zip(snapshots, result):
+        expected_score, expected_signals = engine.run(snapshot)
+        assert name == snapshot.name
+        assert score == expected_score
+        assert list(signals) == expected_signals
+
+def test_run_batch_shares_signals_between_protocols():
+    result = RiskEngine().run_batch(make_snapshots())
+    # Dois protocolos com o mesmo tipo reaproveitam a mesma tupla de sinais
+    assert result.signals[0] is result.signals[1]
+    assert result.signals[0] is not result.signals[2]
+
+def test_run_batch_empty():
+    result = RiskEngine().run_batch([])
+    assert len(result) == 0
+    assert result.scores == []
+
+def test_run_batch_fills_finding_store():
+    result = RiskEngine().run_batch(make_snapshots())
+    assert result.findings.protocols == result.protocols
+    for i, signals in enumerate(result.signals):
+        assert result.findings.signals(i) == signals
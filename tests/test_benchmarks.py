@@ -0,0 +1,25 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+
+from benchmarks import bench_hot_paths
+
+def test_benchmark_suite_smoke(tmp_path):
+    output = tmp_path / "bench.json"
+    assert bench_hot_paths.main(["--sizes", "10", "--repeat", "1", "--output", str(output)]) == 0
+
+    report = json.loads(output.read_text())
+    names = {r["name"] for r in report["results"]}
+    assert {"engine.run", "run_unified_analysis", "calculate_risk", "build_report",
+            "format_report", "cache.get", "cache.get_many"} <= names
+    assert all(r["size"] == 10 and r["best_s"] >= 0 for r in report["results"])
+
+    # comparando com ele mesmo não há regressão
+    assert bench_hot_paths.main([
+        "--sizes", "10", "--repeat", "1", "--only", "calculate_risk",
+        "--output", str(tmp_path / "again.json"), "--compare", str(output), "--threshold", "1000",
+    ]) == 0
@@ -0,0 +1,120 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from sentinelzero.utils.cache import SQLiteCache
+
+@pytest.fixture
+def cache(tmp_path):
+    c = SQLiteCache(str(tmp_path / "cache.db"), ttl=3600)
+    yield c
+    c.close()
+
+def age_key(cache, key, seconds):
+    cache.connection().execute(
+        "UPDATE cache SET updated_at = updated_at - ? WHERE key = ?", (seconds, key)
+    )
+
+def test_get_set_and_wal(cache):
+    assert cache.get("aave") is None
+    cache.set("aave", '{"tvl": 1}')
+    assert cache.get("aave") == '{"tvl": 1}'
+    mode = cache.connection().execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+def test_get_many_set_many(cache):
+    items = {f"p{i}": str(i) for i in range(1200)}
+    cache.set_many(items)
+    found = cache.get_many(list(items) + ["missing"])
+    assert found == items
+
+def test_expired_rows_are_hidden_and_evicted(cache):
+    cache.set_many({"old": "1", "new": "2"})
+    age_key(cache, "old", 7200)
+    assert cache.get("old") is None
+    assert cache.get_many(["old", "new"]) == {"new": "2"}
+    assert cache.evict_expired() == 1
+    count = cache.connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+    assert count == 1
+
+def test_background_eviction(cache):
+    cache.set("old", "1")
+    age_key(cache, "old", 7200)
+    cache.start_eviction(interval=0.05)
+    try:
+        deadline = time.time() + 2
+        while time.time() < deadline:
+            if cache.connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0] == 0:
+                break
+            time.sleep(0.02)
+        else:
+            pytest.fail("expired row was not evicted")
+    finally:
+        cache.stop_eviction()
+
+def test_threads_use_their_own_connection(cache):
+    def worker(n):
+        cache.set(f"t{n}", str(n))
+        cache.close()
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(cache.get_many([f"t{n}" for n in range(8)])) == 8
+
+def _write_from_process(path, n):
+    c = SQLiteCache(path)
+    c.set_many({f"w{n}-{i}": str(i) for i in range(50)})
+
+def test_concurrent_processes(tmp_path):
+    path = str(tmp_path / "shared.db")
+    SQLiteCache(path).connection()
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_write_from_process, args=(path, n)) for n in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+        assert p.exitcode == 0
+    keys = [f"w{n}-{i}" for n in range(4) for i in range(50)]
+    assert len(SQLiteCache(path).get_many(keys)) == 200
+
+def test_tiered_cache_serves_hot_keys_from_memory(cache):
+    from sentinelzero.utils.cache import TieredCache
+    from sentinelzero.utils.lru import LRUCache
+
+    tiered = TieredCache(cache, LRUCache(maxsize=2))
+    tiered.set("aave", "1")
+    # write-through: o valor está no disco e na memória
+    assert cache.get("aave") == "1"
+
+    cache.set("aave", "changed-on-disk")
+    assert tiered.get("aave") == "1"
+    assert tiered.memory.hits == 1
+
+    tiered.set_many({"b": "2", "c": "3"})
+    assert tiered.memory.evictions == 1
+    assert tiered.get_many(["aave", "b", "c"]) == {"aave": "changed-on-disk", "b": "2", "c": "3"}
+    assert tiered.stats()["memory"]["misses"] == 1
+
+def test_tiered_cache_hands_out_copies(cache):
+    from sentinelzero.utils.cache import TieredCache
+
+    tiered = TieredCache(cache)
+    value = {"tvl": 1, "chains": ["Ethereum"]}
+    tiered.set("aave", value)
+    value["chains"].append("changed-after-set")
+
+    first = tiered.get("aave")
+    first["chains"].append("changed-by-reader")
+    assert tiered.get("aave") == {"tvl": 1, "chains": ["Ethereum"]}
+    assert tiered.get_many(["aave"])["aave"] is not tiered.get_many(["aave"])["aave"]
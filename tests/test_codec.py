@@ -0,0 +1,80 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import marshal
+import zlib
+
+import pytest
+
+from sentinelzero.utils import codec
+from sentinelzero.utils.cache import SQLiteCache
+
+LISTING = [{"slug": f"protocol-{i}", "name": f"Protocol {i}", "category": "Dexes",
+            "chains": ["Ethereum", "Arbitrum"], "tvl": i * 1_000.5, "change_7d": None}
+           for i in range(2_000)]
+
+@pytest.mark.parametrize("value", ["text", 42, 1.5, None, [1, "a"], {"k": {"nested": True}}, LISTING])
+def test_round_trip(value):
+    assert codec.decode(codec.encode(value)) == value
+
+def test_small_values_are_not_compressed():
+    assert codec.encode({"tvl": 1})[0] == codec.MARSHAL
+
+def test_large_values_are_compressed():
+    blob = codec.encode(LISTING)
+    assert blob[0] in (codec.MARSHAL_ZLIB, codec.MARSHAL_ZSTD)
+    assert len(blob) < len(json.dumps(LISTING)) / 4
+
+def test_zlib_fallback_without_zstd(monkeypatch):
+    monkeypatch.setattr(codec, "zstandard", None)
+    blob = codec.encode(LISTING)
+    assert blob[0] == codec.MARSHAL_ZLIB
+    assert codec.decode(blob) == LISTING
+
+def test_legacy_text_and_corrupt_payloads():
+    assert codec.decode('{"tvl": 1}') == '{"tvl": 1}'
+    with pytest.raises(codec.CodecError):
+        codec.decode(bytes((codec.MARSHAL_ZLIB,)) + b"not zlib")
+    with pytest.raises(codec.CodecError):
+        codec.decode(b"\x7fwhatever")
+    # binário sem cabeçalho de versão (formato anterior): miss, não marshal.loads
+    with pytest.raises(codec.CodecError):
+        codec.decode(bytes((codec.MARSHAL_ZLIB,)) + zlib.compress(marshal.dumps(1)))
+
+def test_other_python_version_is_rejected():
+    blob = bytearray(codec.encode({"tvl": 1}))
+    blob[2] ^= 0xFF  # major do Python que gravou
+    with pytest.raises(codec.CodecError, match="version"):
+        codec.decode(bytes(blob))
+
+@pytest.mark.parametrize("value", [{"tvl": 1}, LISTING])
+def test_corrupt_payload_is_rejected(value):
+    blob = bytearray(codec.encode(value))
+    blob[-1] ^= 0x01
+    with pytest.raises(codec.CodecError, match="checksum"):
+        codec.decode(bytes(blob))
+    with pytest.raises(codec.CodecError):
+        codec.decode(bytes(blob[:len(blob) // 2]))
+
+def test_sqlite_cache_stores_objects_and_reads_legacy_rows(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+    cache.set("listing", LISTING)
+    assert cache.get("listing") == LISTING
+    stored = cache.connection().execute("SELECT value FROM cache WHERE key = 'listing'").fetchone()[0]
+    assert isinstance(stored, bytes) and len(stored) < len(json.dumps(LISTING)) / 4
+
+    # linha gravada como TEXT pela versão anterior
+    cache.connection().execute(
+        "INSERT INTO cache (key, value, updated_at) VALUES ('old', '{\"tvl\": 1}', strftime('%s','now'))"
+    )
+    cache.connection().execute(
+        "INSERT INTO cache (key, value, updated_at) VALUES ('broken', x'7f00', strftime('%s','now'))"
+    )
+    assert cache.get("old") == '{"tvl": 1}'
+    assert cache.get("broken") is None
+    assert cache.get_many(["old", "broken", "listing"]).keys() == {"old", "listing"}
+    cache.close()
@@ -0,0 +1,195 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import socket
+import stat
+import subprocess
+import tempfile
+import threading
+
+import pytest
+
+if not hasattr(socket, "AF_UNIX"):
+    pytest.skip("Unix sockets not available", allow_module_level=True)
+
+from sentinelzero import daemon
+from sentinelzero.daemon import Daemon, DaemonError, DaemonUnavailable
+from examples.run_analysis_unified import analyze
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+@pytest.fixture
+def socket_path():
+    # caminhos de socket Unix são limitados a ~100 bytes: nada de tmp_path
+    directory = tempfile.mkdtemp(prefix="sz-")
+    path = os.path.join(directory, "d.sock")
+    yield path
+    if os.path.exists(path):
+        os.unlink(path)
+    os.rmdir(directory)
+
+
+@pytest.fixture
+def running(socket_path, monkeypatch):
+    monkeypatch.setattr(daemon, "SOCKET_PATH", socket_path)
+    d = Daemon(socket_path, {"unified": "examples.run_analysis_unified:analyze",
+                             "package_unified": daemon.COMMANDS["package_unified"],
+                             "fail": "os:abort_not_there"})
+    d.bind()
+    thread = threading.Thread(target=d.serve_forever, daemon=True)
+    thread.start()
+    yield d
+    d.shutdown()
+    thread.join(5)
+
+
+def test_call_matches_local_result(running):
+    assert daemon.call("unified", "aave") == analyze("aave")
+    assert daemon.call("ping")["requests"] == 2
+
+
+def test_errors_are_reported_to_the_client(running):
+    with pytest.raises(DaemonError, match="unknown command"):
+        daemon.call("nope")
+    with pytest.raises(DaemonError, match="AttributeError"):
+        daemon.call("fail")
+
+
+def test_socket_is_private(running):
+    assert stat.S_IMODE(os.stat(running.path).st_mode) & 0o077 == 0
+
+
+def test_run_or_local_falls_back_without_daemon(socket_path, monkeypatch):
+    monkeypatch.setattr(daemon, "SOCKET_PATH", socket_path)
+    assert daemon.run_or_local("unified", lambda symbol: symbol.upper(), "aave") == "AAVE"
+
+    # socket órfão de um daemon que morreu
+    orphan = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    orphan.bind(socket_path)
+    orphan.close()
+    with pytest.raises(DaemonUnavailable):
+        daemon.call("ping")
+    assert daemon.run_or_local("unified", lambda symbol: symbol.upper(), "aave") == "AAVE"
+
+    # e um novo daemon reaproveita o caminho
+    d = Daemon(socket_path)
+    d.bind()
+    d._server.server_close()
+
+
+def test_second_daemon_refuses_live_socket(running):
+    with pytest.raises(OSError, match="already listening"):
+        Daemon(running.path).bind()
+
+
+@pytest.mark.parametrize("command", [
+    ["-m", "examples.run_analysis_unified", "makerdao"],
+    [os.path.join("sentinelzero", "examples", "run_analysis_unified.py"), "aave"],
+])
+def test_cli_output_is_identical_through_daemon(running, command):
+    def cli(**env):
+        return subprocess.run(
+            [sys.executable] + command,
+            cwd=ROOT, capture_output=True, text=True, check=True,
+            env=dict(os.environ, SENTINELZERO_DAEMON_SOCKET=running.path,
+                     PYTHONPATH=ROOT, **env),
+        ).stdout
+
+    before = running.requests
+    through_daemon = cli()
+    assert running.requests == before + 1
+    assert through_daemon == cli(SENTINELZERO_DAEMON="0")
+
+
+@pytest.mark.parametrize("reply", [b"", b'{"ok": tr'])
+def test_client_falls_back_when_daemon_drops_the_request(socket_path, monkeypatch, reply):
+    monkeypatch.setattr(daemon, "SOCKET_PATH", socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(1)
+
+    def accept_and_drop():
+        conn, _ = server.accept()
+        conn.recv(1024)
+        conn.sendall(reply)
+        conn.close()
+
+    thread = threading.Thread(target=accept_and_drop, daemon=True)
+    thread.start()
+    try:
+        assert daemon.run_or_local("unified", lambda symbol: symbol.upper(), "aave") == "AAVE"
+    finally:
+        thread.join(5)
+        server.close()
+
+
+def test_client_falls_back_on_read_timeout(socket_path, monkeypatch):
+    monkeypatch.setattr(daemon, "SOCKET_PATH", socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(1)
+    try:
+        with pytest.raises(DaemonUnavailable):
+            daemon.call("unified", "aave", timeout=0.2)
+    finally:
+        server.close()
+
+
+def test_foreign_socket_is_never_used(socket_path, monkeypatch):
+    monkeypatch.setattr(daemon, "SOCKET_PATH", socket_path)
+    # um arquivo comum no lugar do socket
+    open(socket_path, "w").close()
+    assert daemon.run_or_local("unified", lambda symbol: symbol.upper(), "aave") == "AAVE"
+    with pytest.raises(OSError, match="not a socket owned"):
+        Daemon(socket_path).bind()
+    assert os.path.exists(socket_path)
+    os.unlink(socket_path)
+
+    # socket de outro usuário (simulado trocando o uid de quem chama)
+    d = Daemon(socket_path, {"unified": "examples.run_analysis_unified:analyze"})
+    d.bind()
+    thread = threading.Thread(target=d.serve_forever, daemon=True)
+    thread.start()
+    try:
+        monkeypatch.setattr(os, "getuid", lambda: os.stat(socket_path).st_uid + 1)
+        assert daemon.run_or_local("unified", lambda symbol: "local", "aave") == "local"
+        assert d.requests == 0
+        with pytest.raises(OSError, match="not a socket owned"):
+            Daemon(socket_path).bind()
+    finally:
+        monkeypatch.undo()
+        d.shutdown()
+        thread.join(5)
+
+
+def test_default_socket_lives_in_private_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    path = daemon._default_socket_path()
+    assert os.path.dirname(path) == str(tmp_path / f"sentinelzero-{os.getuid()}")
+    Daemon(path)._ensure_directory()
+    assert stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode) == 0o700
+
+    os.chmod(os.path.dirname(path), 0o777)
+    with pytest.raises(OSError, match="private directory"):
+        Daemon(path)._ensure_directory()
+
+
+def test_warm_up_loads_index_and_universe(socket_path, monkeypatch):
+    from sentinelzero.datasources import universe
+    from sentinelzero.utils import entity_index
+
+    loaded = []
+
+    class FakeUniverse:
+        def refresh(self):
+            loaded.append("universe")
+            raise OSError("upstream down")  # não impede o daemon de subir
+
+    monkeypatch.setattr(universe, "get_universe", lambda: FakeUniverse())
+    monkeypatch.setattr(entity_index, "get_entity_index", lambda: loaded.append("index"))
+    Daemon(socket_path, {"unified": "examples.run_analysis_unified:analyze"}).warm_up()
+    assert loaded == ["index", "universe"]
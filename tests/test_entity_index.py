@@ -0,0 +1,108 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import time
+
+import pytest
+
+from sentinelzero.utils import entity_index, resolver
+from sentinelzero.utils.entity_index import EntityIndex, edit_distance
+
+PROTOCOLS = [
+    {"slug": "aave-v3", "name": "Aave V3", "symbol": "AAVE", "gecko_id": "aave",
+     "address": "ethereum:0x7Fc66500c84A76Ad7e9c93437bFc5Ac33E2DDaE9", "tvl": 12_000_000_000},
+    {"slug": "aave-v2", "name": "Aave V2", "symbol": "AAVE", "tvl": 1_000_000_000},
+    {"slug": "uniswap", "name": "Uniswap", "symbol": "UNI", "gecko_id": "uniswap",
+     "address": "0x1f9840a85d5aF5bf1D1762F925BDADdC4201F984", "tvl": 5_000_000_000},
+    {"slug": "compound-v3", "name": "Compound V3", "symbol": "COMP", "tvl": 2_000_000_000},
+    {"slug": "curve-dex", "name": "Curve DEX", "symbol": "-", "tvl": 2_500_000_000},
+]
+
+
+@pytest.fixture
+def index():
+    return EntityIndex.from_defillama(PROTOCOLS)
+
+
+def test_exact_lookup_by_every_identifier(index):
+    assert index.get("Uniswap")["defillama_slug"] == "uniswap"
+    assert index.get("uni")["defillama_slug"] == "uniswap"
+    assert index.get("0x1F9840A85D5AF5BF1D1762F925BDADDC4201F984")["defillama_slug"] == "uniswap"
+    assert index.get("0x7fc66500c84a76ad7e9c93437bfc5ac33e2ddae9")["defillama_slug"] == "aave-v3"
+    assert index.get("ethereum:0x1f9840a85d5af5bf1d1762f925bdaddc4201f984")["defillama_slug"] == "uniswap"
+    assert index.get("aave-v2")["name"] == "Aave V2"
+    assert index.get("  compound   v3 ")["defillama_slug"] == "compound-v3"
+    assert index.get("-") is None
+    assert index.get("nothing") is None
+
+
+def test_ambiguous_symbol_goes_to_largest_tvl(index):
+    assert index.get("AAVE")["defillama_slug"] == "aave-v3"
+
+
+def test_prefix_search_ranked_by_tvl(index):
+    assert [e["defillama_slug"] for e in index.prefix("aave")] == ["aave-v3", "aave-v2"]
+    assert [e["defillama_slug"] for e in index.prefix("c")] == ["curve-dex", "compound-v3"]
+    assert index.prefix("zzz") == []
+
+
+def test_fuzzy_search_tolerates_typos(index):
+    matches = index.fuzzy("unsiwap", max_distance=2)
+    assert matches[0][0]["defillama_slug"] == "uniswap"
+    assert index.fuzzy("completely different") == []
+
+
+def test_fuzzy_finds_mid_word_transpositions():
+    # "dc" troca dois caracteres no meio: 4 trigramas perdidos com 1 edição
+    index = EntityIndex.from_defillama([{"slug": "abcdefg", "name": "abcdefg", "tvl": 1}])
+    assert edit_distance("abdcefg", "abcdefg", 1) == 1
+    assert [distance for _, distance in index.fuzzy("abdcefg", max_distance=1)] == [1]
+    assert index.resolve("abdcefg")["defillama_slug"] == "abcdefg"
+
+
+def test_resolve_falls_back_to_unique_typo_fix(index):
+    assert index.resolve("uniswpa")["defillama_slug"] == "uniswap"
+    assert index.resolve("compund v3")["defillama_slug"] == "compound-v3"
+    # símbolos curtos não passam por correção
+    assert index.resolve("unj") is None
+    # "aave v4" está a uma edição de "aave v3" e de "aave v2": ambíguo
+    assert index.resolve("aave v4") is None
+
+
+def test_edit_distance_is_bounded():
+    assert edit_distance("kitten", "sitting", 3) == 3
+    assert edit_distance("kitten", "sitting", 1) == 2
+    assert edit_distance("a", "abcdef", 2) == 3
+    assert edit_distance("uniswap", "uniswpa", 2) == 1
+
+
+def test_save_and_load_round_trip(index, tmp_path):
+    path = str(tmp_path / "entities.json.gz")
+    index.save(path)
+    loaded = EntityIndex.load(path)
+    assert len(loaded) == len(index)
+    assert loaded.get("uni") == index.get("uni")
+    assert loaded.resolve("uniswpa")["defillama_slug"] == "uniswap"
+
+
+def test_lookups_stay_fast_with_many_entities():
+    protocols = [{"slug": f"protocol-{i}", "name": f"Protocol {i}", "symbol": f"P{i}", "tvl": i}
+                 for i in range(30_000)]
+    index = EntityIndex.from_defillama(protocols)
+    index.fuzzy("warm up")
+
+    start = time.perf_counter()
+    for i in range(1_000):
+        assert index.get(f"p{i * 7}") is not None
+    assert (time.perf_counter() - start) / 1_000 < 1e-3
+    assert len(index.prefix("protocol 2999", limit=20)) == 11
+
+
+def test_resolver_uses_index_for_unregistered_entities(index, monkeypatch):
+    monkeypatch.setattr(entity_index, "_default", index)
+    assert resolver.resolve_identifier("aave")["name"] == "Aave V3"
+    assert resolver.resolve_identifier("uniswap")["defillama_slug"] == "uniswap"
+    assert resolver.resolve_identifier("does-not-exist") == {"type": "unknown"}
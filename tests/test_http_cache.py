@@ -0,0 +1,139 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from sentinelzero.datasources import http_cache, remote
+from sentinelzero.datasources.http_cache import HttpCache
+from sentinelzero.utils.cache import SQLiteCache
+
+class ListingHandler(BaseHTTPRequestHandler):
+    """Serve /protocols com ETag e Last-Modified, respondendo 304 quando possível."""
+    version = 1
+    requests = []
+
+    def do_GET(self):
+        etag = f'"v{ListingHandler.version}"'
+        conditional = self.headers.get("If-None-Match")
+        ListingHandler.requests.append(conditional)
+        if conditional == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        payload = json.dumps([{"slug": "aave", "tvl": ListingHandler.version}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", "Wed, 01 Jan 2025 00:00:00 GMT")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def listing_url():
+    ListingHandler.version = 1
+    ListingHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ListingHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/protocols"
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    c = HttpCache(SQLiteCache(str(tmp_path / "http.db")))
+    monkeypatch.setattr(http_cache, "_default", c)
+    return c
+
+def fetcher(url):
+    return lambda headers: remote._request(url, 5, None, headers)
+
+def expire(cache, url, age):
+    key = cache.key(url)
+    entry = cache.load(key)
+    entry.fetched_at = time.time() - age
+    cache.save(key, entry)
+
+def test_fresh_entries_are_served_without_network(cache, listing_url):
+    assert cache.get_json(listing_url, fetcher(listing_url), max_age=60) == [{"slug": "aave", "tvl": 1}]
+    assert cache.get_json(listing_url, fetcher(listing_url), max_age=60) == [{"slug": "aave", "tvl": 1}]
+    assert ListingHandler.requests == [None]
+    assert cache.stats["downloads"] == 1 and cache.stats["hits"] == 1
+
+def test_expired_entry_revalidates_with_validators(cache, listing_url):
+    cache.get_json(listing_url, fetcher(listing_url), max_age=60, stale_while_revalidate=0)
+    expire(cache, listing_url, 120)
+
+    assert cache.get_json(listing_url, fetcher(listing_url), max_age=60, stale_while_revalidate=0)[0]["tvl"] == 1
+    assert ListingHandler.requests == [None, '"v1"']
+    assert cache.stats["not_modified"] == 1
+    # o 304 renovou a entrada
+    assert cache.load(cache.key(listing_url)).age() < 5
+
+    ListingHandler.version = 2
+    expire(cache, listing_url, 120)
+    assert cache.get_json(listing_url, fetcher(listing_url), max_age=60, stale_while_revalidate=0)[0]["tvl"] == 2
+    assert cache.load(cache.key(listing_url)).etag == '"v2"'
+
+def test_stale_entry_is_served_while_revalidating(cache, listing_url):
+    cache.get_json(listing_url, fetcher(listing_url), max_age=60)
+    ListingHandler.version = 2
+    expire(cache, listing_url, 120)
+
+    # dentro da janela stale: devolve o valor antigo na hora
+    assert cache.get_json(listing_url, fetcher(listing_url), max_age=60, stale_while_revalidate=600)[0]["tvl"] == 1
+    deadline = time.time() + 5
+    while cache.load(cache.key(listing_url)).data[0]["tvl"] != 2:
+        assert time.time() < deadline
+        time.sleep(0.01)
+    assert cache.stats["stale_hits"] == 1
+
+def test_not_modified_rewrites_only_metadata(cache, listing_url, monkeypatch):
+    cache.get_json(listing_url, fetcher(listing_url), max_age=60, stale_while_revalidate=0)
+    expire(cache, listing_url, 120)
+
+    written = []
+    set_many = cache.store.set_many
+    monkeypatch.setattr(cache.store, "set_many", lambda items: (written.extend(items), set_many(items)))
+    entry = cache.get_entry(listing_url, fetcher(listing_url), max_age=60, stale_while_revalidate=0)
+    assert cache.stats["not_modified"] == 1
+    assert written == [cache.key(listing_url)]
+    assert entry.data == [{"slug": "aave", "tvl": 1}] and entry.age() < 5
+    assert cache.load(cache.key(listing_url)).data == entry.data
+
+def test_stale_entry_keeps_fetch_time(cache, listing_url):
+    cache.get_json(listing_url, fetcher(listing_url), max_age=60)
+    expire(cache, listing_url, 120)
+    entry = remote.get_cached(listing_url)
+    assert 119 < entry.age() < 125
+
+def test_stale_entry_survives_upstream_errors(cache):
+    url = "http://example.invalid/protocols"
+    cache.save(cache.key(url), http_cache.CachedResponse(data=[1], fetched_at=0, etag='"x"'))
+
+    def failing(headers):
+        raise OSError("down")
+
+    assert cache.get_json(url, failing, max_age=1, stale_while_revalidate=0) == [1]
+    with pytest.raises(OSError):
+        cache.get_json("http://example.invalid/other", failing)
+
+def test_remote_get_json_uses_http_cache(cache, listing_url):
+    assert remote.get_json(listing_url, cached=True) == [{"slug": "aave", "tvl": 1}]
+    assert remote.get_json(listing_url, cached=True) == [{"slug": "aave", "tvl": 1}]
+    assert ListingHandler.requests == [None]
+    assert cache.key(listing_url, {"b": 1, "a": 2}) == f"http:{listing_url}?a=2&b=1"
@@ -0,0 +1,137 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import multiprocessing
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from sentinelzero.datasources import http_client, remote
+from sentinelzero.datasources.http_client import HttpClient
+from sentinelzero.datasources.scheduler import should_retry
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Registra a porta de origem de cada requisição e a concorrência máxima."""
+    protocol_version = "HTTP/1.1"
+    ports = []
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = KeepAliveHandler
+        with cls.lock:
+            cls.ports.append(self.client_address[1])
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            if self.path.startswith("/slow"):
+                time.sleep(0.2)
+            status = {"/missing": 404, "/cached": 304}.get(self.path, 200)
+            payload = b"" if status == 304 else b'{"ok": true}'
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    KeepAliveHandler.ports = []
+    KeepAliveHandler.active = KeepAliveHandler.max_active = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client():
+    c = HttpClient(http2=False)
+    yield c
+    c.close()
+
+
+def test_connections_are_reused(client, server_url):
+    for _ in range(5):
+        assert client.get(f"{server_url}/data").json() == {"ok": True}
+    assert len(KeepAliveHandler.ports) == 5
+    assert len(set(KeepAliveHandler.ports)) == 1
+
+
+def test_connections_per_host_are_limited(server_url):
+    client = HttpClient(max_per_host=2, http2=False)
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(lambda i: client.get(f"{server_url}/slow/{i}"), range(6)))
+    client.close()
+    assert KeepAliveHandler.max_active == 2
+    assert len(set(KeepAliveHandler.ports)) == 2
+
+
+def test_errors_follow_requests_contract(client, server_url):
+    assert client.get(f"{server_url}/cached").status_code == 304
+
+    with pytest.raises(requests.HTTPError) as info:
+        client.get(f"{server_url}/missing")
+    assert info.value.response.status_code == 404
+    assert not should_retry(info.value)
+
+    # porta livre: conexão recusada
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    with pytest.raises(requests.ConnectionError) as info:
+        client.get(f"http://127.0.0.1:{port}/", timeout=1)
+    assert isinstance(info.value, OSError) and should_retry(info.value)
+
+
+def test_remote_uses_shared_client(client, server_url, monkeypatch):
+    monkeypatch.setattr(http_client, "_default", client)
+    assert remote.get_json(f"{server_url}/a") == {"ok": True}
+    assert remote.get_json(f"{server_url}/b") == {"ok": True}
+    assert len(set(KeepAliveHandler.ports)) == 1
+
+
+def _has_no_client():
+    return http_client._default is None
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork not available")
+def test_forked_children_start_without_parent_connections(client, monkeypatch):
+    monkeypatch.setattr(http_client, "_default", client)
+    with multiprocessing.get_context("fork").Pool(1) as pool:
+        assert pool.apply(_has_no_client)
+    assert http_client._default is client
+
+
+def test_http2_backend(server_url):
+    pytest.importorskip("httpx")
+    pytest.importorskip("h2")
+    client = HttpClient(http2=True)
+    try:
+        assert client.get(f"{server_url}/data").json() == {"ok": True}
+        with pytest.raises(requests.HTTPError) as info:
+            client.get(f"{server_url}/missing")
+        assert info.value.response.status_code == 404
+    finally:
+        client.close()
@@ -0,0 +1,60 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dataclasses import replace
+
+from sentinelzero.core.engine import RiskEngine, DETECTORS
+from sentinelzero.core.models import ProtocolSnapshot
+
+def test_first_run_matches_full_run():
+    engine = RiskEngine()
+    snapshot = ProtocolSnapshot(name="aave", tvl=3_000_000_000)
+    assert engine.run_incremental(snapshot) == engine.run(snapshot)
+    assert engine.incremental_stats["detector_runs"] == len(DETECTORS)
+
+def test_tvl_change_skips_detectors_but_updates_score():
+    engine = RiskEngine()
+    snapshot = ProtocolSnapshot(name="aave", tvl=3_000_000_000)
+    engine.run_incremental(snapshot)
+
+    dropped = replace(snapshot, tvl=50_000_000, tvl_change_7d=-98.0)
+    assert engine.run_incremental(dropped) == engine.run(dropped)
+    assert engine.incremental_stats == {"detector_runs": len(DETECTORS), "detector_skips": len(DETECTORS)}
+
+def test_type_change_reruns_detectors():
+    engine = RiskEngine()
+    snapshot = ProtocolSnapshot(name="link", tvl=0, entity_type="protocol")
+    engine.run_incremental(snapshot)
+    token = replace(snapshot, entity_type="token")
+    assert engine.run_incremental(token) == engine.run(token)
+    assert engine.incremental_stats["detector_runs"] == 2 * len(DETECTORS)
+
+def test_forget_resets_state():
+    engine = RiskEngine()
+    snapshot = ProtocolSnapshot(name="aave", tvl=1)
+    engine.run_incremental(snapshot)
+    engine.forget("aave")
+    engine.run_incremental(snapshot)
+    assert engine.incremental_stats["detector_runs"] == 2 * len(DETECTORS)
+
+def test_stream_alerts_reach_the_score():
+    from sentinelzero.signals.tvl_stream import TvlStreamDetector
+
+    engine = RiskEngine(tvl_stream=TvlStreamDetector())
+    base = ProtocolSnapshot(name="aave", tvl=3_000_000_000)
+    score, _ = engine.run_incremental(base, timestamp=0)
+    assert score == engine.run(base)[0]
+
+    dropped = replace(base, tvl=2_000_000_000)
+    score, signals = engine.run_incremental(dropped, timestamp=3600)
+    assert {s.description for s in signals if s.source == "stream"} == {"Sudden TVL drawdown", "Rapid TVL outflow"}
+    assert score == min(100, engine.run(dropped)[0] + 20 + 10)
+
+    # depois de uma semana no mesmo patamar os alertas desarmam
+    score, signals = engine.run_incremental(dropped, timestamp=8 * 24 * 3600)
+    assert score == engine.run(dropped)[0] and engine.stream_signals("aave") == []
+    engine.forget()
+    assert len(engine.tvl_stream) == 0
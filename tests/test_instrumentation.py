@@ -0,0 +1,80 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from sentinelzero.core.engine import RiskEngine
+from sentinelzero.core.models import ProtocolSnapshot
+from sentinelzero.utils import instrumentation
+from sentinelzero.utils.cache import SQLiteCache, TieredCache
+from sentinelzero.utils.instrumentation import CACHE_REQUESTS, STAGE_SECONDS, Registry
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    was_enabled = instrumentation.enabled()
+    instrumentation.set_enabled(True)
+    instrumentation.REGISTRY.reset()
+    yield
+    instrumentation.set_enabled(was_enabled)
+    instrumentation.REGISTRY.reset()
+
+def test_stage_timers_and_disabled_mode():
+    with instrumentation.stage("resolve"):
+        pass
+    assert STAGE_SECONDS.count("resolve", "") == 1
+
+    instrumentation.set_enabled(False)
+    assert instrumentation.stage("resolve") is instrumentation.stage("score")
+    with instrumentation.stage("resolve"):
+        pass
+    instrumentation.cache_lookup("memory", hits=1)
+    assert STAGE_SECONDS.count("resolve", "") == 1
+    assert CACHE_REQUESTS.items() == []
+
+def test_timed_decorator_records_even_on_error():
+    @instrumentation.timed("report")
+    def boom():
+        raise RuntimeError
+    with pytest.raises(RuntimeError):
+        boom()
+    assert STAGE_SECONDS.count("report", "") == 1
+
+def test_engine_records_detector_and_scoring_stages():
+    RiskEngine().run(ProtocolSnapshot(name="aave", tvl=1_000))
+    for detector in ("liquidity", "governance", "oracle"):
+        assert STAGE_SECONDS.count("detect", detector) == 1
+    assert STAGE_SECONDS.count("score", "") == 1
+
+def test_cache_hit_ratio(tmp_path):
+    cache = TieredCache(SQLiteCache(str(tmp_path / "cache.db")))
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    cache.get_many(["a", "c"])
+    assert instrumentation.cache_hit_ratios() == {"memory": 0.5, "sqlite": 0.0}
+    assert 'sentinelzero_cache_hit_ratio{cache="memory"} 0.5' in instrumentation.render()
+
+def test_prometheus_text_format():
+    registry = Registry()
+    hist = registry.histogram("demo_seconds", "Demo", ("source",), buckets=(0.1, 1.0))
+    hist.observe(0.05, "defillama")
+    hist.observe(0.5, "defillama")
+    hist.observe(3.0, "defillama")
+    registry.counter("demo_total", "Demo", ("path",)).inc('a"b')
+    assert registry.render().splitlines() == [
+        "# HELP demo_seconds Demo",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{source="defillama",le="0.1"} 1',
+        'demo_seconds_bucket{source="defillama",le="1.0"} 2',
+        'demo_seconds_bucket{source="defillama",le="+Inf"} 3',
+        'demo_seconds_sum{source="defillama"} 3.55',
+        'demo_seconds_count{source="defillama"} 3',
+        "# HELP demo_total Demo",
+        "# TYPE demo_total counter",
+        'demo_total{path="a\\"b"} 1',
+    ]
+    with pytest.raises(ValueError):
+        registry.counter("demo_seconds", "clash")
@@ -0,0 +1,35 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import time
+
+import pytest
+
+from sentinelzero.utils.lru import LRUCache
+
+def test_lru_eviction_order():
+    lru = LRUCache(maxsize=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1  # "a" passa a ser o mais recente
+    lru.set("c", 3)
+    assert "b" not in lru
+    assert lru.get("a") == 1 and lru.get("c") == 3
+    assert lru.stats()["evictions"] == 1
+
+def test_lru_ttl_and_counters():
+    lru = LRUCache(maxsize=10, ttl=0.05)
+    lru.set("a", 1)
+    assert lru.get("a") == 1
+    time.sleep(0.06)
+    assert lru.get("a") is None
+    stats = lru.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 1)
+    assert stats["hit_ratio"] == 0.5
+
+def test_lru_rejects_invalid_size():
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=0)
@@ -0,0 +1,93 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pstats
+
+import pytest
+
+from sentinelzero.core.analysis import run_unified_analysis
+from sentinelzero.utils import instrumentation, profiling
+from sentinelzero.utils.profiling import Profiler, ProtocolProfile, folded_stacks
+
+
+@pytest.fixture
+def profiler():
+    p = profiling.enable()
+    yield p
+    profiling.disable()
+
+
+def test_profile_records_stages_and_wall_time(profiler):
+    run_unified_analysis("aave")
+    [record] = profiler.records
+    assert record.protocol == "aave"
+    assert record.wall_seconds > 0
+    assert "resolve" in record.stages and "score" in record.stages
+    assert any(key.startswith("detect:") for key in record.stages)
+    assert record.stats
+
+
+def test_nested_runs_are_merged_into_outer_profile(profiler):
+    with profiler.profile("batch"):
+        run_unified_analysis("aave")
+        run_unified_analysis("link")
+    assert [r.protocol for r in profiler.records] == ["batch"]
+
+
+def test_disable_removes_stage_hook():
+    before = instrumentation._stage_hooks
+    profiling.enable()
+    assert len(instrumentation._stage_hooks) == len(before) + 1
+    profiling.disable()
+    assert instrumentation._stage_hooks == before
+    assert profiling.get_profiler() is None
+
+
+def test_stage_hooks_run_with_metrics_disabled(monkeypatch):
+    monkeypatch.setattr(instrumentation, "_enabled", False)
+    p = Profiler(use_cprofile=False)
+    p.attach()
+    try:
+        with p.profile("aave"):
+            with instrumentation.stage("fetch", "defillama"):
+                pass
+    finally:
+        p.detach()
+    assert "fetch:defillama" in p.records[0].stages
+    assert instrumentation.STAGE_SECONDS.count("fetch", "defillama") == 0
+
+
+def test_slowest_is_ordered_by_wall_time():
+    p = Profiler(top_n=2)
+    for name, seconds in (("a", 0.1), ("b", 0.3), ("c", 0.2)):
+        p.add(ProtocolProfile(name, wall_seconds=seconds, stages={"score": seconds / 2}))
+    assert [r.protocol for r in p.slowest()] == ["b", "c"]
+    assert "etapa mais lenta: score" in p.summary().splitlines()[1]
+
+
+def test_folded_stacks_follow_call_graph():
+    outer = ("app.py", 1, "outer")
+    inner = ("app.py", 5, "inner")
+    stats = {
+        outer: (1, 1, 0.001, 0.004, {}),
+        inner: (2, 2, 0.003, 0.003, {outer: (2, 2, 0.003, 0.003)}),
+    }
+    folded = folded_stacks(stats, "aave")
+    assert folded == pytest.approx({"aave;app.py:outer": 0.001, "aave;app.py:outer;app.py:inner": 0.003})
+
+
+def test_write_produces_flamegraph_pstats_and_summary(profiler, tmp_path):
+    run_unified_analysis("aave")
+    run_unified_analysis("makerdao")
+    paths = profiler.write(str(tmp_path))
+
+    lines = (tmp_path / "profile.folded").read_text().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert {line.split(";", 1)[0] for line in lines} == {"aave", "makerdao"}
+    assert not any("profiling.py" in line for line in lines)
+
+    assert pstats.Stats(paths["pstats"]).total_calls > 0
+    assert (tmp_path / "slowest.txt").read_text().startswith("Top 10")
@@ -0,0 +1,52 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sentinelzero.core.models import RiskSignal, RiskCategory, Severity
+from sentinelzero.signals.rules import RuleRegistry
+from sentinelzero.signals.governance import governance_signals
+from sentinelzero.signals.oracle import oracle_signals
+
+def create_signal(description, category=RiskCategory.GOVERNANCE):
+    return RiskSignal(
+        category=category,
+        description=description,
+        severity=Severity.LOW,
+        rationale="Testing",
+    )
+
+def test_decision_table_by_type_and_category():
+    registry = RuleRegistry()
+    registry.register(create_signal("protocol only"), entity_types={"protocol"})
+    registry.register(create_signal("everyone"))
+    registry.register(create_signal("liquidity", RiskCategory.LIQUIDITY), entity_types={"token"})
+
+    gov = RiskCategory.GOVERNANCE
+    assert [s.description for s in registry.lookup("protocol", gov)] == ["protocol only", "everyone"]
+    assert [s.description for s in registry.lookup("token", gov)] == ["everyone"]
+    # tipos desconhecidos recebem apenas as regras sem restrição de tipo
+    assert [s.description for s in registry.lookup("unknown", gov)] == ["everyone"]
+    assert registry.lookup("protocol", RiskCategory.LIQUIDITY) == ()
+    assert registry.lookup("protocol", RiskCategory.SECURITY) == ()
+
+def test_evaluate_many_reuses_tuples():
+    registry = RuleRegistry()
+    registry.register(create_signal("a"), entity_types={"protocol"})
+    results = registry.evaluate_many(["protocol", "token", "protocol"], RiskCategory.GOVERNANCE)
+    assert results[0] is results[2]
+    assert results[1] == ()
+
+def test_signals_are_interned():
+    registry = RuleRegistry()
+    first = registry.register(create_signal("same"), entity_types={"protocol"})
+    second = registry.register(create_signal("same"), entity_types={"token"})
+    assert first.signal is second.signal
+
+def test_detectors_return_shared_instances():
+    entity = {"name": "Aave", "type": "protocol"}
+    a, b = governance_signals(entity), governance_signals(entity)
+    assert a == b and a is not b
+    assert all(x is y for x, y in zip(a, b))
+    assert len(oracle_signals({"type": "token"})) == 2
@@ -0,0 +1,69 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sentinelzero.core.engine import RiskEngine
+from sentinelzero.core.models import ProtocolSnapshot, RiskSignal, RiskCategory, Severity
+from sentinelzero.core.signal_store import FindingStore, SignalCatalog
+from sentinelzero.reports.schema import build_report
+
+def create_signal(n):
+    return RiskSignal(RiskCategory.GOVERNANCE, f"signal {n}", Severity.LOW, "Testing")
+
+def test_catalog_interns_signals():
+    catalog = SignalCatalog()
+    assert catalog.intern(create_signal(1)) == 0
+    assert catalog.intern(create_signal(2)) == 1
+    assert catalog.intern(create_signal(1)) == 0
+    assert len(catalog) == 2
+
+def test_store_round_trip_matches_report():
+    snapshots = [
+        ProtocolSnapshot(name="aave", tvl=3_000_000_000),
+        ProtocolSnapshot(name="link", tvl=None, entity_type="token"),
+    ]
+    result = RiskEngine().run_batch(snapshots)
+    store = FindingStore.from_batch(result)
+
+    assert len(store) == 2
+    assert store.ids.typecode == "H"
+    for i, (snapshot, (name, score, signals)) in enumerate(zip(snapshots, result)):
+        assert store.protocols[i] == name
+        assert store.signals(i) == signals
+        assert store.findings(i) == build_report(snapshot, score, signals)["risk_findings"]
+
+def test_store_widens_ids_for_large_catalogs():
+    store = FindingStore()
+    for n in range(0x10000):
+        store.catalog.intern(create_signal(n))
+    store.append("first", [create_signal(0)])
+    store.append("big", [create_signal(70_000), create_signal(3)])
+    assert store.ids.typecode == "I"
+    assert list(store.signal_ids(0)) == [0]
+    assert list(store.signal_ids(1)) == [0x10000, 3]
+
+def test_append_while_ids_are_held():
+    store = FindingStore()
+    store.append("a", [create_signal(1), create_signal(2)])
+    held = store.signal_ids(0)
+    rows = list(store)
+    store.append("b", [create_signal(3)])
+    assert list(held) == [0, 1]
+    assert [list(ids) for _, ids in rows] == [[0, 1]]
+
+def test_batch_reports_match_single_reports():
+    from sentinelzero.reports.schema import build_batch_reports
+
+    snapshots = [
+        ProtocolSnapshot(name="aave", tvl=3_000_000_000),
+        ProtocolSnapshot(name="link", tvl=None, entity_type="token"),
+    ]
+    result = RiskEngine().run_batch(snapshots)
+    reports = build_batch_reports(snapshots, result)
+    assert reports == [build_report(s, score, signals) for s, (_, score, signals) in zip(snapshots, result)]
+
+    # cada relatório recebe seus próprios dicts
+    reports[0]["risk_findings"][0]["severity"] = "changed"
+    assert build_report(snapshots[0], result.scores[0], result.signals[0])["risk_findings"][0]["severity"] != "changed"
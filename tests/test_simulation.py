@@ -0,0 +1,46 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import multiprocessing
+import time
+
+import run_full_simulation_prod as sim
+
+def hang_or_echo(entity):
+    if entity == "hang":
+        time.sleep(60)
+    if entity == "boom":
+        raise ValueError("boom")
+    return entity.upper(), None
+
+def test_hung_entity_does_not_block_the_rest():
+    start = time.monotonic()
+    outcomes = sim.analyze_all(["hang", "a", "b", "boom", "c"], workers=1, timeout=1, analyze=hang_or_echo)
+    # com 1 worker, "a".."c" estavam na fila atrás do travado
+    assert isinstance(outcomes["hang"], multiprocessing.TimeoutError)
+    assert isinstance(outcomes["boom"], ValueError)
+    assert [outcomes[e] for e in "abc"] == [("A", None), ("B", None), ("C", None)]
+    assert time.monotonic() - start < 10
+
+def test_run_examples_logs_in_entity_order():
+    logger = sim.SimulationLogger.__new__(sim.SimulationLogger)
+    logger.report_lines = []
+    sim.run_examples(["aave", "nope"], logger, workers=2)
+    text = "\n".join(logger.report_lines)
+    assert text.index("Analisando aave") < text.index("Analisando nope")
+    assert "Falha na execução de nope" in text
+
+def test_repeated_entities_are_analyzed_once():
+    outcomes = sim.analyze_all(["a", "b", "a"], workers=2, timeout=5, analyze=hang_or_echo)
+    assert outcomes == {"a": ("A", None), "b": ("B", None)}
+
+def test_run_examples_warns_on_repeated_entities():
+    logger = sim.SimulationLogger.__new__(sim.SimulationLogger)
+    logger.report_lines = []
+    sim.run_examples(["nope", "nope"], logger, workers=2)
+    text = "\n".join(logger.report_lines)
+    assert "Entidades repetidas, analisadas uma vez: nope" in text
+    assert text.count("Analisando nope...") == 2
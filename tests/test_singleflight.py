@@ -0,0 +1,73 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+
+import pytest
+
+from sentinelzero.utils.singleflight import SingleFlight
+
+def test_concurrent_calls_share_one_job():
+    calls = []
+
+    async def job():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"risk_score": 80}
+
+    async def main():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("aave", job) for _ in range(20)))
+        assert len(flight) == 0
+        # depois que o job termina, uma nova chamada busca de novo
+        await flight.do("aave", job)
+        return results
+
+    results = asyncio.run(main())
+    assert len(calls) == 2
+    assert all(r is results[0] for r in results)
+
+def test_different_keys_run_separately():
+    async def job(key):
+        await asyncio.sleep(0.01)
+        return key
+
+    async def main():
+        flight = SingleFlight()
+        return await asyncio.gather(flight.do("a", lambda: job("a")), flight.do("b", lambda: job("b")))
+
+    assert asyncio.run(main()) == ["a", "b"]
+
+def test_exception_is_shared():
+    calls = []
+
+    async def job():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise LookupError("not found")
+
+    async def main():
+        flight = SingleFlight()
+        return await asyncio.gather(*(flight.do("x", job) for _ in range(5)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(isinstance(r, LookupError) for r in results)
+
+def test_cancelled_caller_does_not_cancel_job():
+    async def job():
+        await asyncio.sleep(0.05)
+        return 1
+
+    async def main():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.do("k", job))
+        second = asyncio.ensure_future(flight.do("k", job))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == 1
@@ -0,0 +1,66 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import subprocess
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Módulos que o caminho de análise importa em todo processo novo
+ENTRY_MODULES = (
+    "sentinelzero.core.analysis",
+    "sentinelzero.core.engine",
+    "sentinelzero.datasources.remote",
+    "sentinelzero.datasources.aggregator",
+    "sentinelzero.datasources.universe",
+    "sentinelzero.reports.formatter",
+    "sentinelzero.utils.profiling",
+    "sentinelzero.api",
+)
+# Só devem ser carregados no primeiro uso
+HEAVY_MODULES = ("numpy", "requests", "urllib3", "jsonschema", "reportlab", "fastapi", "pydantic",
+                 "cProfile", "pstats")
+# Folga grande: o que pega regressões é a lista de módulos; o tempo só
+# falha se alguém voltar a importar algo muito pesado no topo de um módulo
+IMPORT_BUDGET_SECONDS = 1.0
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def cold_import(modules=ENTRY_MODULES):
+    out = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(modules=tuple(modules), heavy=HEAVY_MODULES)],
+        cwd=ROOT, capture_output=True, text=True, check=True, timeout=60,
+    )
+    return json.loads(out.stdout)
+
+
+def test_cold_import_skips_heavy_modules():
+    result = cold_import()
+    assert result["loaded"] == []
+
+
+def test_cold_import_time_budget():
+    # melhor de três, para não falhar por um processo vizinho
+    best = min(cold_import()["seconds"] for _ in range(3))
+    assert best < IMPORT_BUDGET_SECONDS
+
+
+def test_heavy_modules_load_on_first_use():
+    pytest.importorskip("numpy")
+    from sentinelzero.core import engine
+
+    engine._vectorized = None
+    assert engine._load_vectorized().__name__ == "sentinelzero.scoring.vectorized"
@@ -0,0 +1,117 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from sentinelzero.core.models import ProtocolSnapshot
+from sentinelzero.utils.timeseries import DAY_SECONDS, SeriesStore
+
+T0 = 1_700_000_000
+
+@pytest.fixture
+def store(tmp_path):
+    return SeriesStore(str(tmp_path / "history"))
+
+def test_append_and_window_queries(store):
+    tvls = [100, 120, 90, 60, 80, 110]
+    store.append_many("aave", [
+        {"timestamp": T0 + i * DAY_SECONDS, "tvl": tvl, "score": 70} for i, tvl in enumerate(tvls)
+    ])
+    # append incremental em outra chamada
+    store.append("aave", timestamp=T0 + 6 * DAY_SECONDS, tvl=150)
+
+    with store.open("aave") as series:
+        assert len(series) == 7
+        assert series.window(T0 + DAY_SECONDS, T0 + 3 * DAY_SECONDS) == (1, 4)
+        # 150 vs 120 (seis dias antes do último ponto)
+        assert series.change("tvl", 5 * DAY_SECONDS) == pytest.approx(25.0)
+        # pico 120 -> vale 60
+        assert series.drawdown("tvl", 30 * DAY_SECONDS) == pytest.approx(50.0)
+        # janela de 2 dias: 80, 110, 150 -> sem queda
+        assert series.drawdown("tvl", 2 * DAY_SECONDS) == 0.0
+        assert series.last("score") == 70
+
+    assert store.change("aave", days=6) == pytest.approx(50.0)
+
+def test_missing_values_and_unknown_protocol(store):
+    store.append("link", timestamp=T0, price=7.0)
+    with store.open("link") as series:
+        assert series.last("tvl") is None
+        assert series.change("tvl", DAY_SECONDS) is None
+        assert series.drawdown("tvl", DAY_SECONDS) is None
+    with store.open("nope") as series:
+        assert len(series) == 0
+        assert series.change("tvl", DAY_SECONDS) is None
+
+def test_record_snapshot(store):
+    snapshot = ProtocolSnapshot(name="MakerDAO", tvl=2_500_000_000)
+    store.record(snapshot, score=80, market_context={"price_usd": 1.0}, timestamp=T0)
+    with store.open("makerdao") as series:
+        assert series.last("tvl") == 2_500_000_000
+        assert series.last("price") == 1.0
+        assert series.last("score") == 80
+    assert store.protocols() == ["makerdao"]
+
+def test_rejects_out_of_order_and_unknown_columns(store):
+    store.append("aave", timestamp=T0 + 10, tvl=1)
+    with pytest.raises(ValueError):
+        store.append("aave", timestamp=T0, tvl=1)
+    with pytest.raises(ValueError):
+        store.append("aave", timestamp=T0 + 20, apy=1)
+
+def test_torn_append_is_ignored(store):
+    store.append_many("aave", [{"timestamp": T0, "tvl": 1}, {"timestamp": T0 + 1, "tvl": 2}])
+    # simula um append interrompido: só a coluna de timestamp recebeu a linha
+    with open(os.path.join(store.path("aave"), "timestamp.bin"), "ab") as f:
+        f.write((T0 + 2).to_bytes(8, sys.byteorder))
+    with store.open("aave") as series:
+        assert len(series) == 2
+    # o próximo append descarta a linha incompleta e mantém as colunas alinhadas
+    store.append("aave", timestamp=T0 + 3, tvl=4)
+    with store.open("aave") as series:
+        assert len(series) == 3
+        assert list(series.column("timestamp")) == [T0, T0 + 1, T0 + 3]
+        assert series.last("tvl") == 4
+
+def test_missing_column_keeps_history(store):
+    store.append_many("aave", [{"timestamp": T0, "tvl": 1, "price": 5}, {"timestamp": T0 + 1, "tvl": 2}])
+    os.remove(os.path.join(store.path("aave"), "price.bin"))
+    with store.open("aave") as series:
+        assert len(series) == 2
+        assert series.last("price") is None
+    # a coluna é recriada com NaN em vez de truncar as demais
+    store.append("aave", timestamp=T0 + 2, tvl=3, price=7)
+    with store.open("aave") as series:
+        assert list(series.column("tvl")) == [1, 2, 3]
+        assert series.last("price") == 7
+        assert series.change("price", 2) is None
+
+    os.remove(os.path.join(store.path("aave"), "timestamp.bin"))
+    with pytest.raises(ValueError):
+        store.append("aave", timestamp=T0 + 3, tvl=4)
+
+def test_close_with_live_view(store):
+    store.append_many("aave", [{"timestamp": T0, "tvl": 1}, {"timestamp": T0 + 1, "tvl": 2}])
+    series = store.open("aave")
+    view = series.column("tvl")
+    with pytest.raises(BufferError):
+        series.close()
+    view.release()
+    series.close()
+
+    # dentro de um `with`, a exceção original não é trocada por BufferError
+    with pytest.raises(KeyError):
+        with store.open("aave") as series:
+            view = series.column("tvl")
+            raise KeyError("original")
+
+def test_protocol_names_round_trip(store):
+    for name in ("aave v3", "curve/dex", "uni"):
+        store.append(name, timestamp=T0, tvl=1)
+    assert store.protocols() == ["aave v3", "curve/dex", "uni"]
+    for name in store.protocols():
+        with store.open(name) as series:
+            assert len(series) == 1
@@ -0,0 +1,54 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from sentinelzero.core.models import Severity
+from sentinelzero.signals.tvl_stream import HOUR_SECONDS, TvlStreamConfig, TvlStreamDetector
+
+def feed(detector, protocol, tvls, step=HOUR_SECONDS):
+    return [detector.update(protocol, i * step, tvl) for i, tvl in enumerate(tvls)]
+
+def test_stable_tvl_emits_nothing():
+    detector = TvlStreamDetector()
+    assert all(signals == [] for signals in feed(detector, "aave", [100.0] * 50))
+    assert detector.state("aave")["peak"] == 100.0
+
+def test_drawdown_emits_once_per_crossing():
+    detector = TvlStreamDetector(TvlStreamConfig(velocity_pct=1000))
+    emitted = feed(detector, "aave", [100, 100, 75, 74, 55, 54])
+    assert [s.severity for s in emitted[2]] == [Severity.HIGH]
+    assert emitted[3] == []
+    assert [s.severity for s in emitted[4]] == [Severity.CRITICAL]
+    assert emitted[5] == []
+    assert {s.severity for s in detector.active_signals("aave")} == {Severity.HIGH, Severity.CRITICAL}
+
+    # recupera o pico: alertas são rearmados e voltam a disparar
+    assert detector.update("aave", 10 * HOUR_SECONDS, 100) == []
+    assert detector.active_signals("aave") == []
+    assert [s.severity for s in detector.update("aave", 11 * HOUR_SECONDS, 70)] == [Severity.HIGH]
+
+def test_peak_expires_from_window():
+    config = TvlStreamConfig(window_seconds=3 * HOUR_SECONDS, velocity_pct=1000)
+    detector = TvlStreamDetector(config)
+    feed(detector, "aave", [200, 150, 150, 150, 150])
+    # o pico de 200 saiu da janela de 3h
+    assert detector.state("aave")["peak"] == 150
+    assert detector.active_signals("aave") == []
+
+def test_velocity_against_ewma():
+    detector = TvlStreamDetector(TvlStreamConfig(drawdown_high_pct=1000, drawdown_critical_pct=1000))
+    emitted = feed(detector, "aave", [100] * 10 + [80])
+    assert [s.description for s in emitted[-1]] == ["Rapid TVL outflow"]
+
+def test_update_many_and_ordering():
+    detector = TvlStreamDetector()
+    points = [(f"p{i % 3}", t, 100.0 if t < 5 else 10.0) for t in range(10) for i in range(3)]
+    emitted = detector.update_many(points)
+    assert set(emitted) == {"p0", "p1", "p2"}
+    assert len(detector) == 3
+    with pytest.raises(ValueError):
+        detector.update("p0", 0, 100.0)
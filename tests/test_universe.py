@@ -0,0 +1,190 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+from sentinelzero.datasources import remote
+from sentinelzero.datasources.defillama import DefiLlamaSource
+from sentinelzero.datasources.http_cache import CachedResponse
+from sentinelzero.datasources.universe import UNIVERSE_TTL_SECONDS, DefiLlamaUniverse
+from sentinelzero.utils import codec
+
+ENTRIES = [
+    {"slug": "aave-v3", "name": "Aave V3", "symbol": "AAVE", "gecko_id": "aave",
+     "address": "ethereum:0x7Fc66500c84A76Ad7e9c93437bFc5Ac33E2DDaE9",
+     "category": "Lending", "tvl": 12_000_000_000, "change_7d": -2.5},
+    {"slug": "aave-v2", "name": "Aave V2", "symbol": "AAVE", "gecko_id": None,
+     "address": None, "category": "Lending", "tvl": 1_000_000_000},
+    {"slug": "uniswap", "name": "Uniswap", "symbol": "UNI", "gecko_id": "uniswap",
+     "address": "0x1f9840a85d5aF5bf1D1762F925BDADdC4201F984", "category": "Dexes", "tvl": 5_000_000_000},
+    {"slug": "curve", "name": "Curve", "symbol": "-", "category": "Dexes", "tvl": 2_000_000_000},
+]
+
+
+def listing(entries=ENTRIES, fetched_at=None):
+    """Substituto de remote.get_cached que devolve `entries`."""
+    def get_cached(*args, **kwargs):
+        return CachedResponse(data=entries, fetched_at=time.time() if fetched_at is None else fetched_at)
+    return get_cached
+
+
+@pytest.fixture
+def universe():
+    u = DefiLlamaUniverse()
+    u.load(ENTRIES)
+    return u
+
+
+def test_lookup_by_every_key(universe):
+    assert universe.lookup("aave-v3")["slug"] == "aave-v3"
+    assert universe.lookup("Aave V2")["slug"] == "aave-v2"
+    assert universe.lookup("uniswap")["slug"] == "uniswap"
+    assert universe.lookup("UNI")["slug"] == "uniswap"
+    assert universe.lookup("0x1f9840a85d5af5bf1d1762f925bdaddc4201f984")["slug"] == "uniswap"
+    assert universe.lookup("ethereum:0x7fc66500c84a76ad7e9c93437bfc5ac33e2ddae9")["slug"] == "aave-v3"
+    assert universe.lookup("0x7fc66500c84a76ad7e9c93437bfc5ac33e2ddae9")["slug"] == "aave-v3"
+    assert universe.lookup("unknown") is None
+    assert universe.lookup("-") is None
+    assert len(universe) == 4
+
+
+def test_ambiguous_symbol_resolves_to_largest_tvl(universe):
+    assert universe.lookup("aave")["slug"] == "aave-v3"
+
+
+def test_slug_wins_over_other_keys():
+    u = DefiLlamaUniverse()
+    u.load([
+        {"slug": "uni", "name": "Uni Protocol", "tvl": 1},
+        {"slug": "uniswap", "symbol": "UNI", "tvl": 10},
+    ])
+    assert u.lookup("uni")["slug"] == "uni"
+
+
+def test_refresh_fetches_listing_once(monkeypatch):
+    calls = []
+
+    def fake_get_cached(url, timeout=remote.DEFAULT_TIMEOUT, params=None, source=None, priority=None):
+        calls.append((url, source))
+        return listing()()
+
+    monkeypatch.setattr(remote, "get_cached", fake_get_cached)
+    u = DefiLlamaUniverse(base_url="http://llama.test")
+    for key in ("aave", "uni", "curve", "unknown"):
+        u.lookup(key)
+    assert calls == [("http://llama.test/protocols", "defillama")]
+
+
+def test_stale_listing_is_served_when_refresh_fails(monkeypatch, universe):
+    def failing_get_cached(*args, **kwargs):
+        raise OSError("down")
+
+    monkeypatch.setattr(remote, "get_cached", failing_get_cached)
+    universe.loaded_at = time.time() - universe.ttl - 1
+    assert universe.lookup("uni")["slug"] == "uniswap"
+
+    with pytest.raises(OSError):
+        DefiLlamaUniverse().lookup("uni")
+
+
+def test_cache_file_round_trip(tmp_path, monkeypatch):
+    path = tmp_path / "cache" / "defillama.bin"
+    monkeypatch.setattr(remote, "get_cached", listing())
+    DefiLlamaUniverse(cache_path=str(path)).refresh()
+
+    saved = codec.decode(path.read_bytes())
+    assert saved["data"] == ENTRIES
+
+    # uma nova instância lê o arquivo sem ir à rede
+    monkeypatch.setattr(remote, "get_cached", lambda *a, **k: pytest.fail("network hit"))
+    u = DefiLlamaUniverse(cache_path=str(path))
+    assert u.lookup("curve")["tvl"] == 2_000_000_000
+
+
+def test_legacy_json_cache_file_is_read(tmp_path, monkeypatch):
+    path = tmp_path / "defillama.json"
+    path.write_text(json.dumps({"timestamp": datetime.now().isoformat(), "data": ENTRIES}))
+    monkeypatch.setattr(remote, "get_cached", lambda *a, **k: pytest.fail("network hit"))
+    assert DefiLlamaUniverse(cache_path=str(path)).lookup("uni")["slug"] == "uniswap"
+
+
+def test_expired_cache_file_is_refetched(tmp_path, monkeypatch):
+    path = tmp_path / "defillama.json"
+    # formato antigo do simulador: a listagem como texto cru
+    path.write_text(json.dumps({"timestamp": "2000-01-01T00:00:00", "data": json.dumps(ENTRIES[:1])}))
+    monkeypatch.setattr(remote, "get_cached", listing())
+    u = DefiLlamaUniverse(cache_path=str(path))
+    assert u.lookup("uniswap") is not None
+
+
+def test_stale_listing_keeps_its_fetch_time(tmp_path, monkeypatch):
+    path = tmp_path / "defillama.bin"
+    fetched_at = time.time() - 2 * UNIVERSE_TTL_SECONDS
+    calls = []
+
+    def stale(*args, **kwargs):
+        calls.append(1)
+        return listing(fetched_at=fetched_at)()
+
+    monkeypatch.setattr(remote, "get_cached", stale)
+    u = DefiLlamaUniverse(cache_path=str(path))
+    assert u.lookup("uni")["slug"] == "uniswap"
+    assert u.loaded_at == fetched_at and not u.is_fresh()
+    # o arquivo também guarda a idade real, e não conta como fresco
+    saved = codec.decode(path.read_bytes())
+    assert datetime.fromisoformat(saved["timestamp"]).timestamp() == pytest.approx(fetched_at, abs=1e-3)
+    # enquanto o cache revalida em background, lookups não repetem a busca
+    u.lookup("aave")
+    assert len(calls) == 1
+
+
+def test_source_serves_snapshots_from_universe(universe):
+    source = DefiLlamaSource(universe=universe)
+    snapshot = source.fetch("AAVE")
+    assert snapshot.name == "aave-v3"
+    assert snapshot.tvl == 12_000_000_000
+    assert snapshot.category == "Lending"
+    assert snapshot.tvl_change_7d == -2.5
+    assert source.get_tvl("curve") == 2_000_000_000
+    assert source.fetch("unknown") is None
+
+
+def test_fetch_defillama_skips_http_for_indexed_protocols(monkeypatch, universe):
+    calls = []
+
+    def fake_get_json(url, *args, **kwargs):
+        calls.append(url)
+        return {"tvl": 42}
+
+    monkeypatch.setattr(remote, "get_json", fake_get_json)
+    assert remote.fetch_defillama("uni", universe=universe) == {"tvl_usd": 5_000_000_000, "name": "uni"}
+    assert calls == []
+    assert remote.fetch_defillama("new-protocol", base_url="http://llama.test", universe=universe)["tvl_usd"] == 42
+    assert calls == ["http://llama.test/protocol/new-protocol"]
+
+
+def test_default_universe_reads_configured_cache_file(tmp_path, monkeypatch):
+    from sentinelzero.datasources import universe as universe_module
+    from sentinelzero.utils import entity_index, resolver
+
+    path = tmp_path / "defillama.bin"
+    monkeypatch.setattr(remote, "get_cached", listing())
+    DefiLlamaUniverse(cache_path=str(path)).refresh()
+
+    # um processo novo (ex.: worker do simulador) resolve pela listagem gravada
+    monkeypatch.setenv(universe_module.CACHE_PATH_ENV, str(path))
+    monkeypatch.setattr(universe_module, "_default", None)
+    monkeypatch.setattr(entity_index, "_default", None)
+    monkeypatch.setattr(entity_index, "INDEX_PATH", str(tmp_path / "missing.json.gz"))
+    monkeypatch.setattr(remote, "get_cached", lambda *a, **k: pytest.fail("network hit"))
+    entity = resolver.resolve_identifier("Uniswap")
+    assert entity["defillama_slug"] == "uniswap" and entity["tvl"] == 5_000_000_000
+    assert resolver.resolve_identifier("does-not-exist") == {"type": "unknown"}
+    assert universe_module.get_universe().cache_path == str(path)
@@ -0,0 +1,53 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from sentinelzero.core.models import RiskSignal, Severity, RiskCategory
+from sentinelzero.core.enums import Severity as LegacySeverity
+from sentinelzero.scoring.calculator import calculate_risk
+from sentinelzero.scoring.vectorized import calculate_risk_many, severity_counts
+
+def create_signal(severity):
+    return RiskSignal(
+        category=RiskCategory.GOVERNANCE,
+        description="Test",
+        severity=severity,
+        rationale="Testing",
+        source="heuristic"
+    )
+
+def test_matches_scalar_path():
+    rng = random.Random(42)
+    severities = list(Severity) + [LegacySeverity.MEDIUM]
+    types, tvls, signal_lists = [], [], []
+    for _ in range(500):
+        types.append(rng.choice(["protocol", "token", "unknown"]))
+        tvls.append(rng.choice([None, 0, 99_999_999, 100_000_000, rng.uniform(0, 1e10)]))
+        signal_lists.append([create_signal(rng.choice(severities)) for _ in range(rng.randint(0, 5))])
+
+    scores = calculate_risk_many(types, tvls, signal_lists)
+    expected = [calculate_risk(t, v, s) for t, v, s in zip(types, tvls, signal_lists)]
+    assert scores.tolist() == expected
+
+def test_clamp_and_tvl_penalty():
+    many = [create_signal(Severity.CRITICAL)] * 3
+    scores = calculate_risk_many(["protocol", "protocol", "token"], [50_000_000, None, 50_000_000], [many, [], []])
+    # 50 + 90 + 10 -> 100 (clamp); sem TVL não há penalidade; token nunca recebe penalidade
+    assert scores.tolist() == [100, 50, 50]
+
+def test_severity_counts_ignores_unweighted():
+    counts = severity_counts([[create_signal(Severity.LOW), create_signal(LegacySeverity.LOW)]])
+    assert counts.sum() == 1
+
+def test_shared_containers_match_scalar_path():
+    shared = (create_signal(Severity.HIGH), create_signal(LegacySeverity.HIGH))
+    signal_lists = [shared, [create_signal(Severity.LOW)], shared, iter([create_signal(Severity.MEDIUM)])]
+    scores = calculate_risk_many(["protocol"] * 4, [1.0, None, 2e8, 1.0], signal_lists)
+    assert scores.tolist() == [80, 55, 70, 70]
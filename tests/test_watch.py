@@ -0,0 +1,198 @@
+import sys
+import os
+
+# Adiciona a subpasta sentinelzero ao início do path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from sentinelzero.api.watch import WatchHub, report_delta, sse_events
+from sentinelzero.core.models import ProtocolSnapshot
+from sentinelzero.datasources.aggregator import ParallelFetcher
+
+class MutableSource:
+    def __init__(self):
+        self.tvl = {"aave": 3_000_000_000}
+        self.calls = 0
+
+    def fetch(self, protocol):
+        self.calls += 1
+        tvl = self.tvl.get(protocol)
+        return None if tvl is None else ProtocolSnapshot(name=protocol, tvl=tvl)
+
+def make_hub(source):
+    return WatchHub(ParallelFetcher({"defillama": source.fetch}), interval=3600)
+
+def drain(queue):
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+def test_hub_pushes_only_changes_and_shares_refreshes():
+    source = MutableSource()
+
+    async def main():
+        hub = make_hub(source)
+        clients = [hub.subscribe(["aave"]) for _ in range(5)]
+        await hub.refresh_once()
+        first = [drain(q) for q in clients]
+
+        await hub.refresh_once()  # nada mudou
+        unchanged = [drain(q) for q in clients]
+
+        source.tvl["aave"] = 50_000_000
+        await hub.refresh_once()
+        changed = [drain(q) for q in clients]
+        await hub.stop()
+        return first, unchanged, changed
+
+    first, unchanged, changed = asyncio.run(main())
+    assert all(len(events) == 1 and events[0]["event"] == "update" for events in first)
+    assert first[0][0]["previous_score"] is None
+    assert unchanged == [[]] * 5
+    delta = changed[0][0]
+    # TVL baixo (+10) e a queda de 98% vista pelo detector de streaming
+    stream = {f["description"]: f["severity"] for f in delta["findings_added"]}
+    assert stream == {"Sudden TVL drawdown": "high", "Severe TVL drawdown": "critical",
+                      "Rapid TVL outflow": "medium"}
+    assert delta["risk_score"] == min(100, first[0][0]["risk_score"] + 10 + 20 + 30 + 10)
+    assert delta["previous_score"] == first[0][0]["risk_score"]
+    assert delta["findings_removed"] == []
+    # um fetch por ciclo (mais o ciclo inicial do loop), não um por cliente
+    assert source.calls <= 4
+
+def test_unknown_protocol_reports_error_and_unsubscribe_clears_state():
+    source = MutableSource()
+
+    async def main():
+        hub = make_hub(source)
+        queue = hub.subscribe(["nope"])
+        await hub.refresh_once()
+        events = drain(queue)
+        hub.unsubscribe(queue)
+        await hub.stop()
+        return hub, events
+
+    hub, events = asyncio.run(main())
+    assert events[0]["event"] == "error"
+    assert hub.protocols == []
+
+def test_repeated_error_is_published_once():
+    source = MutableSource()
+
+    async def main():
+        hub = make_hub(source)
+        queue = hub.subscribe(["nope"])
+        for _ in range(3):
+            await hub.refresh_once()
+        repeated = drain(queue)
+        late = hub.subscribe(["nope"])
+        source.tvl["nope"] = 1_000_000
+        await hub.refresh_once()
+        source.tvl.pop("nope")
+        await hub.refresh_once()
+        recovered = drain(queue)
+        await hub.stop()
+        return repeated, drain(late), recovered
+
+    repeated, late, recovered = asyncio.run(main())
+    assert [e["event"] for e in repeated] == ["error"]
+    # quem chega depois recebe o erro atual uma vez
+    assert late[0]["event"] == "error"
+    assert [e["event"] for e in recovered] == ["update", "error"]
+
+def test_refresh_in_flight_after_last_unsubscribe_keeps_state_clear():
+    source = MutableSource()
+
+    class SlowFetcher:
+        def __init__(self):
+            self.release = asyncio.Event()
+
+        async def fetch(self, protocol):
+            await self.release.wait()
+            return await ParallelFetcher({"defillama": source.fetch}).fetch(protocol)
+
+    async def main():
+        fetcher = SlowFetcher()
+        hub = WatchHub(fetcher, interval=3600)
+        queue = hub.subscribe(["aave"])
+        refresh = asyncio.ensure_future(hub.refresh_protocol("aave"))
+        await asyncio.sleep(0)
+        hub.unsubscribe(queue)
+        fetcher.release.set()
+        await refresh
+        return hub
+
+    hub = asyncio.run(main())
+    assert hub._inputs == {} and hub._reports == {}
+    assert "aave" not in hub.engine._previous
+
+def test_loop_stops_when_hub_is_empty():
+    source = MutableSource()
+
+    async def main():
+        hub = make_hub(source)
+        queue = hub.subscribe(["aave"])
+        task = hub._task
+        await asyncio.sleep(0.01)
+        hub.unsubscribe(queue)
+        await asyncio.sleep(0)
+        stopped = task.done() and hub._task is None
+        hub.subscribe(["aave"])
+        restarted = hub._task is not None and not hub._task.done()
+        await hub.stop()
+        return stopped, restarted
+
+    assert asyncio.run(main()) == (True, True)
+
+def test_refresh_records_history(tmp_path):
+    from sentinelzero.utils.timeseries import SeriesStore
+
+    source = MutableSource()
+    history = SeriesStore(str(tmp_path / "history"))
+
+    async def main():
+        hub = WatchHub(ParallelFetcher({"defillama": source.fetch}), interval=3600, history=history)
+        queue = hub.subscribe(["aave"])
+        await hub.refresh_once()
+        await hub.refresh_once()  # sem mudança: grava o ponto com o último score
+        source.tvl["aave"] = 50_000_000
+        await hub.refresh_once()
+        await hub.stop()
+        return [e["risk_score"] for e in drain(queue) if e["event"] == "update"]
+
+    scores = asyncio.run(main())
+    assert history.protocols() == ["aave"]
+    with history.open("aave") as series:
+        assert list(series.column("tvl"))[-2:] == [3_000_000_000, 50_000_000]
+        assert series.last("score") == scores[-1]
+
+def test_sse_stream_format():
+    source = MutableSource()
+
+    async def main():
+        hub = make_hub(source)
+        stream = sse_events(hub, ["aave"], heartbeat=0.01)
+        chunks = [await stream.__anext__() for _ in range(2)]
+        await stream.aclose()
+        await hub.stop()
+        return hub, chunks
+
+    hub, chunks = asyncio.run(main())
+    data = [c for c in chunks if c.startswith("event: update")][0]
+    payload = json.loads(data.split("data: ", 1)[1])
+    assert payload["protocol"] == "aave"
+    assert hub.protocols == []
+
+def test_report_delta():
+    before = {"risk_score": 70, "tvl_usd": 1, "risk_findings": [{"category": "A", "description": "x"}]}
+    after = {"protocol": "p", "risk_score": 80, "tvl_usd": 1, "risk_findings": [{"category": "A", "description": "y"}]}
+    delta = report_delta(before, after)
+    assert delta["findings_added"] == [{"category": "A", "description": "y"}]
+    assert delta["findings_removed"] == [{"category": "A", "description": "x"}]